@@ -287,9 +287,21 @@ async def get_chatbot_response(username: str, chat_id: str, message: str):
         return
     sanitized_message = sanitize_input(message)
     try:
-        result = await chatModel.get_convo_hist_answer(sanitized_message, chat_id)
-        answer = result.get("answer", "[No answer generated]")
-        yield format_markdown(answer)
+        # Yield raw answer tokens as they arrive; callers format the whole answer
+        streamed = ""
+        async for event in chatModel.astream_convo_hist_answer(
+            sanitized_message, chat_id
+        ):
+            if "token" in event:
+                streamed += event["token"]
+                yield event["token"]
+                continue
+            answer = event.get("answer", "[No answer generated]")
+            if not streamed:
+                yield answer
+            elif answer != streamed:
+                # The turn failed after tokens were shown; append its error answer
+                yield f"\n\n{answer}"
         return
     except Exception as e:
         logger.error(f"Error in get_chatbot_response: {e}")
@@ -53,6 +53,134 @@ DATABASE_PATH = os.path.join(
 
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 
+# Output dimensions of the known OpenAI embedding models. DuckDB collections
+# store embeddings in a fixed-width FLOAT[N] column sized from this table.
+EMBEDDING_MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+# Models that accept a reduced output size through the API's "dimensions" argument
+EMBEDDING_MODELS_WITH_DIMENSIONS = ("text-embedding-3-small", "text-embedding-3-large")
+
+# Reduced embedding width for new collections (0 = the model's full width).
+# Override per collection with <COLLECTION>_EMBEDDING_DIMENSIONS. A collection
+# stored at a larger width is shrunk online by a background re-index when
+# EMBEDDING_AUTO_REINDEX is on, copying REINDEX_BATCH_SIZE rows per step.
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))
+EMBEDDING_AUTO_REINDEX = os.getenv("EMBEDDING_AUTO_REINDEX", "true").lower() == "true"
+REINDEX_BATCH_SIZE = int(os.getenv("REINDEX_BATCH_SIZE", "2000"))
+
+# Batched embedding during ingestion: inputs and estimated tokens per request,
+# concurrent requests per add_documents call, and retries per failed batch
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+EMBEDDING_RETRY_BACKOFF = float(os.getenv("EMBEDDING_RETRY_BACKOFF", "1.0"))
+
+# Persistent embedding cache keyed by (model, sha256(text)), shared by all
+# collections; least recently used vectors are evicted above the byte budget
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+default_embedding_cache_path = os.path.join("data", "embedding_cache", "embeddings.db")
+EMBEDDING_CACHE_PATH = os.path.join(
+    get_chatbot_dir(),
+    os.getenv("EMBEDDING_CACHE_PATH", default_embedding_cache_path),
+)
+EMBEDDING_CACHE_MAX_BYTES = int(
+    os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+# Serve repeated questions from the answer cache: answers are reused for
+# questions at least ANSWER_CACHE_THRESHOLD cosine-similar to a cached one, and
+# the least recently used beyond ANSWER_CACHE_MAX_ENTRIES are evicted
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "10000"))
+default_answer_cache_path = os.path.join("data", "answer_cache", "answers.duckdb")
+ANSWER_CACHE_PATH = os.path.join(
+    get_chatbot_dir(), os.getenv("ANSWER_CACHE_PATH", default_answer_cache_path)
+)
+
+# In-process LRU cache of query embeddings per vector store (entries, seconds)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_EMBEDDING_CACHE_TTL = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "3600"))
+
+# Threads running DuckDB work for async vector store queries
+DUCKDB_QUERY_WORKERS = int(os.getenv("DUCKDB_QUERY_WORKERS", "8"))
+
+# Vector index backend: "duckdb" (table scan), "memory" (exact, in-process
+# float32 matrix) or "hnsw" (ANN). VECTOR_INDEX_IN_MEMORY=true is a deprecated
+# alias for VECTOR_INDEX_BACKEND=memory, read only when VECTOR_INDEX_BACKEND is
+# unset; VECTOR_INDEX_BACKEND always wins, and VECTOR_INDEX_IN_MEMORY is derived
+# from the backend it selects.
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND") or (
+    "memory"
+    if os.getenv("VECTOR_INDEX_IN_MEMORY", "false").lower() == "true"
+    else "duckdb"
+)
+VECTOR_INDEX_IN_MEMORY = VECTOR_INDEX_BACKEND == "memory"
+
+# Retrieval mode: "vector" or "hybrid" (DuckDB FTS BM25 fused with vector search
+# by reciprocal rank fusion). HYBRID_LEXICAL_WEIGHT is the BM25 share (0-1); each
+# side contributes k * HYBRID_CANDIDATE_FACTOR candidates to the fusion. The BM25
+# index is rebuilt in the background once writes have paused for
+# HYBRID_FTS_REBUILD_DELAY seconds; queries use the previous index until then.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")
+HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "0.5"))
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_CANDIDATE_FACTOR = int(os.getenv("HYBRID_CANDIDATE_FACTOR", "4"))
+HYBRID_FTS_REBUILD_DELAY = float(os.getenv("HYBRID_FTS_REBUILD_DELAY", "5"))
+
+# Directory of Parquet collection snapshots (one sub-directory per collection);
+# empty collections are restored from it on first open. Empty disables.
+VECTOR_SNAPSHOT_DIR = os.getenv("VECTOR_SNAPSHOT_DIR", "")
+
+# Hours between in-process compactions of each collection (0 disables; see
+# backend.maintenance). Query latency before and after is measured with
+# MAINTENANCE_PROBE_QUERIES stored embeddings used as queries.
+VECTOR_MAINTENANCE_INTERVAL_HOURS = float(
+    os.getenv("VECTOR_MAINTENANCE_INTERVAL_HOURS", "0")
+)
+MAINTENANCE_PROBE_QUERIES = int(os.getenv("MAINTENANCE_PROBE_QUERIES", "20"))
+
+# Default retriever search type: "similarity" or "mmr" (maximal marginal relevance),
+# overridable per retriever with search_kwargs["search_type"]. MMR re-ranks the top
+# MMR_FETCH_K candidates, trading relevance (MMR_LAMBDA=1) against diversity (0).
+RETRIEVAL_SEARCH_TYPE = os.getenv("RETRIEVAL_SEARCH_TYPE", "similarity")
+MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", "20"))
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.5"))
+
+# Default retriever result limits, overridable with search_kwargs["score_threshold"]
+# and search_kwargs["max_context_tokens"]: drop chunks whose cosine similarity is
+# below the threshold (empty disables) and stop once the chunks fill the token
+# budget (0 disables; the best chunk is always kept).
+RETRIEVAL_SCORE_THRESHOLD = (
+    float(os.environ["RETRIEVAL_SCORE_THRESHOLD"])
+    if os.getenv("RETRIEVAL_SCORE_THRESHOLD")
+    else None
+)
+RETRIEVAL_MAX_CONTEXT_TOKENS = int(os.getenv("RETRIEVAL_MAX_CONTEXT_TOKENS", "0"))
+
+# Compact vectors for the memory backend: "none", "int8" or "float16". Override
+# per collection with <COLLECTION>_VECTOR_QUANTIZATION (e.g. CHAT_VECTOR_QUANTIZATION).
+# Quantised scores pick a shortlist of k * VECTOR_RERANK_FACTOR rows that DuckDB
+# re-ranks with the full-precision embeddings.
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+VECTOR_RERANK_FACTOR = int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+
+# Split a collection over this many DuckDB files, hash-partitioned by document id,
+# so ingestion and queries use several cores. Override per collection with
+# <COLLECTION>_VECTOR_SHARDS. The count is fixed once a sharded collection exists.
+VECTOR_SHARDS = int(os.getenv("VECTOR_SHARDS", "1"))
+
+# HNSW recall/latency trade-off; collections below HNSW_MIN_ROWS are searched exactly
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+HNSW_MIN_ROWS = int(os.getenv("HNSW_MIN_ROWS", "10000"))
+
 default_session_path = os.path.join("data", "chat_sessions")
 CHAT_SESSIONS_PATH = os.path.join(
     get_chatbot_dir(), os.getenv("CHAT_SESSIONS_PATH", default_session_path)
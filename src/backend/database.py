@@ -16,30 +16,286 @@ and provides a scalable vector database solution for the chatbot.
 """
 
 import os
+import re
+import time
+import asyncio
+import threading
+import concurrent.futures
 import duckdb
 import json
+import logging
 import numpy as np
-from typing import List, Dict, Any, Optional  # noqa: F401
-from performance_utils import lazy_loader
+from typing import List, Dict, Any, Optional, Tuple, Callable  # noqa: F401
+from performance_utils import lazy_loader, perf_monitor
 from infra_utils import get_chatbot_dir
-from .config import EMBEDDING_MODEL
+from .config import (
+    DUCKDB_QUERY_WORKERS,
+    EMBEDDING_MODEL,
+    EMBEDDING_AUTO_REINDEX,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MODEL_DIMENSIONS,
+    EMBEDDING_MODELS_WITH_DIMENSIONS,
+    EMBEDDING_BATCH_MAX_TOKENS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MAX_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_RETRY_BACKOFF,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH,
+    HNSW_M,
+    HNSW_MIN_ROWS,
+    HYBRID_CANDIDATE_FACTOR,
+    HYBRID_FTS_REBUILD_DELAY,
+    HYBRID_LEXICAL_WEIGHT,
+    HYBRID_RRF_K,
+    MMR_FETCH_K,
+    MMR_LAMBDA,
+    RETRIEVAL_MAX_CONTEXT_TOKENS,
+    RETRIEVAL_MODE,
+    RETRIEVAL_SCORE_THRESHOLD,
+    REINDEX_BATCH_SIZE,
+    RETRIEVAL_SEARCH_TYPE,
+    VECTOR_INDEX_BACKEND,
+    VECTOR_MAINTENANCE_INTERVAL_HOURS,
+    VECTOR_QUANTIZATION,
+    VECTOR_RERANK_FACTOR,
+    VECTOR_SHARDS,
+)
+from .duckdb_connections import DuckDBConnectionManager
+from .embedding_cache import QueryEmbeddingCache, get_embedding_cache, text_hash
+from .vector_index import InMemoryVectorIndex, HNSWVectorIndex, create_vector_index
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.documents import Document
-from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
 from infra_utils import create_folders
 
 # --- DuckDB Vector Store Implementation ---
 
+_query_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_query_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the bounded thread pool that runs DuckDB work for async queries.
+
+    :return: Shared executor with ``DUCKDB_QUERY_WORKERS`` threads.
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    global _query_executor
+    with _query_executor_lock:
+        if _query_executor is None:
+            _query_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=DUCKDB_QUERY_WORKERS, thread_name_prefix="duckdb-query"
+            )
+        return _query_executor
+
+
+def _array_dimension(column_type: str) -> Optional[int]:
+    """Extract N from a DuckDB ``FLOAT[N]`` column type string."""
+    match = re.fullmatch(r"FLOAT\[(\d+)\]", column_type)
+    return int(match.group(1)) if match else None
+
+
+_token_encoder = None
+
+
+def _estimate_tokens(text: str) -> int:
+    """Count tokens with tiktoken, or estimate 4 characters per token without it."""
+    global _token_encoder
+    if _token_encoder is None:
+        try:
+            import tiktoken
+
+            _token_encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _token_encoder = False
+    if _token_encoder:
+        return len(_token_encoder.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def _plan_embedding_batches(
+    contents: List[str], max_items: int, max_tokens: int
+) -> List[List[int]]:
+    """Group text indices into batches bounded by item count and token budget.
+
+    :param contents: Texts to embed.
+    :type contents: List[str]
+    :param max_items: Maximum texts per batch.
+    :type max_items: int
+    :param max_tokens: Maximum estimated tokens per batch.
+    :type max_tokens: int
+    :return: Batches of indices into ``contents``.
+    :rtype: List[List[int]]
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(contents):
+        tokens = _estimate_tokens(text)
+        if current and (
+            len(current) >= max_items or current_tokens + tokens > max_tokens
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _reciprocal_rank_fusion(
+    rankings: List[List[str]], weights: List[float], rrf_k: int = 60
+) -> List[tuple]:
+    """Fuse ranked id lists with weighted reciprocal rank fusion.
+
+    Each id scores ``sum(weight / (rrf_k + rank))`` over the lists it appears in.
+
+    :param rankings: Ranked id lists, best first.
+    :type rankings: List[List[str]]
+    :param weights: Weight of each ranking.
+    :type weights: List[float]
+    :param rrf_k: Rank offset damping the influence of top ranks.
+    :type rrf_k: int
+    :return: (id, fused score) pairs, best first.
+    :rtype: List[tuple]
+    """
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def stable_document_id(content: str, source: Optional[str] = None) -> str:
+    """Derive a document id from its source and content.
+
+    Unlike ``hash()``, which Python salts per process, the id is the same on
+    every run, so re-ingesting unchanged content overwrites its own rows.
+
+    :param content: Document text.
+    :type content: str
+    :param source: Source the document was extracted from, e.g. a file path.
+    :type source: Optional[str]
+    :return: Hex id.
+    :rtype: str
+    """
+    return text_hash(f"{source or ''}\0{content}")[:32]
+
+
+def collection_stores(store: Any) -> List["DuckDBVectorStore"]:
+    """Return the DuckDB file stores behind a collection.
+
+    :param store: ``DuckDBVectorStore`` or ``ShardedDuckDBVectorStore``.
+    :type store: Any
+    :return: The store itself, or its shards in shard order.
+    :rtype: List[DuckDBVectorStore]
+    """
+    return list(getattr(store, "shards", [store]))
+
+
+def _union_rankings(rankings: List[List[tuple]]) -> List[tuple]:
+    """Deduplicate several (id, similarity) rankings into one.
+
+    Each id keeps its best similarity and the union is sorted by it.
+
+    :param rankings: Ranked lists of (id, similarity) pairs.
+    :type rankings: List[List[tuple]]
+    :return: Deduplicated (id, similarity) pairs, best first.
+    :rtype: List[tuple]
+    """
+    best: Dict[str, float] = {}
+    for ranking in rankings:
+        for doc_id, similarity in ranking:
+            if doc_id not in best or similarity > best[doc_id]:
+                best[doc_id] = similarity
+    return sorted(best.items(), key=lambda hit: hit[1], reverse=True)
+
+
+def _mmr_select(
+    query_emb: List[float], vectors: np.ndarray, k: int, lambda_mult: float
+) -> List[int]:
+    """Pick ``k`` rows by maximal marginal relevance.
+
+    Each step takes the candidate maximising
+    ``lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, selected)``.
+    Candidate-to-candidate similarities come from one Gram matrix and the
+    redundancy term is kept as a running maximum, so each step is a single
+    vector operation over the pool.
+
+    :param query_emb: Query embedding.
+    :type query_emb: List[float]
+    :param vectors: Candidate embeddings, shape (num_candidates, dimension).
+    :type vectors: np.ndarray
+    :param k: Number of candidates to select.
+    :type k: int
+    :param lambda_mult: 1 ranks purely on relevance, 0 purely on diversity.
+    :type lambda_mult: float
+    :return: Indices into ``vectors`` in selection order.
+    :rtype: List[int]
+    """
+    if len(vectors) == 0 or k <= 0:
+        return []
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-8)
+    query = np.asarray(query_emb, dtype=np.float32)[: matrix.shape[1]]
+    query = query / max(float(np.linalg.norm(query)), 1e-8)
+    relevance = matrix @ query
+    gram = matrix @ matrix.T
+    redundancy = np.full(len(matrix), -np.inf, dtype=np.float32)
+    available = np.ones(len(matrix), dtype=bool)
+    selected: List[int] = []
+    for _ in range(min(k, len(matrix))):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, gram[best])
+    return selected
+
 
 class DuckDBVectorStore:
     """DuckDB-based vector store for document storage and retrieval.
 
     This class provides a vector store implementation using DuckDB as the backend,
-    compatible with LangChain's vector store interface.
+    compatible with LangChain's vector store interface. With an ``index_backend``
+    of ``"memory"`` or ``"hnsw"`` the embeddings are also held in an in-process
+    index (see :mod:`backend.vector_index`) and queries are answered from it
+    without scanning the table. The memory index can hold ``quantization``
+    int8 or float16 vectors, in which case its shortlist is re-ranked in DuckDB.
+
+    ``dimensions`` requests a reduced embedding width from models that
+    support it. The width a collection is stored at is recorded in its
+    ``{collection}_meta`` table; changing it later goes through
+    :meth:`start_reindex`.
+
+    ``embedding`` and ``query_cache`` let several stores share one embedding
+    client and query cache (see ``ShardedDuckDBVectorStore``). A store given
+    them leaves replacing the client after a width change to the store that
+    created them.
     """
 
-    def __init__(self, db_path: str, collection_name: str, embedding_model: str):
+    def __init__(
+        self,
+        db_path: str,
+        collection_name: str,
+        embedding_model: str,
+        index_backend: str = "duckdb",
+        quantization: str = "none",
+        search_mode: str = "vector",
+        dimensions: Optional[int] = None,
+        embedding: Optional[OpenAIEmbeddings] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+    ):
         import logging
 
         logger = logging.getLogger(__name__)
@@ -54,19 +310,73 @@ class DuckDBVectorStore:
 
         self.collection_name = collection_name
         self.embedding_model = embedding_model
+        # Embedding width; read back from the table schema when it already exists
+        self.dimension: Optional[int] = dimensions or EMBEDDING_MODEL_DIMENSIONS.get(
+            embedding_model
+        )
 
         # Create collection-specific database file in subdirectory
         # self.db_path (the parameter) is now the base directory for all DuckDB instances
         self.db_file = os.path.join(
             self.base_db_dir, f"{collection_name}.db"
         )  # Changed this line
+        self.index_file = os.path.join(self.base_db_dir, f"{collection_name}.hnsw")
+        # Posting table mapping each keyword to the documents that carry it
+        self.keyword_table = f"{collection_name}_keywords"
+        # Registry mapping each source (e.g. file path) to its document ids
+        self.source_table = f"{collection_name}_sources"
+        # Key/value collection settings, e.g. the stored embedding width
+        self.meta_table = f"{collection_name}_meta"
+        # Target table and width while an online re-index is running
+        self._reindex: Optional[Dict[str, Any]] = None
+        # Set between a re-index swap and the rebuild of the in-process index
+        self._index_pending = False
 
         logger.info(
             f"🔍 [DuckDBVectorStore] Initializing vector DB for collection '{collection_name}' at '{self.db_file}'"
         )
-        self.conn = duckdb.connect(self.db_file)
+        # One writer plus per-thread read cursors; self.conn is the writer
+        self.connections = DuckDBConnectionManager(self.db_file)
+        self.conn = self.connections.writer
         self._ensure_table()
-        self.embedding = OpenAIEmbeddings(model=embedding_model)
+        if dimensions and self.dimension != dimensions:
+            logger.warning(
+                f"⚠️ [DuckDBVectorStore] '{collection_name}' is stored with {self.dimension} "
+                f"dimensions, not the configured {dimensions}; start_reindex() migrates it"
+            )
+        # Stores handed an embedding client share it and never replace it
+        self._shared_clients = embedding is not None
+        self.embedding = embedding or self._embedding_client(self.dimension)
+        self.index_backend = index_backend
+        self.index: Optional[InMemoryVectorIndex] = None
+        # int8/float16 vectors are only held by the in-memory index
+        self.quantization = quantization
+        if quantization != "none" and index_backend != "memory":
+            logger.warning(
+                f"⚠️ [DuckDBVectorStore] Quantization '{quantization}' needs the memory index backend, "
+                f"ignored for '{index_backend}'"
+            )
+            self.quantization = "none"
+        self.embedding_cache = get_embedding_cache()
+        self.query_cache = (
+            query_cache if query_cache is not None else QueryEmbeddingCache()
+        )
+        # "vector" or "hybrid" (BM25 + vector, fused with reciprocal rank fusion)
+        self.search_mode = search_mode
+        self._fts_available: Optional[bool] = None
+        self._fts_dirty = True
+        # Whether a BM25 index exists; a stale one still serves queries
+        self._fts_built = False
+        self._fts_timer: Optional[threading.Timer] = None
+        self._fts_timer_lock = threading.Lock()
+        # Bumped by every write; content_fingerprint() is cached per generation
+        self._content_generation = 0
+        self._content_fingerprint: Optional[Tuple[int, str]] = None
+        if search_mode == "hybrid":
+            # Download the extension now rather than on the first user query
+            self.load_fts(install=True)
+        if index_backend != "duckdb":
+            self.load_index()
         logger.info(
             f"✅ [DuckDBVectorStore] Vector DB for '{collection_name}' initialized successfully"
         )
@@ -74,102 +384,1988 @@ class DuckDBVectorStore:
     def _ensure_table(self):
         """Ensure the database table exists with the correct schema.
 
-        Creates a table with columns for id, content, embedding (JSON),
-        metadata (JSON), and 10 keyword columns for filtering.
+        Creates a table with columns for id, content, embedding (FLOAT[N]),
+        metadata (JSON), and 10 legacy keyword columns, plus the keyword
+        posting table used for filtering. Collections created by older
+        versions, which stored embeddings as JSON strings, are migrated in
+        place on first open.
+        """
+        columns = self._table_columns()
+        if columns.get("embedding") in ("JSON", "VARCHAR"):
+            self._migrate_json_embeddings()
+            columns = self._table_columns()
+        if columns:
+            self.dimension = _array_dimension(columns["embedding"])
+            self._ensure_keyword_table()
+            self._ensure_source_table()
+        elif self.dimension is not None:
+            self._create_table(self.collection_name, self.dimension)
+            self._ensure_keyword_table()
+            self._ensure_source_table()
+        # Models of unknown width record a null dimension until the first write
+        self._write_meta(embedding_model=self.embedding_model, dimension=self.dimension)
+
+    def _write_meta(self, **values: Any) -> None:
+        """Store collection settings in the ``{collection}_meta`` table.
+
+        :param values: Settings to record; values are stored as JSON.
+        """
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.meta_table} (key VARCHAR, value VARCHAR)"
+        )
+        for key, value in values.items():
+            self.conn.execute(f"DELETE FROM {self.meta_table} WHERE key = ?", [key])
+            self.conn.execute(
+                f"INSERT INTO {self.meta_table} VALUES (?, ?)", [key, json.dumps(value)]
+            )
+
+    def read_meta(self) -> Dict[str, Any]:
+        """Return the settings recorded in the ``{collection}_meta`` table.
+
+        :return: Mapping of setting name to value; empty for a new collection.
+        :rtype: Dict[str, Any]
+        """
+        exists = self.conn.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+            [self.meta_table],
+        ).fetchone()[0]
+        if not exists:
+            return {}
+        with self.connections.read() as conn:
+            rows = conn.execute(f"SELECT key, value FROM {self.meta_table}").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def _embedding_client(self, dimension: Optional[int]) -> OpenAIEmbeddings:
+        """Create the embedding client, requesting ``dimension`` outputs if reduced.
+
+        :param dimension: Embedding width the collection is stored at.
+        :type dimension: Optional[int]
+        :return: Embedding client.
+        :rtype: OpenAIEmbeddings
+        :raises ValueError: If the model cannot produce reduced embeddings.
+        """
+        native = EMBEDDING_MODEL_DIMENSIONS.get(self.embedding_model)
+        # Models of unknown width are stored at whatever width they return
+        if dimension is None or native is None or dimension == native:
+            return OpenAIEmbeddings(model=self.embedding_model)
+        if self.embedding_model not in EMBEDDING_MODELS_WITH_DIMENSIONS:
+            raise ValueError(
+                f"{self.embedding_model} does not support {dimension}-dimension embeddings"
+            )
+        return OpenAIEmbeddings(model=self.embedding_model, dimensions=dimension)
+
+    def _fit_dimension(self, embedding: Any) -> Any:
+        """Truncate an embedding made before a re-index to the stored width.
+
+        Reduced-dimension embeddings are the leading components of the full
+        ones, so queries and writes already in flight when
+        :meth:`reindex_dimensions` swaps tables stay valid.
+
+        :param embedding: Embedding vector.
+        :type embedding: Any
+        :return: The embedding, truncated if it is wider than the collection.
+        :rtype: Any
+        """
+        if self.dimension is not None and len(embedding) > self.dimension:
+            return np.asarray(embedding, dtype=np.float32)[: self.dimension].tolist()
+        return embedding
+
+    @property
+    def _cache_model(self) -> str:
+        """Embedding cache key for the model at this collection's width."""
+        native = EMBEDDING_MODEL_DIMENSIONS.get(self.embedding_model)
+        if self.dimension is None or native is None or self.dimension == native:
+            return self.embedding_model
+        return f"{self.embedding_model}@{self.dimension}"
+
+    def _ensure_keyword_table(self):
+        """Create the ``(keyword, doc_id)`` posting table if it is missing.
+
+        A newly created posting table is backfilled from the full keyword
+        lists kept in each document's metadata, so collections written before
+        the table existed gain keyword filtering without re-ingestion.
+        """
+        exists = self.conn.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+            [self.keyword_table],
+        ).fetchone()[0]
+        if exists:
+            return
+        kt = self.keyword_table
+        self.conn.execute(
+            f"CREATE TABLE {kt} (keyword VARCHAR NOT NULL, doc_id VARCHAR NOT NULL)"
+        )
+        self.conn.execute(f"""
+            INSERT INTO {kt}
+            SELECT DISTINCT keyword, id FROM (
+                SELECT id, unnest(CAST(json_extract(metadata, '$.keywords') AS VARCHAR[])) AS keyword
+                FROM {self.collection_name}
+                WHERE json_type(metadata, '$.keywords') = 'ARRAY'
+            ) WHERE keyword IS NOT NULL
+        """)
+        self._index_keyword_table()
+
+    def _index_keyword_table(self):
+        kt = self.keyword_table
+        self.conn.execute(f"CREATE INDEX {kt}_keyword_idx ON {kt} (keyword)")
+        self.conn.execute(f"CREATE INDEX {kt}_doc_id_idx ON {kt} (doc_id)")
+
+    def _ensure_source_table(self):
+        """Create the ``(source, doc_id)`` registry table if it is missing.
+
+        Like the keyword postings, a new registry is backfilled from the
+        ``source`` recorded in each document's metadata, so existing
+        collections can have their sources replaced without re-ingestion.
+        """
+        exists = self.conn.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+            [self.source_table],
+        ).fetchone()[0]
+        if exists:
+            return
+        st = self.source_table
+        self.conn.execute(
+            f"CREATE TABLE {st} (source VARCHAR NOT NULL, doc_id VARCHAR NOT NULL)"
+        )
+        self.conn.execute(f"""
+            INSERT INTO {st}
+            SELECT DISTINCT json_extract_string(metadata, '$.source'), id
+            FROM {self.collection_name}
+            WHERE json_extract_string(metadata, '$.source') IS NOT NULL
+        """)
+        self._index_source_table()
+
+    def _index_source_table(self):
+        st = self.source_table
+        self.conn.execute(f"CREATE INDEX {st}_source_idx ON {st} (source)")
+        self.conn.execute(f"CREATE INDEX {st}_doc_id_idx ON {st} (doc_id)")
+
+    def _table_columns(self) -> Dict[str, str]:
+        """Return the column names and types of the collection table.
+
+        :return: Mapping of column name to DuckDB type, empty if the table is missing.
+        :rtype: Dict[str, str]
+        """
+        rows = self.conn.execute(
+            "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = ?",
+            [self.collection_name],
+        ).fetchall()
+        return {name: data_type for name, data_type in rows}
+
+    def _create_table(self, table_name: str, dimension: int, with_index: bool = True):
+        """Create a collection table with a fixed-width embedding column.
+
+        DuckDB cannot update array columns in place and checks unique
+        constraints eagerly inside a transaction, so ``id`` carries a plain
+        index instead of a primary key and upserts are delete-then-insert.
+
+        :param table_name: Name of the table to create.
+        :type table_name: str
+        :param dimension: Number of floats per embedding.
+        :type dimension: int
+        :param with_index: Create the ``id`` index; tables that will be
+                           renamed must not have one yet.
+        :type with_index: bool
         """
-        # Table schema: id, content, embedding (JSON), metadata (JSON), keyword0...keyword9
         cols = ", ".join([f"keyword{i} VARCHAR" for i in range(10)])
         self.conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {self.collection_name} (
-                id VARCHAR PRIMARY KEY,
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                id VARCHAR NOT NULL,
                 content TEXT,
-                embedding JSON,
+                embedding FLOAT[{dimension}],
                 metadata JSON,
                 {cols}
             )
         """)
+        if not with_index:
+            return
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table_name}_id_idx ON {table_name} (id)"
+        )
+        self.dimension = dimension
+
+    def _migrate_json_embeddings(self):
+        """Convert a legacy collection with JSON embeddings to FLOAT[N] storage.
 
-    def add_documents(self, documents: List[Dict[str, Any]]):
+        The dimension is taken from the stored vectors. Rows whose embedding
+        does not match it cannot be ranked and are dropped with a warning.
+        """
+        logger = logging.getLogger(__name__)
+        name = self.collection_name
+        row = self.conn.execute(
+            f"SELECT json_array_length(embedding) FROM {name} WHERE embedding IS NOT NULL LIMIT 1"
+        ).fetchone()
+        dimension = row[0] if row else self.dimension
+        logger.info(
+            f"🔄 [DuckDBVectorStore] Migrating '{name}' embeddings from JSON to FLOAT[{dimension}]"
+        )
+        cols = ", ".join([f"keyword{i}" for i in range(10)])
+        with self.connections.transaction():
+            total = self.conn.execute(f"SELECT count(*) FROM {name}").fetchone()[0]
+            self.conn.execute(f"ALTER TABLE {name} RENAME TO {name}_legacy")
+            if dimension is not None:
+                self._create_table(name, dimension)
+                self.conn.execute(f"""
+                    INSERT INTO {name} (id, content, embedding, metadata, {cols})
+                    SELECT id, content,
+                           CAST(CAST(embedding AS FLOAT[]) AS FLOAT[{dimension}]),
+                           metadata, {cols}
+                    FROM {name}_legacy
+                    WHERE json_array_length(embedding) = {dimension}
+                """)
+            self.conn.execute(f"DROP TABLE {name}_legacy")
+        self.connections.checkpoint()
+        migrated = self.conn.execute(f"SELECT count(*) FROM {name}").fetchone()[0]
+        if migrated < total:
+            logger.warning(
+                f"⚠️ [DuckDBVectorStore] Dropped {total - migrated} rows from '{name}' with mismatched embeddings"
+            )
+        logger.info(
+            f"✅ [DuckDBVectorStore] Migrated {migrated} rows in '{name}' to FLOAT[{dimension}]"
+        )
+
+    def add_documents(self, documents: List[Dict[str, Any]]) -> int:
         """Add documents to the vector store.
 
+        Contents are embedded in batches through ``embed_documents`` (see
+        :meth:`_embed_contents`). Documents whose batch still fails after
+        retries are skipped and logged; the rest are written in one transaction.
+
         :param documents: List of document dictionaries with keys:
-                         - id: Document identifier (optional, auto-generated if missing)
+                         - id: Document identifier (optional, derived from the
+                           content and ``metadata["source"]`` if missing)
                          - content: Document text content
                          - metadata: Document metadata dictionary
                          - keywords: List of keywords for filtering (stored in metadata)
         :type documents: List[Dict[str, Any]]
+        :return: Number of documents written.
+        :rtype: int
+        :raises RuntimeError: If no document could be embedded.
+        """
+        if not documents:
+            return 0
+        embeddings = self._embed_contents([doc["content"] for doc in documents])
+        return self.add_embedded_documents(documents, embeddings)
+
+    def add_embedded_documents(
+        self, documents: List[Dict[str, Any]], embeddings: List[Optional[Any]]
+    ) -> int:
+        """Write documents whose embeddings were computed by the caller.
+
+        :param documents: Document dictionaries, as for :meth:`add_documents`.
+        :type documents: List[Dict[str, Any]]
+        :param embeddings: One embedding per document; None skips the document.
+        :type embeddings: List[Optional[Any]]
+        :return: Number of documents written.
+        :rtype: int
+        :raises RuntimeError: If every embedding is None.
         """
         # Each document: {id, content, metadata, keywords}
         to_insert = []
-        for doc in documents:
-            doc_id = doc.get("id") or str(hash(doc["content"]))
+        doc_keywords = []
+        doc_sources = []
+        for doc, embedding in zip(documents, embeddings):
+            if embedding is None:
+                continue
             content = doc["content"]
             metadata = doc.get("metadata", {})
-            keywords = metadata.get("keywords", [])
-            # Pad keywords to 10
+            source = metadata.get("source")
+            doc_id = doc.get("id") or stable_document_id(content, source)
+            keywords = [kw for kw in metadata.get("keywords", []) if kw]
+            # The first 10 keywords also fill the legacy keyword columns
             kw_cols = [keywords[i] if i < len(keywords) else None for i in range(10)]
-            # Compute embedding
-            embedding = self.embedding.embed_query(content)
             to_insert.append(
-                (doc_id, content, json.dumps(embedding), json.dumps(metadata), *kw_cols)
+                (doc_id, content, embedding, json.dumps(metadata), *kw_cols)
             )
-        cols = ", ".join([f"keyword{i}" for i in range(10)])
-        placeholders = ", ".join(["?"] * (4 + 10))
-        self.conn.executemany(
-            f"INSERT OR REPLACE INTO {self.collection_name} (id, content, embedding, metadata, {cols}) VALUES ({placeholders})",
-            to_insert,
+            doc_keywords.append(list(dict.fromkeys(keywords)))
+            doc_sources.append(str(source) if source else None)
+        if not to_insert:
+            raise RuntimeError(
+                f"Embedding failed for all {len(documents)} documents in '{self.collection_name}'"
+            )
+        # Embedding above ran without the write lock, so queries and other
+        # batches only wait for the DuckDB write itself
+        with self.connections.write():
+            self._write_rows(to_insert, doc_keywords, doc_sources)
+        return len(to_insert)
+
+    def _embed_contents(self, contents: List[str]) -> List[Optional[List[float]]]:
+        """Embed texts in token-budgeted batches on a bounded thread pool.
+
+        Texts already in the persistent embedding cache are served from it
+        and only the remaining unique texts are sent to the API. Each batch is
+        retried with exponential backoff. A batch that still fails yields None
+        for its texts so the other batches are kept.
+
+        :param contents: Texts to embed.
+        :type contents: List[str]
+        :return: One embedding per text, or None where its batch failed.
+        :rtype: List[Optional[List[float]]]
+        """
+        logger = logging.getLogger(__name__)
+        results: List[Optional[List[float]]] = [None] * len(contents)
+        if self.embedding_cache is not None:
+            results = self.embedding_cache.get_many(self._cache_model, contents)
+        # Embed each distinct missing text once
+        pending: Dict[str, List[int]] = {}
+        for i, (text, cached) in enumerate(zip(contents, results)):
+            if cached is None:
+                pending.setdefault(text, []).append(i)
+        if not pending:
+            return results
+        texts_to_embed = list(pending)
+        batches = _plan_embedding_batches(
+            texts_to_embed, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_MAX_TOKENS
+        )
+
+        def embed_batch(indices: List[int]) -> List[List[float]]:
+            texts = [texts_to_embed[i] for i in indices]
+            for attempt in range(EMBEDDING_MAX_RETRIES + 1):
+                try:
+                    return self.embedding.embed_documents(texts, chunk_size=len(texts))
+                except Exception as e:
+                    if attempt == EMBEDDING_MAX_RETRIES:
+                        raise
+                    delay = EMBEDDING_RETRY_BACKOFF * (2**attempt)
+                    logger.warning(
+                        f"Embedding batch of {len(texts)} failed ({e}), retrying in {delay:.1f}s"
+                    )
+                    time.sleep(delay)
+
+        start = time.perf_counter()
+        embedded_texts: List[str] = []
+        embedded_vectors: List[List[float]] = []
+        workers = max(1, min(EMBEDDING_MAX_CONCURRENCY, len(batches)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(embed_batch, b): b for b in batches}
+            for future in concurrent.futures.as_completed(futures):
+                indices = futures[future]
+                try:
+                    vectors = future.result()
+                except Exception as e:
+                    logger.error(
+                        f"❌ Embedding batch of {len(indices)} documents for '{self.collection_name}' failed: {e}"
+                    )
+                    continue
+                for i, vector in zip(indices, vectors):
+                    text = texts_to_embed[i]
+                    for position in pending[text]:
+                        results[position] = vector
+                    embedded_texts.append(text)
+                    embedded_vectors.append(vector)
+        perf_monitor.record_throughput(
+            f"embedding_{self.collection_name}",
+            len(embedded_texts),
+            time.perf_counter() - start,
+        )
+        if self.embedding_cache is not None and embedded_texts:
+            try:
+                self.embedding_cache.put_many(
+                    self._cache_model, embedded_texts, embedded_vectors
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to write embedding cache: {e}")
+        return results
+
+    def _embed_query(self, query_text: str) -> List[float]:
+        """Embed a query through the in-process LRU query cache.
+
+        Concurrent calls with the same text share a single embedding request.
+
+        :param query_text: The query text.
+        :type query_text: str
+        :return: The query embedding.
+        :rtype: List[float]
+        """
+        return self.query_cache.get_or_compute(
+            query_text, lambda: self._embed_query_uncached(query_text)
+        )
+
+    def _embed_query_uncached(self, query_text: str) -> List[float]:
+        """Embed a query, consulting the persistent embedding cache first.
+
+        :param query_text: The query text.
+        :type query_text: str
+        :return: The query embedding.
+        :rtype: List[float]
+        """
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(self._cache_model, query_text)
+            if cached is not None:
+                return cached.tolist()
+        query_emb = self.embedding.embed_query(query_text)
+        if self.embedding_cache is not None:
+            try:
+                self.embedding_cache.put(self._cache_model, query_text, query_emb)
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    f"⚠️ Failed to write embedding cache: {e}"
+                )
+        return query_emb
+
+    def _embed_queries(self, query_texts: List[str]) -> List[List[float]]:
+        """Embed several queries with at most one embedding request.
+
+        Texts already in the LRU or persistent cache are not re-embedded.
+
+        :param query_texts: Query texts.
+        :type query_texts: List[str]
+        :return: One embedding per text, in order.
+        :rtype: List[List[float]]
+        :raises RuntimeError: If a query could not be embedded.
+        """
+
+        def embed_missing(texts: List[str]) -> List[List[float]]:
+            embeddings = self._embed_contents(texts)
+            if any(emb is None for emb in embeddings):
+                raise RuntimeError(f"Embedding failed for {len(texts)} queries")
+            return [np.asarray(emb, dtype=np.float32).tolist() for emb in embeddings]
+
+        found = self.query_cache.get_or_compute_many(query_texts, embed_missing)
+        return [found[text] for text in query_texts]
+
+    async def aembed_query(self, query_text: str) -> List[float]:
+        """Embed a query ahead of a search, which then reuses it from the cache.
+
+        :param query_text: The query text.
+        :type query_text: str
+        :return: The query embedding.
+        :rtype: List[float]
+        """
+        return await self._aembed_query(query_text)
+
+    async def _aembed_query(self, query_text: str) -> List[float]:
+        """Async version of :meth:`_embed_query`, sharing its LRU cache.
+
+        :param query_text: The query text.
+        :type query_text: str
+        :return: The query embedding.
+        :rtype: List[float]
+        """
+        return await self.query_cache.aget_or_compute(
+            query_text, lambda: self._aembed_query_uncached(query_text)
         )
-        self.conn.commit()
+
+    async def _aembed_query_uncached(self, query_text: str) -> List[float]:
+        """Embed a query with the async client, consulting the persistent cache first.
+
+        :param query_text: The query text.
+        :type query_text: str
+        :return: The query embedding.
+        :rtype: List[float]
+        """
+        loop = asyncio.get_running_loop()
+        cache = self.embedding_cache
+        if cache is not None:
+            cached = await loop.run_in_executor(
+                get_query_executor(), cache.get, self._cache_model, query_text
+            )
+            if cached is not None:
+                return cached.tolist()
+        query_emb = await self.embedding.aembed_query(query_text)
+        if cache is not None:
+            try:
+                await loop.run_in_executor(
+                    get_query_executor(),
+                    cache.put,
+                    self._cache_model,
+                    query_text,
+                    query_emb,
+                )
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    f"⚠️ Failed to write embedding cache: {e}"
+                )
+        return query_emb
+
+    def _write_rows(
+        self,
+        to_insert: List[tuple],
+        doc_keywords: List[List[str]],
+        doc_sources: List[Optional[str]],
+    ):
+        """Upsert embedded rows and update the in-process index.
+
+        :param to_insert: Rows of (id, content, embedding, metadata, keyword0..9).
+        :type to_insert: List[tuple]
+        :param doc_keywords: Full, de-duplicated keyword list for each row.
+        :type doc_keywords: List[List[str]]
+        :param doc_sources: Source registered for each row, or None.
+        :type doc_sources: List[Optional[str]]
+        """
+        if self.dimension is None:
+            self._create_table(self.collection_name, len(to_insert[0][2]))
+            self._ensure_keyword_table()
+            self._ensure_source_table()
+            self._write_meta(
+                embedding_model=self.embedding_model, dimension=self.dimension
+            )
+        to_insert = [
+            (row[0], row[1], self._fit_dimension(row[2]), *row[3:]) for row in to_insert
+        ]
+        ids = [row[0] for row in to_insert]
+        with self.connections.transaction() as conn:
+            conn.execute(
+                f"DELETE FROM {self.collection_name} WHERE id IN (SELECT unnest(?::VARCHAR[]))",
+                [ids],
+            )
+            conn.execute(
+                f"DELETE FROM {self.keyword_table} WHERE doc_id IN (SELECT unnest(?::VARCHAR[]))",
+                [ids],
+            )
+            conn.execute(
+                f"DELETE FROM {self.source_table} WHERE doc_id IN (SELECT unnest(?::VARCHAR[]))",
+                [ids],
+            )
+            self._insert_rows(to_insert)
+            self._insert_postings(ids, doc_keywords)
+            registered = [(src, i) for src, i in zip(doc_sources, ids) if src]
+            if registered:
+                conn.execute(
+                    f"INSERT INTO {self.source_table} SELECT unnest(?::VARCHAR[]), unnest(?::VARCHAR[])",
+                    [[src for src, _ in registered], [i for _, i in registered]],
+                )
+            if self._reindex is not None:
+                # Keep the table being built by start_reindex() current
+                conn.execute(
+                    f"DELETE FROM {self._reindex['table']} WHERE id IN (SELECT unnest(?::VARCHAR[]))",
+                    [ids],
+                )
+                self._copy_to_reindex_table(
+                    "id IN (SELECT unnest(?::VARCHAR[]))", [ids]
+                )
+        # DuckDB FTS indexes are static; rebuild once the writes pause
+        self._mark_fts_stale()
+        self._content_generation += 1
+        if self.index_backend != "duckdb":
+            if self.index is None:
+                if self._index_pending:
+                    # load_index() will read these rows from DuckDB
+                    return
+                self.index = self._new_index()
+            self.index.add(
+                ids,
+                np.array([row[2] for row in to_insert], dtype=np.float32),
+                doc_keywords,
+            )
+
+    def _insert_rows(self, rows: List[tuple]):
+        """Bulk insert rows of (id, content, embedding, metadata, keyword0..9).
+
+        Binding FLOAT[N] parameters row by row through ``executemany`` costs
+        hundreds of milliseconds per row, so the batch is registered as a
+        DataFrame and inserted with a single ``INSERT ... SELECT``.
+
+        :param rows: Rows to insert, in table column order.
+        :type rows: List[tuple]
+        """
+        import pandas as pd
+
+        kw_names = [f"keyword{i}" for i in range(10)]
+        columns = ["id", "content", "embedding", "metadata", *kw_names]
+        frame = pd.DataFrame.from_records(rows, columns=columns)
+        frame["embedding"] = list(
+            np.asarray(list(frame["embedding"]), dtype=np.float32)
+        )
+        view = f"{self.collection_name}_batch_{threading.get_ident()}"
+        self.conn.register(view, frame)
+        try:
+            cols = ", ".join(columns)
+            self.conn.execute(f"""
+                INSERT INTO {self.collection_name} ({cols})
+                SELECT id, content, CAST(embedding AS FLOAT[{self.dimension}]),
+                       metadata, {", ".join(kw_names)}
+                FROM {view}
+            """)
+        finally:
+            self.conn.unregister(view)
+
+    def _insert_postings(self, ids: List[str], doc_keywords: List[List[str]]):
+        """Bulk insert ``(keyword, doc_id)`` postings for the given documents.
+
+        :param ids: Document ids.
+        :type ids: List[str]
+        :param doc_keywords: De-duplicated keywords for each document.
+        :type doc_keywords: List[List[str]]
+        """
+        import pandas as pd
+
+        postings = [
+            (kw, doc_id) for doc_id, kws in zip(ids, doc_keywords) for kw in kws
+        ]
+        if not postings:
+            return
+        frame = pd.DataFrame.from_records(postings, columns=["keyword", "doc_id"])
+        view = f"{self.keyword_table}_batch_{threading.get_ident()}"
+        self.conn.register(view, frame)
+        try:
+            self.conn.execute(
+                f"INSERT INTO {self.keyword_table} SELECT keyword, doc_id FROM {view}"
+            )
+        finally:
+            self.conn.unregister(view)
+
+    def delete_source(self, source: str, keep_ids: Optional[List[str]] = None) -> int:
+        """Delete the documents registered for a source in one transaction.
+
+        Re-ingesting a source upserts its documents under their stable ids;
+        passing those ids as ``keep_ids`` then removes only the stale ones.
+        Documents that another source also registers are kept.
+
+        :param source: Source to delete, e.g. a file path.
+        :type source: str
+        :param keep_ids: Ids of the source's documents to keep.
+        :type keep_ids: Optional[List[str]]
+        :return: Number of documents deleted.
+        :rtype: int
+        """
+        if self.dimension is None:
+            return 0
+        st = self.source_table
+        with self.connections.transaction() as conn:
+            ids = [
+                row[0]
+                for row in conn.execute(
+                    f"""
+                    SELECT doc_id FROM {st}
+                    WHERE source = ?
+                      AND doc_id NOT IN (SELECT unnest(?::VARCHAR[]))
+                      AND doc_id NOT IN (SELECT doc_id FROM {st} WHERE source <> ?)
+                    """,
+                    [source, list(keep_ids or []), source],
+                ).fetchall()
+            ]
+            if ids:
+                tables = [(self.collection_name, "id"), (self.keyword_table, "doc_id")]
+                if self._reindex is not None:
+                    tables.append((self._reindex["table"], "id"))
+                for table, column in tables:
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE {column} IN (SELECT unnest(?::VARCHAR[]))",
+                        [ids],
+                    )
+            conn.execute(
+                f"DELETE FROM {st} WHERE source = ? AND doc_id NOT IN (SELECT unnest(?::VARCHAR[]))",
+                [source, list(keep_ids or [])],
+            )
+        if ids:
+            self._mark_fts_stale()
+            self._content_generation += 1
+            if self.index is not None:
+                self.index.remove(ids)
+            logging.getLogger(__name__).info(
+                f"🗑️ [DuckDBVectorStore] Deleted {len(ids)} documents of '{source}' from '{self.collection_name}'"
+            )
+        return len(ids)
+
+    def sources(self) -> Dict[str, int]:
+        """Return the number of documents registered for each source.
+
+        :return: Mapping of source to document count.
+        :rtype: Dict[str, int]
+        """
+        if self.dimension is None:
+            return {}
+        with self.connections.read() as conn:
+            rows = conn.execute(
+                f"SELECT source, count(*) FROM {self.source_table} GROUP BY source"
+            ).fetchall()
+        return dict(rows)
 
     def query(
-        self, query_text: str, k: int = 5, keyword_filter: Optional[List[str]] = None
+        self,
+        query_text: str,
+        k: int = 5,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
         """Query the vector store for similar documents.
 
+        Similarity is computed inside DuckDB with ``array_cosine_similarity``
+        and only the top-k rows are returned to Python. With a keyword filter,
+        candidates come from a join on the keyword posting table and are
+        ranked first by how many of the keywords they carry, then by similarity.
+
+        In ``"hybrid"`` mode a BM25 search over ``content`` runs alongside the
+        vector search and the two rankings are merged with weighted reciprocal
+        rank fusion; results then also carry the fused ``score``.
+
         :param query_text: The query text to search for.
         :type query_text: str
         :param k: Number of top results to return.
         :type k: int
         :param keyword_filter: Optional list of keywords to filter results.
         :type keyword_filter: Optional[List[str]]
+        :param mode: ``"vector"`` or ``"hybrid"``; defaults to the store's ``search_mode``.
+        :type mode: Optional[str]
+        :param lexical_weight: Weight of the BM25 ranking in hybrid fusion (0-1);
+                               defaults to ``HYBRID_LEXICAL_WEIGHT``.
+        :type lexical_weight: Optional[float]
         :return: List of document dictionaries with similarity scores.
         :rtype: List[Dict[str, Any]]
         """
+        if self.dimension is None:
+            return []
         # Compute embedding for query
-        query_emb = np.array(self.embedding.embed_query(query_text))
-        # Build SQL filter for keywords
-        where = ""
-        params = []
+        query_emb = self._embed_query(query_text)
+        return self.query_by_vector(
+            query_text, query_emb, k, keyword_filter, mode, lexical_weight
+        )
+
+    def query_by_vector(
+        self,
+        query_text: str,
+        query_emb: List[float],
+        k: int = 5,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run :meth:`query` with an embedding computed by the caller.
+
+        :param query_text: The query text, used by the BM25 side of hybrid mode.
+        :type query_text: str
+        :param query_emb: Embedding of ``query_text``.
+        :type query_emb: List[float]
+        :param k: Number of top results to return.
+        :type k: int
+        :param keyword_filter: Optional list of keywords to filter results.
+        :type keyword_filter: Optional[List[str]]
+        :param mode: ``"vector"`` or ``"hybrid"``; defaults to the store's ``search_mode``.
+        :type mode: Optional[str]
+        :param lexical_weight: Weight of the BM25 ranking in hybrid fusion (0-1).
+        :type lexical_weight: Optional[float]
+        :return: List of document dictionaries with similarity scores.
+        :rtype: List[Dict[str, Any]]
+        """
+        if self.dimension is None:
+            return []
+        hybrid = (mode or self.search_mode) == "hybrid" and self._fts_ready()
+        with self.connections.read() as conn:
+            if not hybrid:
+                return self._search(query_emb, k, keyword_filter, conn)
+            n = k * HYBRID_CANDIDATE_FACTOR
+            lexical = get_query_executor().submit(
+                self._with_reader,
+                self._lexical_search,
+                query_text,
+                n,
+                keyword_filter,
+                nested=True,
+            )
+            vector = self._search(query_emb, n, keyword_filter, conn)
+            try:
+                lexical_ids = lexical.result()
+            except duckdb.Error as e:
+                return self._lexical_failed(e, vector, k)
+            return self._fuse(query_emb, k, vector, lexical_ids, lexical_weight, conn)
+
+    async def aquery(
+        self,
+        query_text: str,
+        k: int = 5,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of :meth:`query`.
+
+        The query is embedded with the async OpenAI client and the search runs
+        on the shared DuckDB query pool (see :func:`get_query_executor`) with a
+        per-thread cursor, so concurrent retrievals overlap instead of
+        blocking the event loop.
+
+        :param query_text: The query text to search for.
+        :type query_text: str
+        :param k: Number of top results to return.
+        :type k: int
+        :param keyword_filter: Optional list of keywords to filter results.
+        :type keyword_filter: Optional[List[str]]
+        :param mode: ``"vector"`` or ``"hybrid"``; defaults to the store's ``search_mode``.
+        :type mode: Optional[str]
+        :param lexical_weight: Weight of the BM25 ranking in hybrid fusion (0-1).
+        :type lexical_weight: Optional[float]
+        :return: List of document dictionaries with similarity scores.
+        :rtype: List[Dict[str, Any]]
+        """
+        if self.dimension is None:
+            return []
+        query_emb = await self._aembed_query(query_text)
+        loop = asyncio.get_running_loop()
+        executor = get_query_executor()
+        hybrid = (mode or self.search_mode) == "hybrid" and await loop.run_in_executor(
+            executor, self._fts_ready
+        )
+        if not hybrid:
+            return await loop.run_in_executor(
+                executor, self._with_reader, self._search, query_emb, k, keyword_filter
+            )
+        n = k * HYBRID_CANDIDATE_FACTOR
+        vector, lexical = await asyncio.gather(
+            loop.run_in_executor(
+                executor, self._with_reader, self._search, query_emb, n, keyword_filter
+            ),
+            loop.run_in_executor(
+                executor,
+                self._with_reader,
+                self._lexical_search,
+                query_text,
+                n,
+                keyword_filter,
+            ),
+            return_exceptions=True,
+        )
+        if isinstance(vector, BaseException):
+            raise vector
+        if isinstance(lexical, duckdb.Error):
+            return self._lexical_failed(lexical, vector, k)
+        if isinstance(lexical, BaseException):
+            raise lexical
+        return await loop.run_in_executor(
+            executor,
+            self._with_reader,
+            self._fuse,
+            query_emb,
+            k,
+            vector,
+            lexical,
+            lexical_weight,
+        )
+
+    def max_marginal_relevance_search(
+        self,
+        query_text: str,
+        k: int = 5,
+        fetch_k: int = MMR_FETCH_K,
+        lambda_mult: float = MMR_LAMBDA,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return relevant but mutually diverse documents.
+
+        The top ``fetch_k`` results of :meth:`query` form the candidate pool;
+        :func:`_mmr_select` then drops near-duplicates such as overlapping
+        chunk windows in favour of documents that add new content.
+
+        :param query_text: The query text to search for.
+        :type query_text: str
+        :param k: Number of results to return.
+        :type k: int
+        :param fetch_k: Size of the candidate pool.
+        :type fetch_k: int
+        :param lambda_mult: Relevance/diversity trade-off in [0, 1].
+        :type lambda_mult: float
+        :param keyword_filter: Optional list of keywords to filter results.
+        :type keyword_filter: Optional[List[str]]
+        :param mode: ``"vector"`` or ``"hybrid"``; defaults to the store's ``search_mode``.
+        :type mode: Optional[str]
+        :param lexical_weight: Weight of the BM25 ranking in hybrid fusion (0-1).
+        :type lexical_weight: Optional[float]
+        :return: List of document dictionaries in MMR order.
+        :rtype: List[Dict[str, Any]]
+        """
+        if self.dimension is None:
+            return []
+        query_emb = self._embed_query(query_text)
+        candidates = self.query_by_vector(
+            query_text, query_emb, max(fetch_k, k), keyword_filter, mode, lexical_weight
+        )
+        vectors = self.get_embeddings([c["id"] for c in candidates])
+        return [candidates[i] for i in _mmr_select(query_emb, vectors, k, lambda_mult)]
+
+    async def amax_marginal_relevance_search(
+        self,
+        query_text: str,
+        k: int = 5,
+        fetch_k: int = MMR_FETCH_K,
+        lambda_mult: float = MMR_LAMBDA,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of :meth:`max_marginal_relevance_search`."""
+        candidates = await self.aquery(
+            query_text, max(fetch_k, k), keyword_filter, mode, lexical_weight
+        )
+        if not candidates:
+            return []
+        query_emb = await self._aembed_query(query_text)
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(
+            get_query_executor(),
+            self.get_embeddings,
+            [c["id"] for c in candidates],
+        )
+        return [candidates[i] for i in _mmr_select(query_emb, vectors, k, lambda_mult)]
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """Read stored embeddings for the given ids.
+
+        :param ids: Document identifiers.
+        :type ids: List[str]
+        :return: Matrix with one row per id, in the order of ``ids``; ids not
+                 in the collection get a zero row.
+        :rtype: np.ndarray
+        """
+        vectors = np.zeros((len(ids), self.dimension or 0), dtype=np.float32)
+        if not ids or self.dimension is None:
+            return vectors
+        with self.connections.read() as conn:
+            rows = conn.execute(
+                f"SELECT id, embedding FROM {self.collection_name} WHERE id IN (SELECT unnest(?::VARCHAR[]))",
+                [ids],
+            ).fetchnumpy()
+        position = {doc_id: i for i, doc_id in enumerate(ids)}
+        for doc_id, embedding in zip(rows["id"].tolist(), rows["embedding"]):
+            vectors[position[doc_id]] = embedding
+        return vectors
+
+    def query_many(
+        self,
+        query_texts: List[str],
+        k: int = 5,
+        keyword_filter: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve for several query variants at once and return their union.
+
+        All variants are embedded in one request and scored in one pass over
+        the embeddings (a matrix-matrix product in memory, or a single DuckDB
+        scan computing every variant's similarity). Each variant contributes
+        its top-k; documents found by several variants appear once, with their
+        best similarity, and the union is ranked by that similarity.
+
+        Keyword-filtered and hybrid queries keep their per-variant ranking and
+        only share the embedding request.
+
+        :param query_texts: Query variants, e.g. from a multi-query retriever.
+        :type query_texts: List[str]
+        :param k: Number of results per variant.
+        :type k: int
+        :param keyword_filter: Optional list of keywords to filter results.
+        :type keyword_filter: Optional[List[str]]
+        :return: Deduplicated document dictionaries with similarity scores.
+        :rtype: List[Dict[str, Any]]
+        """
+        query_texts = list(dict.fromkeys(query_texts))
+        if self.dimension is None or not query_texts:
+            return []
+        embeddings = self._embed_queries(query_texts)
+        rankings = self.rank_many_by_vectors(query_texts, embeddings, k, keyword_filter)
+        return self._fetch_hits(_union_rankings(rankings))
+
+    def rank_many_by_vectors(
+        self,
+        query_texts: List[str],
+        query_embs: List[List[float]],
+        k: int = 5,
+        keyword_filter: Optional[List[str]] = None,
+    ) -> List[List[tuple]]:
+        """Rank documents for pre-embedded query variants without loading rows.
+
+        :param query_texts: Query variants, used by hybrid mode.
+        :type query_texts: List[str]
+        :param query_embs: One embedding per variant.
+        :type query_embs: List[List[float]]
+        :param k: Number of results per variant.
+        :type k: int
+        :param keyword_filter: Optional list of keywords to filter results.
+        :type keyword_filter: Optional[List[str]]
+        :return: One ranked list of (id, similarity) pairs per variant.
+        :rtype: List[List[tuple]]
+        """
+        if self.dimension is None:
+            return [[] for _ in query_embs]
+        if keyword_filter or self.search_mode == "hybrid":
+            return [
+                [
+                    (r["id"], r["similarity"])
+                    for r in self.query_by_vector(text, emb, k, keyword_filter)
+                ]
+                for text, emb in zip(query_texts, query_embs)
+            ]
+        return self._with_reader(self._search_many, query_embs, k)
+
+    def _search_many(
+        self,
+        query_embs: List[List[float]],
+        k: int,
+        conn: duckdb.DuckDBPyConnection,
+    ) -> List[List[tuple]]:
+        """Rank documents for several embedded queries in one pass.
+
+        :param query_embs: Query embeddings.
+        :type query_embs: List[List[float]]
+        :param k: Number of results per query.
+        :type k: int
+        :param conn: DuckDB connection or cursor to read through.
+        :type conn: duckdb.DuckDBPyConnection
+        :return: One ranked list of (id, similarity) pairs per query.
+        :rtype: List[List[tuple]]
+        """
+        query_embs = [self._fit_dimension(emb) for emb in query_embs]
+        if self.index is None:
+            return self._rank_many_in_duckdb(query_embs, k, conn=conn)
+        matrix = np.asarray(query_embs, dtype=np.float32)
+        if self.index.exact_scores:
+            return self.index.search_many(matrix, k)
+        # Shortlist on the quantised vectors, re-rank at full precision
+        shortlists = self.index.search_many(matrix, k * VECTOR_RERANK_FACTOR)
+        candidate_ids = list({doc_id for s in shortlists for doc_id, _ in s})
+        if not candidate_ids:
+            return [[] for _ in query_embs]
+        return self._rank_many_in_duckdb(query_embs, k, candidate_ids, conn=conn)
+
+    def _rank_many_in_duckdb(
+        self,
+        query_embs: List[List[float]],
+        k: int,
+        candidate_ids: Optional[List[str]] = None,
+        conn: Optional[duckdb.DuckDBPyConnection] = None,
+    ) -> List[List[tuple]]:
+        """Rank rows for several queries with one scan of the embeddings.
+
+        Every query's similarity is computed per row in the same scan and
+        ``arg_max``/``max`` with a count keep each query's top-k.
+
+        :param query_embs: Query embeddings.
+        :type query_embs: List[List[float]]
+        :param k: Number of results per query.
+        :type k: int
+        :param candidate_ids: Restrict ranking to these ids.
+        :type candidate_ids: Optional[List[str]]
+        :param conn: Connection or cursor to use; defaults to this thread's read cursor.
+        :type conn: Optional[duckdb.DuckDBPyConnection]
+        :return: One ranked list of (id, similarity) pairs per query.
+        :rtype: List[List[tuple]]
+        """
+        if conn is None:
+            with self.connections.read() as conn:
+                return self._rank_many_in_duckdb(query_embs, k, candidate_ids, conn)
+        k = int(k)
+        similarities = ", ".join(
+            f"array_cosine_similarity(embedding, ?::FLOAT[{self.dimension}]) AS s{i}"
+            for i in range(len(query_embs))
+        )
+        top_k = ", ".join(
+            f"arg_max(id, s{i}, {k}) AS ids{i}, max(s{i}, {k}) AS sims{i}"
+            for i in range(len(query_embs))
+        )
+        params: List[Any] = list(query_embs)
+        restrict = ""
+        if candidate_ids is not None:
+            restrict = "WHERE id IN (SELECT unnest(?::VARCHAR[]))"
+            params.append(candidate_ids)
+        sql = f"""
+            SELECT {top_k}
+            FROM (SELECT id, {similarities} FROM {self.collection_name} {restrict})
+        """
+        # fetchall() consumes the result, so the read transaction ends here
+        (row,) = conn.execute(sql, params).fetchall()
+        return [
+            list(zip(row[2 * i] or [], row[2 * i + 1] or []))
+            for i in range(len(query_embs))
+        ]
+
+    def _search(
+        self,
+        query_emb: List[float],
+        k: int,
+        keyword_filter: Optional[List[str]],
+        conn: duckdb.DuckDBPyConnection,
+    ) -> List[Dict[str, Any]]:
+        """Rank documents for an embedded query.
+
+        :param query_emb: Query embedding.
+        :type query_emb: List[float]
+        :param k: Number of top results to return.
+        :type k: int
+        :param keyword_filter: Optional list of keywords to filter results.
+        :type keyword_filter: Optional[List[str]]
+        :param conn: DuckDB connection or cursor to read through.
+        :type conn: duckdb.DuckDBPyConnection
+        :return: List of document dictionaries with similarity scores.
+        :rtype: List[Dict[str, Any]]
+        """
+        # Fitted inside the read, where the width cannot change under it
+        query_emb = self._fit_dimension(query_emb)
+        if self.index is None:
+            return self._rank_in_duckdb(query_emb, k, keyword_filter, conn=conn)
+        if not self.index.exact_scores:
+            # Shortlist on the quantised vectors, re-rank at full precision
+            shortlist = self.index.search(
+                np.asarray(query_emb), k * VECTOR_RERANK_FACTOR, keyword_filter
+            )
+            if not shortlist:
+                return []
+            return self._rank_in_duckdb(
+                query_emb,
+                k,
+                keyword_filter,
+                [doc_id for doc_id, _ in shortlist],
+                conn=conn,
+            )
+        hits = self.index.search(np.asarray(query_emb), k, keyword_filter)
+        return self._fetch_hits(hits, conn=conn)
+
+    def _rank_in_duckdb(
+        self,
+        query_emb: List[float],
+        k: int,
+        keyword_filter: Optional[List[str]] = None,
+        candidate_ids: Optional[List[str]] = None,
+        conn: Optional[duckdb.DuckDBPyConnection] = None,
+    ) -> List[Dict[str, Any]]:
+        """Rank rows by full-precision cosine similarity inside DuckDB.
+
+        Ranking projects only ``id`` and ``embedding``; content and metadata
+        are fetched for the top-k ids in a second query.
+
+        :param query_emb: Query embedding.
+        :type query_emb: List[float]
+        :param k: Number of top results to return.
+        :type k: int
+        :param keyword_filter: Optional keywords; matching more of them ranks first.
+        :type keyword_filter: Optional[List[str]]
+        :param candidate_ids: Restrict ranking to these ids, e.g. a shortlist
+                              from a quantised index.
+        :type candidate_ids: Optional[List[str]]
+        :param conn: Connection or cursor to use; defaults to this thread's read cursor.
+        :type conn: Optional[duckdb.DuckDBPyConnection]
+        :return: List of document dictionaries with similarity scores.
+        :rtype: List[Dict[str, Any]]
+        """
+        if conn is None:
+            with self.connections.read() as conn:
+                return self._rank_in_duckdb(
+                    query_emb, k, keyword_filter, candidate_ids, conn
+                )
+        query_emb = self._fit_dimension(query_emb)
         if keyword_filter:
-            clauses = []
-            for i in range(10):
-                clauses.append(
-                    f"keyword{i} IN ({', '.join(['?'] * len(keyword_filter))})"
+            restrict = ""
+            params: List[Any] = [list(dict.fromkeys(keyword_filter))]
+            if candidate_ids is not None:
+                restrict = "AND doc_id IN (SELECT unnest(?::VARCHAR[]))"
+                params.append(candidate_ids)
+            sql = f"""
+                WITH matches AS (
+                    SELECT doc_id, count(*) AS match_count
+                    FROM {self.keyword_table}
+                    WHERE keyword IN (SELECT unnest(?::VARCHAR[])) {restrict}
+                    GROUP BY doc_id
+                )
+                SELECT c.id,
+                       array_cosine_similarity(c.embedding, ?::FLOAT[{self.dimension}]) AS similarity
+                FROM matches m JOIN {self.collection_name} c ON c.id = m.doc_id
+                ORDER BY m.match_count DESC, similarity DESC
+                LIMIT ?
+            """
+            params += [query_emb, k]
+        else:
+            restrict = ""
+            params = [query_emb]
+            if candidate_ids is not None:
+                restrict = "WHERE id IN (SELECT unnest(?::VARCHAR[]))"
+                params.append(candidate_ids)
+            sql = f"""
+                SELECT id,
+                       array_cosine_similarity(embedding, ?::FLOAT[{self.dimension}]) AS similarity
+                FROM {self.collection_name} {restrict}
+                ORDER BY similarity DESC
+                LIMIT ?
+            """
+            params.append(k)
+        # Phase 1 scores on id and embedding only; content and metadata are
+        # read for the k winners alone in _fetch_hits
+        top = conn.execute(sql, params).fetchnumpy()
+        hits = list(zip(top["id"].tolist(), top["similarity"].tolist()))
+        return self._fetch_hits(hits, conn=conn)
+
+    def load_fts(self, install: bool = False) -> bool:
+        """Load the DuckDB FTS extension and check for an existing BM25 index.
+
+        ``INSTALL fts`` downloads the extension, so it only runs when
+        ``install`` is set: when a hybrid store opens and in the maintenance
+        job. The query path only loads an extension that is already installed.
+
+        :param install: Install the extension if it cannot be loaded.
+        :type install: bool
+        :return: True if the extension is loaded.
+        :rtype: bool
+        """
+        logger = logging.getLogger(__name__)
+        with self.connections.write():
+            try:
+                try:
+                    self.conn.execute("LOAD fts")
+                except duckdb.Error:
+                    if not install:
+                        raise
+                    self.conn.execute("INSTALL fts")
+                    self.conn.execute("LOAD fts")
+                self._fts_built = bool(
+                    self.conn.execute(
+                        "SELECT count(*) FROM information_schema.schemata WHERE schema_name = ?",
+                        [f"fts_main_{self.collection_name}"],
+                    ).fetchall()[0][0]
+                )
+                if not self._content_generation:
+                    # An index built by an earlier process is current until
+                    # this one writes
+                    self._fts_dirty = not self._fts_built
+                self._fts_available = True
+            except duckdb.Error as e:
+                logger.warning(
+                    f"⚠️ [DuckDBVectorStore] DuckDB FTS extension unavailable, hybrid search disabled: {e}"
+                )
+                self._fts_available = False
+            return self._fts_available
+
+    def _fts_ready(self) -> bool:
+        """Check whether a hybrid query can use the BM25 index, without building it.
+
+        A stale index keeps serving until the background rebuild replaces
+        it; documents written since then are only found by the vector side.
+        Without any index the query answers from vectors alone and a rebuild
+        is scheduled.
+
+        :return: True if a BM25 index exists to search.
+        :rtype: bool
+        """
+        if self._fts_available is None:
+            self.load_fts()
+        if not self._fts_available:
+            return False
+        if self._fts_dirty:
+            self._schedule_fts_rebuild(restart=False)
+        return self._fts_built
+
+    def _mark_fts_stale(self, dropped: bool = False) -> None:
+        """Flag the BM25 index as stale after a write and schedule its rebuild.
+
+        :param dropped: The write also dropped the index, so hybrid queries
+                        answer from vectors alone until it is rebuilt.
+        :type dropped: bool
+        """
+        self._fts_dirty = True
+        if dropped:
+            self._fts_built = False
+        if self._fts_available:
+            self._schedule_fts_rebuild()
+
+    def _schedule_fts_rebuild(self, restart: bool = True) -> None:
+        """Rebuild the BM25 index on a background timer.
+
+        Ingestion writes many batches and each rebuild indexes the whole
+        collection, so every write restarts the timer and the rebuild runs
+        once writes have paused for ``HYBRID_FTS_REBUILD_DELAY`` seconds.
+
+        :param restart: Restart a pending timer; queries only start one if
+                        none is pending.
+        :type restart: bool
+        """
+        with self._fts_timer_lock:
+            pending = self._fts_timer is not None and self._fts_timer.is_alive()
+            if pending and not restart:
+                return
+            if pending:
+                self._fts_timer.cancel()
+            timer = threading.Timer(HYBRID_FTS_REBUILD_DELAY, self._rebuild_fts)
+            timer.name = f"fts-{self.collection_name}"
+            timer.daemon = True
+            self._fts_timer = timer
+            timer.start()
+
+    def _rebuild_fts(self) -> None:
+        """Timer target: run :meth:`_ensure_fts`, logging instead of raising."""
+        try:
+            self._ensure_fts()
+        except Exception as e:
+            logging.getLogger(__name__).error(
+                f"❌ [DuckDBVectorStore] BM25 rebuild for '{self.collection_name}' failed: {e}"
+            )
+
+    def _ensure_fts(self) -> bool:
+        """Make sure the BM25 index is loaded and current, rebuilding it if stale.
+
+        The rebuild holds the writer lock for a full pass over the collection,
+        so it runs from the background timer and the maintenance job, never
+        from a query.
+
+        :return: True if hybrid search can run; False if the extension is
+                 unavailable, in which case queries fall back to vector search.
+        :rtype: bool
+        """
+        logger = logging.getLogger(__name__)
+        with self.connections.write():
+            if self._fts_available is None:
+                self.load_fts()
+            if self._fts_available and self._fts_dirty:
+                start = time.perf_counter()
+                try:
+                    # Keep digits so document and policy codes stay searchable
+                    self.conn.execute(f"""
+                        PRAGMA create_fts_index(
+                            '{self.collection_name}', 'id', 'content',
+                            stemmer = 'porter', stopwords = 'english',
+                            ignore = '(\\.|[^a-z0-9])+', overwrite = 1
+                        )
+                    """)
+                except duckdb.Error as e:
+                    # Queries keep the previous index; the next write retries
+                    logger.error(
+                        f"❌ [DuckDBVectorStore] Failed to build BM25 index for '{self.collection_name}': {e}"
+                    )
+                    return False
+                self._fts_dirty = False
+                self._fts_built = True
+                logger.info(
+                    f"🔤 [DuckDBVectorStore] Built BM25 index for '{self.collection_name}' "
+                    f"in {time.perf_counter() - start:.2f}s"
+                )
+            return self._fts_available
+
+    def rebuild_fts(self) -> bool:
+        """Bring the BM25 index up to date now, installing the extension if needed.
+
+        Used by the maintenance job after :meth:`compact`; the extension is
+        installed again if it was unavailable when the store opened.
+
+        :return: True if hybrid search can run.
+        :rtype: bool
+        """
+        if self._fts_available is not True:
+            self.load_fts(install=True)
+        return self._ensure_fts()
+
+    def _with_reader(
+        self, method: Callable[..., Any], *args: Any, nested: bool = False
+    ) -> Any:
+        """Call ``method(*args, conn)`` with this thread's cursor inside a read.
+
+        Used to run a search step on another thread of the query pool; pass
+        ``nested`` when the submitting thread is itself inside a read.
+        """
+        with self.connections.read(nested=nested) as conn:
+            return method(*args, conn)
+
+    def _lexical_failed(
+        self, error: Exception, vector_results: List[Dict[str, Any]], k: int
+    ) -> List[Dict[str, Any]]:
+        """Answer a hybrid query from its vector side when BM25 search fails.
+
+        A BM25 search can fail while a rebuild replaces the index.
+        """
+        logging.getLogger(__name__).warning(
+            f"⚠️ [DuckDBVectorStore] BM25 search on '{self.collection_name}' failed, "
+            f"using vector results: {error}"
+        )
+        return vector_results[:k]
+
+    def _lexical_search(
+        self,
+        query_text: str,
+        n: int,
+        keyword_filter: Optional[List[str]],
+        conn: duckdb.DuckDBPyConnection,
+    ) -> List[str]:
+        """Rank documents by BM25 score against ``query_text``.
+
+        :param query_text: The query text.
+        :type query_text: str
+        :param n: Number of ids to return.
+        :type n: int
+        :param keyword_filter: Optional keywords documents must carry.
+        :type keyword_filter: Optional[List[str]]
+        :param conn: DuckDB connection or cursor to read through.
+        :type conn: duckdb.DuckDBPyConnection
+        :return: Document ids, best match first.
+        :rtype: List[str]
+        """
+        params: List[Any] = [query_text]
+        restrict = ""
+        if keyword_filter:
+            restrict = (
+                f"AND id IN (SELECT doc_id FROM {self.keyword_table} "
+                "WHERE keyword IN (SELECT unnest(?::VARCHAR[])))"
+            )
+            params.append(list(dict.fromkeys(keyword_filter)))
+        params.append(n)
+        ids = conn.execute(
+            f"""
+            SELECT id FROM (
+                SELECT id, fts_main_{self.collection_name}.match_bm25(id, ?) AS score
+                FROM {self.collection_name}
+            )
+            WHERE score IS NOT NULL {restrict}
+            ORDER BY score DESC
+            LIMIT ?
+            """,
+            params,
+        ).fetchnumpy()
+        return ids["id"].tolist()
+
+    def _fuse(
+        self,
+        query_emb: List[float],
+        k: int,
+        vector_results: List[Dict[str, Any]],
+        lexical_ids: List[str],
+        lexical_weight: Optional[float],
+        conn: duckdb.DuckDBPyConnection,
+    ) -> List[Dict[str, Any]]:
+        """Merge vector and BM25 rankings with weighted reciprocal rank fusion.
+
+        :param query_emb: Query embedding, used to report cosine similarity.
+        :type query_emb: List[float]
+        :param k: Number of results to return.
+        :type k: int
+        :param vector_results: Vector search results, best first.
+        :type vector_results: List[Dict[str, Any]]
+        :param lexical_ids: BM25 result ids, best first.
+        :type lexical_ids: List[str]
+        :param lexical_weight: Weight of the BM25 ranking (0-1).
+        :type lexical_weight: Optional[float]
+        :param conn: DuckDB connection or cursor to read through.
+        :type conn: duckdb.DuckDBPyConnection
+        :return: Result dictionaries with ``similarity`` and fused ``score``.
+        :rtype: List[Dict[str, Any]]
+        """
+        weight = HYBRID_LEXICAL_WEIGHT if lexical_weight is None else lexical_weight
+        fused = _reciprocal_rank_fusion(
+            [[r["id"] for r in vector_results], lexical_ids],
+            [1.0 - weight, weight],
+            HYBRID_RRF_K,
+        )[:k]
+        if not fused:
+            return []
+        by_id = {r["id"]: r for r in vector_results}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+        if missing:
+            for r in self._rank_in_duckdb(
+                query_emb, len(missing), None, missing, conn=conn
+            ):
+                by_id[r["id"]] = r
+        return [
+            {**by_id[doc_id], "score": score}
+            for doc_id, score in fused
+            if doc_id in by_id
+        ]
+
+    def _fetch_hits(
+        self, hits: List[tuple], conn: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> List[Dict[str, Any]]:
+        """Load content and metadata for ranked (id, similarity) pairs.
+
+        :param hits: Ranked list of (id, similarity) pairs.
+        :type hits: List[tuple]
+        :param conn: Connection or cursor to use; defaults to this thread's read cursor.
+        :type conn: Optional[duckdb.DuckDBPyConnection]
+        :return: Result dictionaries in the order of ``hits``.
+        :rtype: List[Dict[str, Any]]
+        """
+        if not hits:
+            return []
+        if conn is None:
+            with self.connections.read() as conn:
+                return self._fetch_hits(hits, conn)
+        rows = conn.execute(
+            f"SELECT id, content, metadata FROM {self.collection_name} WHERE id IN (SELECT unnest(?::VARCHAR[]))",
+            [[doc_id for doc_id, _ in hits]],
+        ).fetchnumpy()
+        by_id = {doc_id: i for i, doc_id in enumerate(rows["id"].tolist())}
+        contents = rows["content"]
+        metadata = rows["metadata"]
+        return [
+            {
+                "id": doc_id,
+                "content": contents[by_id[doc_id]],
+                "metadata": json.loads(metadata[by_id[doc_id]]),
+                "similarity": float(sim),
+            }
+            for doc_id, sim in hits
+            if doc_id in by_id
+        ]
+
+    def _new_index(self, initial_capacity: int = 1024) -> Optional[InMemoryVectorIndex]:
+        """Create an empty in-process index for the configured backend."""
+        options: Dict[str, Any] = {}
+        if self.index_backend == "memory":
+            options = {"quantization": self.quantization}
+        elif self.index_backend == "hnsw":
+            options = {
+                "m": HNSW_M,
+                "ef_construction": HNSW_EF_CONSTRUCTION,
+                "ef_search": HNSW_EF_SEARCH,
+                "min_rows": HNSW_MIN_ROWS,
+            }
+        return create_vector_index(
+            self.index_backend, self.dimension, initial_capacity, **options
+        )
+
+    def load_index(self, rebuild: bool = False) -> None:
+        """(Re)build the in-process index from the DuckDB table.
+
+        For the HNSW backend a graph persisted next to the ``.db`` file is
+        reused unless ``rebuild`` is set; otherwise it is built and saved.
+        Logs the number of rows loaded and the memory footprint of the index.
+
+        :param rebuild: Ignore any persisted HNSW graph and build a new one.
+        :type rebuild: bool
+        """
+        logger = logging.getLogger(__name__)
+        if self.dimension is None:
+            # Table not created yet; the index is created on first insert
+            return
+        # Hold the write lock so no batch lands between the read and the swap
+        with self.connections.write():
+            data = self.conn.execute(
+                f"SELECT id, embedding FROM {self.collection_name}"
+            ).fetchnumpy()
+            index = self._new_index(max(len(data["id"]), 1024))
+            hnsw = isinstance(index, HNSWVectorIndex)
+            if len(data["id"]):
+                keywords_by_id = dict(
+                    self.conn.execute(
+                        f"SELECT doc_id, list(keyword) FROM {self.keyword_table} GROUP BY doc_id"
+                    ).fetchall()
+                )
+                ids = data["id"].tolist()
+                rows = (
+                    ids,
+                    np.stack(data["embedding"]),
+                    [keywords_by_id.get(doc_id, []) for doc_id in ids],
+                )
+                if hnsw:
+                    # The graph is loaded from disk or built once below
+                    index.add(*rows, build=False)
+                else:
+                    index.add(*rows)
+            if hnsw:
+                if rebuild or not index.load(self.index_file):
+                    index.rebuild()
+                    index.save(self.index_file)
+            self.index = index
+            self._index_pending = False
+        logger.info(
+            f"🧠 [DuckDBVectorStore] {self.index_backend} index for '{self.collection_name}': "
+            f"{len(index)} rows, {index.memory_bytes() / (1024 * 1024):.1f} MB"
+        )
+
+    def rebuild_index(self) -> None:
+        """Rebuild the in-process index from DuckDB, discarding any persisted graph."""
+        if self.index_backend != "duckdb":
+            self.load_index(rebuild=True)
+
+    def save_index(self) -> None:
+        """Persist the HNSW graph next to the ``.db`` file, if one is in use."""
+        if isinstance(self.index, HNSWVectorIndex):
+            self.index.save(self.index_file)
+
+    def _fingerprint(
+        self, source: str, conn: Optional[duckdb.DuckDBPyConnection] = None
+    ) -> tuple:
+        """Row count and order-independent content hash of a table or Parquet scan."""
+        if conn is None:
+            with self.connections.read() as conn:
+                return self._fingerprint(source, conn)
+        return conn.execute(
+            "SELECT count(*), coalesce(bit_xor(hash(id, content, embedding, "
+            f"metadata::VARCHAR)), 0) FROM {source}"
+        ).fetchall()[0]
+
+    def content_fingerprint(self) -> str:
+        """Digest of the stored documents, for caches derived from them.
+
+        Embeddings are left out, so re-indexing at another width keeps the
+        fingerprint. It is computed once per write and cached in process.
+
+        :return: Row count and order-independent hash of ids, contents and metadata.
+        :rtype: str
+        """
+        generation = self._content_generation
+        cached = self._content_fingerprint
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        if self.dimension is None:
+            fingerprint = "0:0"
+        else:
+            with self.connections.read() as conn:
+                rows, digest = conn.execute(
+                    "SELECT count(*), coalesce(bit_xor(hash(id, content, "
+                    f"metadata::VARCHAR)), 0) FROM {self.collection_name}"
+                ).fetchall()[0]
+            fingerprint = f"{rows}:{digest}"
+        self._content_fingerprint = (generation, fingerprint)
+        return fingerprint
+
+    def export_parquet(self, directory: str) -> Dict[str, Any]:
+        """Write the collection and its keyword postings to Parquet files.
+
+        Embeddings are exported as stored, so importing the files never
+        re-embeds anything.
+
+        :param directory: Directory to write ``{collection}.parquet`` and
+                          ``{collection}_keywords.parquet`` into.
+        :type directory: str
+        :return: Snapshot entry with file names, dimension, row count and
+                 content fingerprint.
+        :rtype: Dict[str, Any]
+        :raises ValueError: If the collection has no table yet.
+        """
+        if self.dimension is None:
+            raise ValueError(f"Collection '{self.collection_name}' is empty")
+        create_folders(directory)
+        table_file = f"{self.collection_name}.parquet"
+        keywords_file = f"{self.keyword_table}.parquet"
+        with self.connections.read() as conn:
+            for source, file_name in (
+                (f"SELECT * FROM {self.collection_name} ORDER BY id", table_file),
+                (
+                    f"SELECT * FROM {self.keyword_table} ORDER BY keyword, doc_id",
+                    keywords_file,
+                ),
+            ):
+                target = os.path.join(directory, file_name).replace("'", "''")
+                conn.execute(
+                    f"COPY ({source}) TO '{target}' (FORMAT PARQUET, COMPRESSION ZSTD)"
                 )
-                params.extend(keyword_filter)
-            where = "WHERE (" + " OR ".join(clauses) + ")"
-        # Fetch all candidate docs
-        sql = f"SELECT id, content, embedding, metadata FROM {self.collection_name} {where}"
-        docs = self.conn.execute(sql, params).fetchall()
-        # Compute cosine similarity
-        results = []
-        for doc_id, content, emb_json, metadata_json in docs:
-            emb = np.array(json.loads(emb_json))
-            sim = float(
-                np.dot(query_emb, emb)
-                / (np.linalg.norm(query_emb) * np.linalg.norm(emb) + 1e-8)
-            )
-            results.append(
-                {
-                    "id": doc_id,
-                    "content": content,
-                    "metadata": json.loads(metadata_json),
-                    "similarity": sim,
-                }
-            )
-        # Return top-k
-        results.sort(key=lambda x: x["similarity"], reverse=True)
-        return results[:k]
+            # Fingerprint the written file, not the live table, which may have changed
+            table_path = os.path.join(directory, table_file).replace("'", "''")
+            rows, fingerprint = self._fingerprint(
+                f"read_parquet('{table_path}')", conn
+            )
+        return {
+            "collection": self.collection_name,
+            "table_file": table_file,
+            "keywords_file": keywords_file,
+            "dimension": self.dimension,
+            "embedding_model": self.embedding_model,
+            "rows": rows,
+            "fingerprint": str(fingerprint),
+        }
+
+    def import_parquet(self, directory: str, entry: Dict[str, Any]) -> int:
+        """Replace the collection's contents with a Parquet export.
+
+        Both files are bulk-loaded with ``COPY`` in one transaction, which is
+        rolled back unless the loaded rows match the entry's row count and
+        fingerprint. Queries wait for the replacement; in-process indexes are
+        rebuilt afterwards.
+
+        :param directory: Directory holding the files named in ``entry``.
+        :type directory: str
+        :param entry: Snapshot entry returned by :meth:`export_parquet`.
+        :type entry: Dict[str, Any]
+        :return: Number of rows loaded.
+        :rtype: int
+        :raises ValueError: If the export was made with another embedding
+                            model or dimension, or fails verification.
+        """
+        if entry["embedding_model"] != self.embedding_model or (
+            self.dimension is not None and entry["dimension"] != self.dimension
+        ):
+            raise ValueError(
+                f"Snapshot of '{entry['collection']}' uses {entry['embedding_model']} "
+                f"({entry['dimension']} dims); '{self.collection_name}' uses "
+                f"{self.embedding_model} ({self.dimension} dims)"
+            )
+        table_file = os.path.join(directory, entry["table_file"]).replace("'", "''")
+        keywords_file = os.path.join(directory, entry["keywords_file"]).replace(
+            "'", "''"
+        )
+        expected = (entry["rows"], int(entry["fingerprint"]))
+        # Queries wait until the replaced tables, width and client are in place
+        with self.connections.exclusive():
+            previous_dimension = self.dimension
+            try:
+                self._load_parquet(
+                    table_file, keywords_file, entry["dimension"], expected
+                )
+            except BaseException:
+                self.dimension = previous_dimension
+                raise
+            if self.dimension != previous_dimension and not self._shared_clients:
+                self.embedding = self._embedding_client(self.dimension)
+                self.query_cache.clear()
+            # The old index describes the replaced rows; scan DuckDB until rebuilt
+            self.index = None
+            self._index_pending = self.index_backend != "duckdb"
+            self._mark_fts_stale(dropped=True)
+            self._content_generation += 1
+        if self.index_backend != "duckdb":
+            self.load_index(rebuild=True)
+        return expected[0]
+
+    def start_reindex(self, dimension: int) -> concurrent.futures.Future:
+        """Run :meth:`reindex_dimensions` on a background thread.
+
+        :param dimension: Target embedding width.
+        :type dimension: int
+        :return: Future resolving to the number of rows migrated.
+        :rtype: concurrent.futures.Future
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(self.reindex_dimensions(dimension))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(
+            target=run, name=f"reindex-{self.collection_name}", daemon=True
+        ).start()
+        return future
+
+    def reindex_dimensions(
+        self, dimension: int, batch_size: int = REINDEX_BATCH_SIZE
+    ) -> int:
+        """Shrink stored embeddings to ``dimension`` while the collection stays online.
+
+        Models with reduced-dimension support return the leading components
+        of the full embedding, so stored vectors are truncated in SQL without
+        re-embedding. A new table is filled in batches, each holding the write
+        lock only briefly; writes made meanwhile go to both tables. A short
+        final transaction swaps the tables and the store switches to
+        ``dimension`` for queries and new documents; queries wait for the
+        swap rather than mixing the two widths.
+
+        :param dimension: Target embedding width, smaller than the current one.
+        :type dimension: int
+        :param batch_size: Rows copied per write-lock hold.
+        :type batch_size: int
+        :return: Number of rows migrated.
+        :rtype: int
+        :raises ValueError: If the target is not a reduction the model supports,
+                            or a re-index is already running.
+        """
+        self._begin_reindex(dimension)
+        try:
+            copied = self._fill_reindex_table(batch_size)
+            self._finish_reindex()
+        except BaseException:
+            self._abort_reindex()
+            raise
+        return copied
+
+    def _begin_reindex(self, dimension: int) -> None:
+        """Validate the target width and create the table being migrated to."""
+        if self.dimension is None or not 0 < dimension < self.dimension:
+            raise ValueError(
+                f"Cannot re-index '{self.collection_name}' from {self.dimension} to "
+                f"{dimension} dimensions; only reductions are supported"
+            )
+        self._embedding_client(dimension)  # raises if the model cannot do it
+        with self.connections.write():
+            if self._reindex is not None:
+                raise ValueError(f"'{self.collection_name}' is already re-indexing")
+            table = f"{self.collection_name}_reindex"
+            self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._create_table(table, dimension, with_index=False)
+            self._reindex = {"table": table, "dimension": dimension}
+        logging.getLogger(__name__).info(
+            f"🔄 [DuckDBVectorStore] Re-indexing '{self.collection_name}' "
+            f"from {self.dimension} to {dimension} dimensions"
+        )
+
+    def _copy_to_reindex_table(self, where: str, params: List[Any]) -> None:
+        """Copy matching rows into the re-index table, truncating embeddings."""
+        table, dimension = self._reindex["table"], self._reindex["dimension"]
+        kw_cols = ", ".join(f"keyword{i}" for i in range(10))
+        self.conn.execute(
+            f"""
+            INSERT INTO {table}
+            SELECT id, content,
+                   CAST(list_slice(CAST(embedding AS FLOAT[]), 1, {dimension}) AS FLOAT[{dimension}]),
+                   metadata, {kw_cols}
+            FROM {self.collection_name}
+            WHERE {where}
+            """,
+            params,
+        )
+
+    def _fill_reindex_table(self, batch_size: int) -> int:
+        """Copy every row into the re-index table in id order, batch by batch."""
+        table = self._reindex["table"]
+        copied = 0
+        last_id = ""
+        while True:
+            with self.connections.read() as conn:
+                ids = (
+                    conn.execute(
+                        f"SELECT id FROM {self.collection_name} WHERE id > ? ORDER BY id LIMIT ?",
+                        [last_id, batch_size],
+                    )
+                    .fetchnumpy()["id"]
+                    .tolist()
+                )
+            if not ids:
+                return copied
+            with self.connections.transaction():
+                # Rows written since the re-index started are already current
+                self._copy_to_reindex_table(
+                    f"id IN (SELECT unnest(?::VARCHAR[])) AND id NOT IN (SELECT id FROM {table})",
+                    [ids],
+                )
+            copied += len(ids)
+            last_id = ids[-1]
+
+    def _finish_reindex(self) -> None:
+        """Swap the re-index table in and switch the store to the new width."""
+        name = self.collection_name
+        table, dimension = self._reindex["table"], self._reindex["dimension"]
+        # Queries wait while the table, width, index and client change
+        # together, so none binds an embedding of one width to the other
+        with self.connections.exclusive():
+            with self.connections.transaction() as conn:
+                # The FTS index lives in its own schema and is rebuilt on demand
+                conn.execute(f"DROP SCHEMA IF EXISTS fts_main_{name} CASCADE")
+                conn.execute(f"DROP TABLE {name}")
+                conn.execute(f"ALTER TABLE {table} RENAME TO {name}")
+                conn.execute(f"CREATE INDEX {name}_id_idx ON {name} (id)")
+                self._write_meta(
+                    embedding_model=self.embedding_model, dimension=dimension
+                )
+            self._reindex = None
+            # Queries scan DuckDB exactly until the index is rebuilt at the new width
+            self.index = None
+            self._index_pending = self.index_backend != "duckdb"
+            self.dimension = dimension
+            if not self._shared_clients:
+                self.embedding = self._embedding_client(dimension)
+                self.query_cache.clear()
+            self._mark_fts_stale(dropped=True)
+        if self.index_backend != "duckdb":
+            self.load_index(rebuild=True)
+        # The swap has committed; a failed checkpoint is retried by the next one
+        self.connections.checkpoint()
+        logging.getLogger(__name__).info(
+            f"✅ [DuckDBVectorStore] '{name}' now stores {dimension}-dimension embeddings"
+        )
+
+    def compact(self) -> None:
+        """Rewrite the collection's tables contiguously and checkpoint the file.
+
+        Upserts are delete-then-insert, so a long-lived collection accumulates
+        dead rows and half-empty blocks. DuckDB's ``VACUUM`` does not reclaim
+        them, so each table is copied in index order into a fresh table that
+        replaces it in one transaction. The ART indexes are recreated, the
+        BM25 index is marked stale, statistics are refreshed with ``ANALYZE``
+        and ``CHECKPOINT`` then returns the freed blocks to the file system.
+        Queries started during the swap wait for it to finish.
+
+        :raises RuntimeError: If a re-index is running.
+        """
+        if self.dimension is None:
+            return
+        name, kt, st = self.collection_name, self.keyword_table, self.source_table
+        # Queries read through per-thread cursors; wait for them and hold
+        # new ones back until the swapped tables are in place
+        with self.connections.exclusive():
+            if self._reindex is not None:
+                raise RuntimeError(
+                    f"Cannot compact '{name}' while it is being re-indexed"
+                )
+            with self.connections.transaction() as conn:
+                conn.execute(f"DROP SCHEMA IF EXISTS fts_main_{name} CASCADE")
+                self._create_table(f"{name}_compact", self.dimension, with_index=False)
+                conn.execute(
+                    f"CREATE TABLE {kt}_compact (keyword VARCHAR NOT NULL, doc_id VARCHAR NOT NULL)"
+                )
+                conn.execute(
+                    f"CREATE TABLE {st}_compact (source VARCHAR NOT NULL, doc_id VARCHAR NOT NULL)"
+                )
+                for table, order in ((name, "id"), (kt, "keyword"), (st, "source")):
+                    conn.execute(
+                        f"INSERT INTO {table}_compact SELECT * FROM {table} ORDER BY {order}"
+                    )
+                    conn.execute(f"DROP TABLE {table}")
+                    conn.execute(f"ALTER TABLE {table}_compact RENAME TO {table}")
+                conn.execute(f"CREATE INDEX {name}_id_idx ON {name} (id)")
+                self._index_keyword_table()
+                self._index_source_table()
+            self._mark_fts_stale(dropped=True)
+            self.conn.execute("ANALYZE")
+        # Closes this thread's reader first; logs instead of raising on failure
+        self.connections.checkpoint()
+
+    def _abort_reindex(self) -> None:
+        """Drop a partially built re-index table."""
+        with self.connections.write():
+            if self._reindex is not None:
+                self.conn.execute(f"DROP TABLE IF EXISTS {self._reindex['table']}")
+                self._reindex = None
+
+    def _load_parquet(
+        self, table_file: str, keywords_file: str, dimension: int, expected: tuple
+    ) -> None:
+        """Recreate both tables from Parquet in one verified transaction."""
+        kt = self.keyword_table
+        with self.connections.transaction() as conn:
+            # The BM25 index describes the rows being replaced
+            conn.execute(
+                f"DROP SCHEMA IF EXISTS fts_main_{self.collection_name} CASCADE"
+            )
+            # Recreate rather than delete: replacing every row under the
+            # posting indexes is far slower than indexing the loaded data once
+            conn.execute(f"DROP TABLE IF EXISTS {kt}")
+            conn.execute(f"DROP TABLE IF EXISTS {self.collection_name}")
+            self._create_table(self.collection_name, dimension)
+            conn.execute(
+                f"COPY {self.collection_name} FROM '{table_file}' (FORMAT PARQUET)"
+            )
+            conn.execute(
+                f"CREATE TABLE {kt} (keyword VARCHAR NOT NULL, doc_id VARCHAR NOT NULL)"
+            )
+            conn.execute(f"COPY {kt} FROM '{keywords_file}' (FORMAT PARQUET)")
+            self._index_keyword_table()
+            # The registry is rebuilt from the loaded metadata
+            conn.execute(f"DROP TABLE IF EXISTS {self.source_table}")
+            self._ensure_source_table()
+            self._write_meta(embedding_model=self.embedding_model, dimension=dimension)
+            loaded = self._fingerprint(self.collection_name, conn)
+            if loaded != expected:
+                raise ValueError(
+                    f"Snapshot verification failed for '{self.collection_name}': "
+                    f"loaded {loaded[0]} rows with fingerprint {loaded[1]}, "
+                    f"expected {expected[0]} rows with fingerprint {expected[1]}"
+                )
+
+    def index_stats(self) -> Dict[str, Any]:
+        """Report the state of the in-process index.
+
+        :return: Dictionary with ``backend``, ``rows``, ``memory_bytes`` and
+                 ``quantization``, plus graph parameters for the HNSW backend.
+        :rtype: Dict[str, Any]
+        """
+        if self.index is None:
+            return {"backend": self.index_backend, "rows": 0, "memory_bytes": 0}
+        stats = {
+            "backend": self.index_backend,
+            "dimension": self.dimension,
+            "rows": len(self.index),
+            "memory_bytes": self.index.memory_bytes(),
+            "quantization": self.quantization,
+        }
+        if isinstance(self.index, HNSWVectorIndex):
+            stats.update(self.index.stats())
+        return stats
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Report query-embedding and persistent embedding cache metrics.
+
+        :return: Dictionary with ``query`` (this store's LRU cache) and
+                 ``persistent`` (the shared embedding cache, or None).
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "query": self.query_cache.stats(),
+            "persistent": self.embedding_cache.stats()
+            if self.embedding_cache is not None
+            else None,
+        }
 
     def get(self, limit: int = 1) -> List[Dict[str, Any]]:
         """Get documents from the collection.
@@ -180,7 +2376,8 @@ class DuckDBVectorStore:
         :rtype: List[Dict[str, Any]]
         """
         sql = f"SELECT id, content, metadata FROM {self.collection_name} LIMIT {limit}"
-        docs = self.conn.execute(sql).fetchall()
+        with self.connections.read() as conn:
+            docs = conn.execute(sql).fetchall()
         return [
             {"id": doc[0], "content": doc[1], "metadata": json.loads(doc[2])}
             for doc in docs
@@ -241,9 +2438,95 @@ class DuckDBRetriever(BaseRetriever):
         """
         return self._vector_store
 
+    def _search_method(self, asynchronous: bool = False):
+        """Pick the store method for ``search_kwargs["search_type"]``.
+
+        ``"similarity"`` uses ``query``/``aquery`` and ``"mmr"`` uses
+        ``max_marginal_relevance_search``; the default is ``RETRIEVAL_SEARCH_TYPE``.
+        """
+        search_type = self._search_kwargs.get("search_type", RETRIEVAL_SEARCH_TYPE)
+        if search_type == "mmr":
+            name = "max_marginal_relevance_search"
+        elif search_type == "similarity":
+            name = "query"
+        else:
+            raise ValueError(f"Unknown search_type: {search_type}")
+        return getattr(self.vector_store, f"a{name}" if asynchronous else name)
+
+    def _query_kwargs(self) -> Dict[str, Any]:
+        """Translate ``search_kwargs`` into keyword arguments for the search method."""
+        kwargs = {
+            "k": self._search_kwargs.get("k", 5),
+            "keyword_filter": self._search_kwargs.get("filter", {}).get(
+                "keywords", None
+            ),
+            "mode": self._search_kwargs.get("mode"),
+            "lexical_weight": self._search_kwargs.get("lexical_weight"),
+        }
+        if self._search_kwargs.get("search_type", RETRIEVAL_SEARCH_TYPE) == "mmr":
+            kwargs["fetch_k"] = self._search_kwargs.get("fetch_k", MMR_FETCH_K)
+            kwargs["lambda_mult"] = self._search_kwargs.get("lambda_mult", MMR_LAMBDA)
+        return kwargs
+
+    def _to_documents(self, results: List[Dict[str, Any]]) -> List[Document]:
+        """Apply the result limits and convert results to LangChain documents.
+
+        ``search_kwargs["score_threshold"]`` drops results whose cosine
+        similarity is below it, and ``search_kwargs["max_context_tokens"]``
+        stops adding results once their contents would exceed that many
+        tokens (the best result is always kept). When either is set, each
+        document's metadata records its ``similarity`` and the number of
+        ``dropped_chunks`` for the query.
+
+        :param results: Store results, best first.
+        :type results: List[Dict[str, Any]]
+        :return: List of LangChain Document objects.
+        :rtype: List[Document]
+        """
+        threshold = self._search_kwargs.get(
+            "score_threshold", RETRIEVAL_SCORE_THRESHOLD
+        )
+        budget = self._search_kwargs.get(
+            "max_context_tokens", RETRIEVAL_MAX_CONTEXT_TOKENS
+        )
+        if threshold is None and not budget:
+            return [
+                Document(page_content=r["content"], metadata=r["metadata"])
+                for r in results
+            ]
+        kept = [
+            r
+            for r in results
+            if threshold is None or r.get("similarity", 1.0) >= threshold
+        ]
+        if budget:
+            used = 0
+            for i, r in enumerate(kept):
+                used += _estimate_tokens(r["content"])
+                if i and used > budget:
+                    kept = kept[:i]
+                    break
+        dropped = len(results) - len(kept)
+        if dropped:
+            logging.getLogger(__name__).debug(
+                f"✂️ [DuckDBRetriever] Dropped {dropped} of {len(results)} chunks "
+                f"(score_threshold={threshold}, max_context_tokens={budget})"
+            )
+        return [
+            Document(
+                page_content=r["content"],
+                metadata={
+                    **r["metadata"],
+                    "similarity": r.get("similarity"),
+                    "dropped_chunks": dropped,
+                },
+            )
+            for r in kept
+        ]
+
     def _get_relevant_documents(
         self, query: str, *, run_manager: CallbackManagerForRetrieverRun
-    ) -> List[Document]:  # sourcery skip: class-extract-method
+    ) -> List[Document]:
         """Get relevant documents for a query using LangChain interface.
 
         :param query: The search query.
@@ -253,13 +2536,49 @@ class DuckDBRetriever(BaseRetriever):
         :return: List of LangChain Document objects.
         :rtype: List[Document]
         """
-        k = self._search_kwargs.get("k", 5)
-        keyword_filter = self._search_kwargs.get("filter", {}).get("keywords", None)
+        return self._to_documents(self._search_method()(query, **self._query_kwargs()))
 
-        results = self.vector_store.query(query, k=k, keyword_filter=keyword_filter)
-        return [
-            Document(page_content=r["content"], metadata=r["metadata"]) for r in results
-        ]
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: Optional[AsyncCallbackManagerForRetrieverRun] = None,
+    ) -> List[Document]:
+        """Get relevant documents for a query without blocking the event loop.
+
+        ``run_manager`` is optional because the legacy ``get_relevant_documents``
+        override makes LangChain call retrievers without it.
+
+        :param query: The search query.
+        :type query: str
+        :param run_manager: LangChain async callback manager for the retrieval run.
+        :type run_manager: Optional[AsyncCallbackManagerForRetrieverRun]
+        :return: List of LangChain Document objects.
+        :rtype: List[Document]
+        """
+        search = self._search_method(asynchronous=True)
+        return self._to_documents(await search(query, **self._query_kwargs()))
+
+    def get_many_relevant_documents(self, queries: List[str]) -> List[Document]:
+        """Get the deduplicated union of documents for several queries.
+
+        Uses :meth:`DuckDBVectorStore.query_many`, so all queries share one
+        embedding request and one scoring pass.
+
+        :param queries: Query variants.
+        :type queries: List[str]
+        :return: List of LangChain Document objects, best match first.
+        :rtype: List[Document]
+        """
+        return self._to_documents(
+            self.vector_store.query_many(
+                queries,
+                k=self._search_kwargs.get("k", 5),
+                keyword_filter=self._search_kwargs.get("filter", {}).get(
+                    "keywords", None
+                ),
+            )
+        )
 
     def get_relevant_documents(self, query: str) -> List[Document]:
         """Get relevant documents for a query (legacy compatibility method).
@@ -269,13 +2588,7 @@ class DuckDBRetriever(BaseRetriever):
         :return: List of LangChain Document objects.
         :rtype: List[Document]
         """
-        k = self._search_kwargs.get("k", 5)
-        keyword_filter = self._search_kwargs.get("filter", {}).get("keywords", None)
-
-        results = self.vector_store.query(query, k=k, keyword_filter=keyword_filter)
-        return [
-            Document(page_content=r["content"], metadata=r["metadata"]) for r in results
-        ]
+        return self._to_documents(self._search_method()(query, **self._query_kwargs()))
 
 
 # --- Lazy loading for collections ---
@@ -288,15 +2601,68 @@ def get_duckdb_collection(collection_name: str) -> DuckDBVectorStore:
         base_dir, "data", "vector_store", "duckdb_collections"
     )
 
-    # Pass the base_db_dir as the db_path to DuckDBVectorStore
-    return lazy_loader.load_module(
-        f"duckdb_{collection_name}",
-        lambda: DuckDBVectorStore(
+    dimensions = int(
+        os.getenv(
+            f"{collection_name.upper()}_EMBEDDING_DIMENSIONS", EMBEDDING_DIMENSIONS
+        )
+    )
+    store_options = {
+        "dimensions": dimensions or None,
+        "index_backend": VECTOR_INDEX_BACKEND,
+        "quantization": os.getenv(
+            f"{collection_name.upper()}_VECTOR_QUANTIZATION", VECTOR_QUANTIZATION
+        ),
+        "search_mode": RETRIEVAL_MODE,
+    }
+    num_shards = int(
+        os.getenv(f"{collection_name.upper()}_VECTOR_SHARDS", VECTOR_SHARDS)
+    )
+
+    def _open():
+        if num_shards > 1:
+            from .sharded_store import ShardedDuckDBVectorStore
+
+            return ShardedDuckDBVectorStore(
+                db_path=duckdb_base_path,
+                collection_name=collection_name,
+                embedding_model=EMBEDDING_MODEL,
+                num_shards=num_shards,
+                **store_options,
+            )
+        # Pass the base_db_dir as the db_path to DuckDBVectorStore
+        return DuckDBVectorStore(
             db_path=duckdb_base_path,  # Pass the correct base directory
             collection_name=collection_name,
             embedding_model=EMBEDDING_MODEL,
-        ),
-    )
+            **store_options,
+        )
+
+    def _log_reindex_failure(future: concurrent.futures.Future) -> None:
+        # Nothing waits on the background re-index, so report its failure here
+        error = future.exception()
+        if error is not None:
+            logging.getLogger(__name__).error(
+                f"❌ Re-indexing '{collection_name}' to {dimensions} dimensions failed: {error}"
+            )
+
+    def _create():
+        from .snapshot import restore_snapshot_if_empty
+
+        store = _open()
+        restore_snapshot_if_empty(store)
+        if (
+            EMBEDDING_AUTO_REINDEX
+            and dimensions
+            and (store.dimension or 0) > dimensions
+        ):
+            store.start_reindex(dimensions).add_done_callback(_log_reindex_failure)
+        if VECTOR_MAINTENANCE_INTERVAL_HOURS > 0:
+            from .maintenance import schedule_maintenance
+
+            schedule_maintenance(store, VECTOR_MAINTENANCE_INTERVAL_HOURS)
+        return store
+
+    return lazy_loader.load_module(f"duckdb_{collection_name}", _create)
 
 
 def get_chat_db() -> DuckDBVectorStore:
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Connection management for DuckDB collection files.
+
+A DuckDB connection object is not meant to be shared between threads, and
+funnelling every query and write through one handle makes chat-time reads
+wait behind ingestion. :class:`DuckDBConnectionManager` instead keeps:
+
+- one writer connection, guarded by a re-entrant lock, for DDL and writes
+- one read cursor per thread, opened lazily from the writer, so queries run
+  concurrently and see the last committed state while a load is in progress
+
+A read cursor whose result is not fully consumed (e.g. read with
+``fetchone()``) keeps its transaction open, and DuckDB 1.1 then fails or hangs
+on ``CHECKPOINT``. Readers therefore consume results with ``fetchall()`` or
+``fetchnumpy()``, and :meth:`DuckDBConnectionManager.checkpoint` closes the
+calling thread's cursor before checkpointing.
+
+Reads run inside :meth:`DuckDBConnectionManager.read`, which holds a shared
+lock. Operations that drop or rename tables (compaction, re-indexing) hold it
+exclusively through :meth:`DuckDBConnectionManager.exclusive`, so no query
+sees a table disappear or change width in the middle of a swap.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+
+class DuckDBConnectionManager:
+    """One writer connection plus per-thread read cursors for a DuckDB file.
+
+    :param db_file: Path of the DuckDB database file.
+    :type db_file: str
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._writer = duckdb.connect(db_file)
+        self._write_lock = threading.RLock()
+        self._cursors: Dict[int, duckdb.DuckDBPyConnection] = {}
+        self._cursors_lock = threading.Lock()
+        self._local = threading.local()
+        # Shared/exclusive lock between reads and table swaps. A waiting swap
+        # holds new reads back so a steady query load cannot starve it
+        self._swap_cond = threading.Condition(threading.Lock())
+        self._active_reads = 0
+        self._swaps_waiting = 0
+        self._swapping = False
+
+    @property
+    def writer(self) -> duckdb.DuckDBPyConnection:
+        """The writer connection; hold :meth:`write` while using it from threads."""
+        return self._writer
+
+    @contextmanager
+    def _writing(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        # Hold the write lock and note it, so reads on this thread skip the
+        # shared lock: a swap cannot start while this thread holds the writer
+        with self._write_lock:
+            depth = getattr(self._local, "writing", 0)
+            self._local.writing = depth + 1
+            try:
+                yield self._writer
+            finally:
+                self._local.writing = depth
+
+    @contextmanager
+    def write(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Hold the write lock and yield the writer connection."""
+        with self._writing() as writer:
+            yield writer
+
+    @contextmanager
+    def transaction(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Run a block in an explicit transaction on the writer connection.
+
+        Commits when the block completes and rolls back if it raises.
+        """
+        with self._writing() as writer:
+            writer.execute("BEGIN TRANSACTION")
+            try:
+                yield writer
+            except BaseException:
+                writer.execute("ROLLBACK")
+                raise
+            writer.execute("COMMIT")
+
+    @contextmanager
+    def read(self, nested: bool = False) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Yield the calling thread's read cursor while holding the shared lock.
+
+        Waits while :meth:`exclusive` is held or waiting. Reads nested in a
+        read on the same thread, and reads by the thread holding the write
+        lock, do not wait.
+
+        :param nested: This read is part of one a caller on another thread
+                       holds open, e.g. one half of a hybrid query; it only
+                       waits for a swap already running.
+        :type nested: bool
+        """
+        if getattr(self._local, "writing", 0):
+            yield self.reader()
+            return
+        depth = getattr(self._local, "reading", 0)
+        with self._swap_cond:
+            while self._swapping or (
+                self._swaps_waiting and not depth and not nested
+            ):
+                self._swap_cond.wait()
+            self._active_reads += 1
+        self._local.reading = depth + 1
+        try:
+            yield self.reader()
+        finally:
+            self._local.reading = depth
+            with self._swap_cond:
+                self._active_reads -= 1
+                if not self._active_reads:
+                    self._swap_cond.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Wait for running reads to finish, block new ones and hold the write lock.
+
+        Use it for operations that drop, recreate or rename tables. The
+        calling thread must not be inside :meth:`read` or :meth:`write`.
+        """
+        with self._swap_cond:
+            self._swaps_waiting += 1
+            try:
+                while self._swapping or self._active_reads:
+                    self._swap_cond.wait()
+            finally:
+                self._swaps_waiting -= 1
+            self._swapping = True
+        try:
+            with self._writing() as writer:
+                yield writer
+        finally:
+            with self._swap_cond:
+                self._swapping = False
+                self._swap_cond.notify_all()
+
+    def reader(self) -> duckdb.DuckDBPyConnection:
+        """Return the calling thread's read cursor, opening it on first use.
+
+        :return: A cursor on the same database as the writer.
+        :rtype: duckdb.DuckDBPyConnection
+        """
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            with self._write_lock:
+                cursor = self._writer.cursor()
+            self._local.cursor = cursor
+            with self._cursors_lock:
+                self._cursors[threading.get_ident()] = cursor
+                self._prune_cursors()
+        return cursor
+
+    def _drop_local_cursor(self) -> None:
+        """Close the calling thread's read cursor; the next read opens a new one."""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            return
+        self._local.cursor = None
+        with self._cursors_lock:
+            self._cursors.pop(threading.get_ident(), None)
+        try:
+            cursor.close()
+        except duckdb.Error:
+            pass
+
+    def checkpoint(self) -> bool:
+        """Run ``CHECKPOINT`` on the writer, logging instead of raising on failure.
+
+        The calling thread's read cursor and those of exited threads are
+        closed first, so no transaction left open by this thread blocks the
+        checkpoint.
+
+        :return: True if the checkpoint ran.
+        :rtype: bool
+        """
+        with self._write_lock:
+            self._drop_local_cursor()
+            with self._cursors_lock:
+                self._prune_cursors()
+            try:
+                self._writer.execute("CHECKPOINT")
+            except duckdb.Error as e:
+                logger.warning(f"⚠️ CHECKPOINT of '{self.db_file}' failed: {e}")
+                return False
+        return True
+
+    def _prune_cursors(self) -> None:
+        # Close cursors left behind by threads that have exited
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [i for i in self._cursors if i not in alive]:
+            try:
+                self._cursors.pop(ident).close()
+            except duckdb.Error:
+                pass
+
+    def close(self) -> None:
+        """Close all read cursors and the writer connection."""
+        with self._cursors_lock:
+            for cursor in self._cursors.values():
+                try:
+                    cursor.close()
+                except duckdb.Error:
+                    pass
+            self._cursors.clear()
+        with self._write_lock:
+            self._writer.close()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Persistent, content-addressed embedding cache.
+
+Embeddings are keyed by ``(model, sha256(text))`` and stored as raw float32
+bytes in a small SQLite file shared by every DuckDB collection, so re-ingesting
+an unchanged file or repeating a query never pays for the same API call twice.
+:class:`QueryEmbeddingCache` sits in front of it on the query path as a small
+in-process LRU with a TTL that also coalesces concurrent identical lookups.
+
+The cache keeps a running byte total and evicts the least recently used
+vectors once it grows past its budget. Lookups stay read-only: hits are
+remembered in memory and their recency is written back in one batch with the
+next write, before an eviction, or every ``_TOUCH_BATCH`` hits. Hit and miss counters are kept per
+process and exposed through :meth:`EmbeddingCache.stats`.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+from .config import (
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_PATH,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Keeps IN (...) lists below SQLite's host parameter limit
+_SQL_CHUNK = 500
+# Pending recency updates that force a write-back from a lookup
+_TOUCH_BATCH = 1024
+
+
+def text_hash(text: str) -> str:
+    """Return the sha256 hex digest used as a cache key for ``text``."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed cache of float32 embeddings with LRU size eviction.
+
+    :param path: Path of the SQLite file.
+    :type path: str
+    :param max_bytes: Total vector bytes kept before evicting; 0 disables eviction.
+    :type max_bytes: int
+    """
+
+    def __init__(self, path: str, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # last_used of cache hits not yet written back, by (model, text_hash)
+        self._touched: Dict[Tuple[str, str], float] = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used_idx ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(length(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings for ``texts``.
+
+        :param model: Embedding model name (and any variant, e.g. dimensions).
+        :type model: str
+        :param texts: Texts to look up.
+        :type texts: Sequence[str]
+        :return: A float32 vector per text, or None on a miss.
+        :rtype: List[Optional[np.ndarray]]
+        """
+        hashes = [text_hash(t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for i in range(0, len(unique), _SQL_CHUNK):
+                chunk = unique[i : i + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._touched.update(((model, h), now) for h in found)
+                if len(self._touched) >= _TOUCH_BATCH:
+                    self._flush_touched()
+                    self._conn.commit()
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(r is not None for r in results)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def _flush_touched(self) -> None:
+        """Write pending hit recency to SQLite; the caller holds the lock and commits."""
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+            [(used, model, h) for (model, h), used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """Look up a single embedding; see :meth:`get_many`."""
+        return self.get_many(model, [text])[0]
+
+    def put_many(
+        self, model: str, texts: Sequence[str], vectors: Sequence[Any]
+    ) -> None:
+        """Store embeddings for ``texts`` and evict if over budget.
+
+        :param model: Embedding model name (and any variant, e.g. dimensions).
+        :type model: str
+        :param texts: Texts the vectors were computed from.
+        :type texts: Sequence[str]
+        :param vectors: One embedding per text.
+        :type vectors: Sequence[Any]
+        """
+        now = time.time()
+        rows = {}
+        for text, vector in zip(texts, vectors):
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows[text_hash(text)] = (model, text_hash(text), blob, now)
+        if not rows:
+            return
+        with self._lock:
+            replaced = 0
+            keys = list(rows)
+            for i in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[i : i + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(length(vector)), 0) FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk],
+                ).fetchone()[0]
+            # Rows written below are newer than any pending hit
+            self._flush_touched()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                list(rows.values()),
+            )
+            self._conn.commit()
+            self._total_bytes += sum(len(r[2]) for r in rows.values()) - replaced
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def put(self, model: str, text: str, vector: Any) -> None:
+        """Store a single embedding; see :meth:`put_many`."""
+        self.put_many(model, [text], [vector])
+
+    def _evict(self) -> None:
+        """Drop least recently used vectors until 90% of the byte budget is free."""
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        self._flush_touched()
+        candidates = self._conn.execute(
+            "SELECT model, text_hash, length(vector) FROM embeddings ORDER BY last_used"
+        ).fetchall()
+        victims = []
+        for model, h, size in candidates:
+            if self._total_bytes - removed <= target:
+                break
+            victims.append((model, h))
+            removed += size
+        self._conn.executemany(
+            "DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims
+        )
+        self._conn.commit()
+        self._total_bytes -= removed
+        self.evictions += len(victims)
+        logger.info(
+            f"🧹 Embedding cache evicted {len(victims)} vectors ({removed / 1e6:.1f} MB)"
+        )
+
+    def clear(self) -> None:
+        """Remove every cached embedding and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._touched.clear()
+            self._total_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the cache's size.
+
+        :return: Dictionary with hits, misses, hit_rate, evictions, entries,
+                 size_bytes, max_bytes and path.
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "path": self.path,
+            }
+
+    def close(self) -> None:
+        """Write back pending recency and close the underlying SQLite connection."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU cache with TTL and in-flight deduplication.
+
+    The first caller for a missing key computes the value; callers arriving
+    while that computation runs wait on the same future instead of issuing
+    their own request. Failures are not cached. An async computation runs on
+    its own task, so cancelling the caller that started it does not cancel
+    the callers waiting for it.
+
+    :param max_size: Maximum number of entries; 0 disables caching but keeps
+                     in-flight deduplication.
+    :type max_size: int
+    :param ttl: Seconds an entry stays valid; 0 means no expiry.
+    :type ttl: float
+    """
+
+    def __init__(
+        self,
+        max_size: int = QUERY_EMBEDDING_CACHE_SIZE,
+        ttl: float = QUERY_EMBEDDING_CACHE_TTL,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # Async computations whose owner may have been cancelled
+        self._tasks: Set[asyncio.Task] = set()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing it at most once.
+
+        :param key: Cache key, e.g. the query text.
+        :type key: str
+        :param compute: Zero-argument callable producing the value on a miss.
+        :type compute: Callable[[], Any]
+        :return: The cached or freshly computed value.
+        :rtype: Any
+        """
+        found, value, future, owner = self._claim(key)
+        if found:
+            return value
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._complete(key, future, value)
+        return value
+
+    async def aget_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Async variant of :meth:`get_or_compute`.
+
+        In-flight computations are shared with sync callers, so a thread and a
+        coroutine asking for the same key still trigger a single request.
+
+        :param key: Cache key, e.g. the query text.
+        :type key: str
+        :param compute: Zero-argument coroutine function producing the value on a miss.
+        :type compute: Callable[[], Awaitable[Any]]
+        :return: The cached or freshly computed value.
+        :rtype: Any
+        """
+        found, value, future, owner = self._claim(key)
+        if found:
+            return value
+        if not owner:
+            return await asyncio.wrap_future(future)
+        task = asyncio.ensure_future(self._acompute(key, future, compute))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        # Waiters share this computation, so this caller's cancellation must
+        # not reach it
+        return await asyncio.shield(task)
+
+    async def _acompute(
+        self, key: str, future: Future, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run an owned async computation and resolve its shared future."""
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._complete(key, future, value)
+        return value
+
+    def get_or_compute_many(
+        self, keys: Sequence[str], compute_many: Callable[[List[str]], List[Any]]
+    ) -> Dict[str, Any]:
+        """Batch variant of :meth:`get_or_compute`.
+
+        Keys that are neither cached nor in flight are computed together with
+        a single ``compute_many`` call; the rest are served from the cache or
+        wait on the request already running for them.
+
+        :param keys: Cache keys, e.g. query texts.
+        :type keys: Sequence[str]
+        :param compute_many: Callable mapping a list of missing keys to their
+                             values, in the same order.
+        :type compute_many: Callable[[List[str]], List[Any]]
+        :return: Value for every distinct key.
+        :rtype: Dict[str, Any]
+        """
+        claims = {key: self._claim(key) for key in dict.fromkeys(keys)}
+        owned = [key for key, claim in claims.items() if claim[3]]
+        if owned:
+            try:
+                values = compute_many(owned)
+            except BaseException as e:
+                for key in owned:
+                    self._fail(key, claims[key][2], e)
+                raise
+            for key, value in zip(owned, values):
+                self._complete(key, claims[key][2], value)
+        return {
+            key: value if found else future.result()
+            for key, (found, value, future, _) in claims.items()
+        }
+
+    def _claim(self, key: str) -> Tuple[bool, Any, Optional[Future], bool]:
+        """Look up ``key`` and register an in-flight future on a miss.
+
+        :return: (found, value, future, owner); ``owner`` is True when the
+                 caller must compute the value and resolve ``future``.
+        :rtype: Tuple[bool, Any, Optional[Future], bool]
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if not self.ttl or time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value, None, False
+                del self._entries[key]
+                self.expirations += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return False, None, future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.misses += 1
+            return False, None, future, True
+
+    def _complete(self, key: str, future: Future, value: Any) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if self.max_size > 0:
+                self._entries[key] = (value, time.monotonic() + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        future.set_result(value)
+
+    def _fail(self, key: str, future: Future, error: BaseException) -> None:
+        # Failures are not cached; waiters see the same exception
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(error)
+
+    def clear(self) -> None:
+        """Drop all cached entries; in-flight computations are unaffected."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters.
+
+        :return: Dictionary with hits, misses, coalesced, hit_rate, evictions,
+                 expirations, size, max_size and ttl.
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+            }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the process-wide embedding cache, or None when disabled.
+
+    :return: The shared :class:`EmbeddingCache` instance, or None.
+    :rtype: Optional[EmbeddingCache]
+    """
+    global _embedding_cache
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            try:
+                _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH)
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding cache unavailable: {e}")
+                return None
+        return _embedding_cache
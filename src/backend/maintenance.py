@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compaction and maintenance of vector collections.
+
+Every upsert deletes and re-inserts rows, so DuckDB files of long-running
+deployments grow with dead rows and fragmented blocks, and scans, startup
+index loads and HNSW graphs grow with them. :func:`maintain_collection`
+compacts each DuckDB file of a collection (see
+``DuckDBVectorStore.compact``), rebuilds the in-process ANN index and the
+BM25 index (installing the FTS extension if it is still missing), and
+reports file size and query latency before and after.
+
+Run it from ``scripts/vector_maintenance.py`` while the app is stopped (DuckDB
+locks the file to one process), or set ``VECTOR_MAINTENANCE_INTERVAL_HOURS``
+to have the app run it on a schedule; queries then wait while each file's
+tables are swapped.
+"""
+
+import logging
+import os
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .config import MAINTENANCE_PROBE_QUERIES
+from .database import collection_stores
+
+logger = logging.getLogger(__name__)
+
+
+def _file_bytes(store: Any) -> int:
+    """Size of a store's DuckDB file plus its write-ahead log."""
+    wal = f"{store.db_file}.wal"
+    size = os.path.getsize(store.db_file)
+    return size + (os.path.getsize(wal) if os.path.exists(wal) else 0)
+
+
+def _probe_vectors(store: Any, samples: int) -> np.ndarray:
+    """Sample stored embeddings to use as latency probe queries."""
+    with store.connections.read() as conn:
+        rows = conn.execute(
+            f"SELECT id FROM {store.collection_name} USING SAMPLE {int(samples)} ROWS"
+        ).fetchall()
+    ids = [row[0] for row in rows]
+    return store.get_embeddings(ids)
+
+
+def _query_latency_ms(store: Any, probes: np.ndarray, k: int = 5) -> float:
+    """Median latency of vector queries for the probe embeddings."""
+    timings = []
+    for vector in probes:
+        start = time.perf_counter()
+        store.query_by_vector("", vector.tolist(), k, mode="vector")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings) if timings else 0.0
+
+
+def maintain_store(
+    store: Any, probe_queries: int = MAINTENANCE_PROBE_QUERIES
+) -> Dict[str, Any]:
+    """Compact one DuckDB file and rebuild its indexes.
+
+    :param store: A ``DuckDBVectorStore``.
+    :type store: Any
+    :param probe_queries: Stored embeddings to time as queries before and after.
+    :type probe_queries: int
+    :return: Report with ``bytes_before``, ``bytes_after``,
+             ``query_ms_before``, ``query_ms_after`` and ``seconds``.
+    :rtype: Dict[str, Any]
+    """
+    start = time.perf_counter()
+    report: Dict[str, Any] = {"collection": store.collection_name}
+    report["bytes_before"] = _file_bytes(store)
+    if store.dimension is None:
+        report.update(bytes_after=report["bytes_before"], seconds=0.0)
+        return report
+    probes = _probe_vectors(store, probe_queries)
+    report["query_ms_before"] = _query_latency_ms(store, probes)
+    store.compact()
+    if store.index_backend != "duckdb":
+        # Removed rows stay masked in the in-process index until it is rebuilt
+        store.load_index(rebuild=True)
+    if store.search_mode == "hybrid":
+        store.rebuild_fts()
+    report["bytes_after"] = _file_bytes(store)
+    report["query_ms_after"] = _query_latency_ms(store, probes)
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def maintain_collection(
+    store: Any, probe_queries: int = MAINTENANCE_PROBE_QUERIES
+) -> Dict[str, Any]:
+    """Run :func:`maintain_store` on every DuckDB file of a collection.
+
+    :param store: ``DuckDBVectorStore`` or ``ShardedDuckDBVectorStore``.
+    :type store: Any
+    :param probe_queries: Stored embeddings to time as queries, per file.
+    :type probe_queries: int
+    :return: Summed sizes, the slowest file's latencies, and per-file reports
+             under ``parts``.
+    :rtype: Dict[str, Any]
+    """
+    parts: List[Dict[str, Any]] = [
+        maintain_store(part_store, probe_queries)
+        for part_store in collection_stores(store)
+    ]
+    report: Dict[str, Any] = {
+        "collection": store.collection_name,
+        "bytes_before": sum(part["bytes_before"] for part in parts),
+        "bytes_after": sum(part["bytes_after"] for part in parts),
+        "seconds": sum(part["seconds"] for part in parts),
+        "parts": parts,
+    }
+    for key in ("query_ms_before", "query_ms_after"):
+        report[key] = max((part.get(key, 0.0) for part in parts), default=0.0)
+    logger.info(
+        f"🧹 Maintained '{store.collection_name}' in {report['seconds']:.2f}s: "
+        f"{report['bytes_before'] / (1024 * 1024):.1f} MB -> "
+        f"{report['bytes_after'] / (1024 * 1024):.1f} MB, query "
+        f"{report['query_ms_before']:.1f} ms -> {report['query_ms_after']:.1f} ms"
+    )
+    return report
+
+
+def schedule_maintenance(store: Any, interval_hours: float) -> threading.Thread:
+    """Run :func:`maintain_collection` every ``interval_hours`` on a daemon thread.
+
+    :param store: ``DuckDBVectorStore`` or ``ShardedDuckDBVectorStore``.
+    :type store: Any
+    :param interval_hours: Hours between runs.
+    :type interval_hours: float
+    :return: The started thread.
+    :rtype: threading.Thread
+    """
+
+    def run():
+        while True:
+            time.sleep(interval_hours * 3600)
+            try:
+                maintain_collection(store)
+            except Exception as e:
+                logger.error(f"❌ Maintenance of '{store.collection_name}' failed: {e}")
+
+    thread = threading.Thread(
+        target=run, name=f"maintenance-{store.collection_name}", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+Sharded vector collections spread over several DuckDB files.
+
+:class:`ShardedDuckDBVectorStore` hash-partitions documents by id across N
+:class:`~backend.database.DuckDBVectorStore` shards, one ``.db`` file each, so
+ingestion writes and query scans run on several files at once:
+
+- writes embed once, then upsert every shard's slice in parallel, each behind
+  its own writer connection
+- queries embed once, search every shard in parallel on a thread pool and
+  merge the per-shard top-k with a heap
+
+It exposes the same query and ingestion API as ``DuckDBVectorStore`` so
+``get_duckdb_collection`` can return it in place of a single-file store.
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import heapq
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .config import MMR_FETCH_K, MMR_LAMBDA, REINDEX_BATCH_SIZE
+from .database import (
+    DuckDBRetriever,
+    DuckDBVectorStore,
+    _mmr_select,
+    _union_rankings,
+    stable_document_id,
+)
+
+logger = logging.getLogger(__name__)
+
+_shard_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_shard_executor_lock = threading.Lock()
+
+
+def get_shard_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the thread pool used to fan work out across shards.
+
+    It is separate from the DuckDB query pool because a shard search may
+    itself wait on that pool (hybrid mode runs BM25 there).
+
+    :return: Shared executor sized to the machine's cores.
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    global _shard_executor
+    with _shard_executor_lock:
+        if _shard_executor is None:
+            _shard_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(32, (os.cpu_count() or 1) * 2),
+                thread_name_prefix="duckdb-shard",
+            )
+        return _shard_executor
+
+
+def shard_for(doc_id: str, num_shards: int) -> int:
+    """Map a document id to a shard with a hash that is stable across processes.
+
+    :param doc_id: Document identifier.
+    :type doc_id: str
+    :param num_shards: Number of shards.
+    :type num_shards: int
+    :return: Shard number in ``range(num_shards)``.
+    :rtype: int
+    """
+    digest = hashlib.md5(doc_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards
+
+
+class ShardedDuckDBVectorStore:
+    """Vector store that hash-partitions a collection across DuckDB files.
+
+    Shard ``i`` is stored as collection ``{collection_name}_shard{i}``. Shard 0
+    creates the embedding client and query cache, and the other shards are
+    handed the same objects, so the collection holds one HTTP pool and one
+    query cache however many shards it has. The
+    shard count is recorded next to the shards and must not change, since it
+    decides where each id lives.
+
+    :param db_path: Base directory for DuckDB files (kept for API parity).
+    :type db_path: str
+    :param collection_name: Logical collection name.
+    :type collection_name: str
+    :param embedding_model: OpenAI embedding model name.
+    :type embedding_model: str
+    :param num_shards: Number of DuckDB files to spread the collection over.
+    :type num_shards: int
+    :param store_options: Extra ``DuckDBVectorStore`` arguments for every shard
+                          (index_backend, quantization, search_mode).
+    :raises ValueError: If the collection was created with a different shard count.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        collection_name: str,
+        embedding_model: str,
+        num_shards: int,
+        **store_options: Any,
+    ):
+        self.collection_name = collection_name
+        self.embedding_model = embedding_model
+        self.num_shards = num_shards
+        first = DuckDBVectorStore(
+            db_path=db_path,
+            collection_name=f"{collection_name}_shard0",
+            embedding_model=embedding_model,
+            **store_options,
+        )
+        self.shards = [first] + [
+            DuckDBVectorStore(
+                db_path=db_path,
+                collection_name=f"{collection_name}_shard{i}",
+                embedding_model=embedding_model,
+                embedding=first.embedding,
+                query_cache=first.query_cache,
+                **store_options,
+            )
+            for i in range(1, num_shards)
+        ]
+        self.search_mode = self.shards[0].search_mode
+        self._check_manifest()
+        self._import_unsharded(db_path, store_options)
+        logger.info(
+            f"✅ [ShardedDuckDBVectorStore] '{collection_name}' ready with {num_shards} shards"
+        )
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return next((s.dimension for s in self.shards if s.dimension is not None), None)
+
+    @property
+    def embedding(self):
+        return self.shards[0].embedding
+
+    def _check_manifest(self) -> None:
+        """Record the shard count on first use and refuse a different one later."""
+        path = os.path.join(
+            self.shards[0].base_db_dir, f"{self.collection_name}.shards.json"
+        )
+        if os.path.exists(path):
+            with open(path) as f:
+                recorded = json.load(f).get("num_shards")
+            if recorded != self.num_shards:
+                raise ValueError(
+                    f"Collection '{self.collection_name}' has {recorded} shards, "
+                    f"not {self.num_shards}; re-ingest to change the shard count"
+                )
+            return
+        with open(path, "w") as f:
+            json.dump({"num_shards": self.num_shards}, f)
+
+    def _import_unsharded(self, db_path: str, store_options: Dict[str, Any]) -> None:
+        """Copy an existing single-file collection into empty shards.
+
+        Stored embeddings are reused, so no embedding calls are made.
+        """
+        legacy_file = os.path.join(
+            self.shards[0].base_db_dir, f"{self.collection_name}.db"
+        )
+        if not os.path.exists(legacy_file) or any(
+            shard.dimension is not None and shard.get(limit=1) for shard in self.shards
+        ):
+            return
+        legacy = DuckDBVectorStore(
+            db_path=db_path,
+            collection_name=self.collection_name,
+            embedding_model=self.embedding_model,
+            search_mode=store_options.get("search_mode", "vector"),
+            embedding=self.embedding,
+            query_cache=self.shards[0].query_cache,
+        )
+        try:
+            if legacy.dimension is None:
+                return
+            conn = legacy.connections.reader()
+            total = 0
+            offset = 0
+            while True:
+                batch = conn.execute(
+                    f"SELECT id, content, embedding, metadata FROM {self.collection_name} "
+                    "ORDER BY id LIMIT 5000 OFFSET ?",
+                    [offset],
+                ).fetchnumpy()
+                if not len(batch["id"]):
+                    break
+                documents = [
+                    {"id": doc_id, "content": content, "metadata": json.loads(meta)}
+                    for doc_id, content, meta in zip(
+                        batch["id"].tolist(),
+                        batch["content"].tolist(),
+                        batch["metadata"].tolist(),
+                    )
+                ]
+                total += self.add_embedded_documents(
+                    documents, list(batch["embedding"])
+                )
+                offset += len(documents)
+            logger.info(
+                f"🔄 [ShardedDuckDBVectorStore] Imported {total} rows from '{legacy_file}' "
+                f"into {self.num_shards} shards"
+            )
+        finally:
+            legacy.connections.close()
+
+    def add_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Embed documents once and write each shard's slice in parallel.
+
+        :param documents: Document dictionaries, as for ``DuckDBVectorStore.add_documents``.
+        :type documents: List[Dict[str, Any]]
+        :return: Number of documents written.
+        :rtype: int
+        :raises RuntimeError: If no document could be embedded.
+        """
+        if not documents:
+            return 0
+        embeddings = self.shards[0]._embed_contents(
+            [doc["content"] for doc in documents]
+        )
+        return self.add_embedded_documents(documents, embeddings)
+
+    def add_embedded_documents(
+        self, documents: List[Dict[str, Any]], embeddings: List[Optional[Any]]
+    ) -> int:
+        """Partition pre-embedded documents by id and write shards in parallel.
+
+        :param documents: Document dictionaries.
+        :type documents: List[Dict[str, Any]]
+        :param embeddings: One embedding per document; None skips the document.
+        :type embeddings: List[Optional[Any]]
+        :return: Number of documents written.
+        :rtype: int
+        :raises RuntimeError: If every embedding is None.
+        """
+        parts: List[tuple] = [([], []) for _ in self.shards]
+        for doc, embedding in zip(documents, embeddings):
+            if embedding is None:
+                continue
+            doc_id = doc.get("id") or stable_document_id(
+                doc["content"], doc.get("metadata", {}).get("source")
+            )
+            docs, embs = parts[shard_for(doc_id, self.num_shards)]
+            docs.append({**doc, "id": doc_id})
+            embs.append(embedding)
+        if not any(docs for docs, _ in parts):
+            raise RuntimeError(
+                f"Embedding failed for all {len(documents)} documents in '{self.collection_name}'"
+            )
+        futures = [
+            get_shard_executor().submit(shard.add_embedded_documents, docs, embs)
+            for shard, (docs, embs) in zip(self.shards, parts)
+            if docs
+        ]
+        return sum(future.result() for future in futures)
+
+    async def aembed_query(self, query_text: str) -> List[float]:
+        """Embed a query through shard 0's cache, which all shard searches use."""
+        return await self.shards[0].aembed_query(query_text)
+
+    def query(
+        self,
+        query_text: str,
+        k: int = 5,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Embed once, search all shards in parallel and merge their top-k.
+
+        Parameters and results match ``DuckDBVectorStore.query``.
+        """
+        if self.dimension is None:
+            return []
+        query_emb = self.shards[0]._embed_query(query_text)
+        futures = [
+            get_shard_executor().submit(
+                shard.query_by_vector,
+                query_text,
+                query_emb,
+                k,
+                keyword_filter,
+                mode,
+                lexical_weight,
+            )
+            for shard in self.shards
+        ]
+        return self._merge(
+            [future.result() for future in futures], k, keyword_filter, mode
+        )
+
+    async def aquery(
+        self,
+        query_text: str,
+        k: int = 5,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of :meth:`query`."""
+        if self.dimension is None:
+            return []
+        query_emb = await self.shards[0]._aembed_query(query_text)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    get_shard_executor(),
+                    shard.query_by_vector,
+                    query_text,
+                    query_emb,
+                    k,
+                    keyword_filter,
+                    mode,
+                    lexical_weight,
+                )
+                for shard in self.shards
+            )
+        )
+        return self._merge(list(results), k, keyword_filter, mode)
+
+    def max_marginal_relevance_search(
+        self,
+        query_text: str,
+        k: int = 5,
+        fetch_k: int = MMR_FETCH_K,
+        lambda_mult: float = MMR_LAMBDA,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """MMR over the merged cross-shard candidate pool.
+
+        Parameters and results match ``DuckDBVectorStore.max_marginal_relevance_search``.
+        """
+        candidates = self.query(
+            query_text, max(fetch_k, k), keyword_filter, mode, lexical_weight
+        )
+        if not candidates:
+            return []
+        query_emb = self.shards[0]._embed_query(query_text)
+        vectors = self.get_embeddings([c["id"] for c in candidates])
+        return [candidates[i] for i in _mmr_select(query_emb, vectors, k, lambda_mult)]
+
+    async def amax_marginal_relevance_search(
+        self,
+        query_text: str,
+        k: int = 5,
+        fetch_k: int = MMR_FETCH_K,
+        lambda_mult: float = MMR_LAMBDA,
+        keyword_filter: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        lexical_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of :meth:`max_marginal_relevance_search`."""
+        candidates = await self.aquery(
+            query_text, max(fetch_k, k), keyword_filter, mode, lexical_weight
+        )
+        if not candidates:
+            return []
+        query_emb = await self.shards[0]._aembed_query(query_text)
+        vectors = await asyncio.get_running_loop().run_in_executor(
+            get_shard_executor(), self.get_embeddings, [c["id"] for c in candidates]
+        )
+        return [candidates[i] for i in _mmr_select(query_emb, vectors, k, lambda_mult)]
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """Read stored embeddings for the given ids from their shards.
+
+        :param ids: Document identifiers.
+        :type ids: List[str]
+        :return: Matrix with one row per id, in the order of ``ids``.
+        :rtype: np.ndarray
+        """
+        vectors = np.zeros((len(ids), self.dimension or 0), dtype=np.float32)
+        by_shard: List[List[int]] = [[] for _ in self.shards]
+        for i, doc_id in enumerate(ids):
+            by_shard[shard_for(doc_id, self.num_shards)].append(i)
+        for shard, positions in zip(self.shards, by_shard):
+            if positions:
+                vectors[positions] = shard.get_embeddings([ids[i] for i in positions])
+        return vectors
+
+    def query_many(
+        self,
+        query_texts: List[str],
+        k: int = 5,
+        keyword_filter: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Batch retrieval across shards; results match ``DuckDBVectorStore.query_many``.
+
+        Variants are embedded once and every shard ranks all of them in one
+        pass. Each variant's per-shard rankings are merged into its global
+        top-k before the union is taken, and only the winners' rows are read.
+        """
+        query_texts = list(dict.fromkeys(query_texts))
+        if self.dimension is None or not query_texts:
+            return []
+        embeddings = self.shards[0]._embed_queries(query_texts)
+        executor = get_shard_executor()
+        if keyword_filter or self.search_mode == "hybrid":
+            return self._query_many_per_variant(
+                query_texts, embeddings, k, keyword_filter
+            )
+        per_shard = [
+            future.result()
+            for future in [
+                executor.submit(
+                    shard.rank_many_by_vectors,
+                    query_texts,
+                    embeddings,
+                    k,
+                    keyword_filter,
+                )
+                for shard in self.shards
+            ]
+        ]
+        rankings = [
+            heapq.nlargest(
+                k,
+                (hit for shard_rankings in per_shard for hit in shard_rankings[q]),
+                key=lambda hit: hit[1],
+            )
+            for q in range(len(query_texts))
+        ]
+        hits = _union_rankings(rankings)
+        by_shard: List[List[tuple]] = [[] for _ in self.shards]
+        for hit in hits:
+            by_shard[shard_for(hit[0], self.num_shards)].append(hit)
+        futures = [
+            executor.submit(shard._fetch_hits, shard_hits)
+            for shard, shard_hits in zip(self.shards, by_shard)
+            if shard_hits
+        ]
+        results = [r for future in futures for r in future.result()]
+        return sorted(results, key=lambda r: r["similarity"], reverse=True)
+
+    def _query_many_per_variant(
+        self,
+        query_texts: List[str],
+        embeddings: List[List[float]],
+        k: int,
+        keyword_filter: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        """Keyword-filtered or hybrid batch retrieval across shards.
+
+        Each variant's per-shard results are merged with :meth:`_merge`, so a
+        variant's top-k is chosen by match count (or fused score) exactly as
+        the single-file store chooses it, before the union is taken.
+        """
+        executor = get_shard_executor()
+        futures = [
+            [
+                executor.submit(shard.query_by_vector, text, emb, k, keyword_filter)
+                for shard in self.shards
+            ]
+            for text, emb in zip(query_texts, embeddings)
+        ]
+        best: Dict[str, Dict[str, Any]] = {}
+        for variant in futures:
+            merged = self._merge(
+                [future.result() for future in variant], k, keyword_filter, None
+            )
+            for r in merged:
+                kept = best.get(r["id"])
+                if kept is None or r["similarity"] > kept["similarity"]:
+                    best[r["id"]] = r
+        return sorted(best.values(), key=lambda r: r["similarity"], reverse=True)
+
+    def _merge(
+        self,
+        shard_results: List[List[Dict[str, Any]]],
+        k: int,
+        keyword_filter: Optional[List[str]],
+        mode: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """Merge per-shard rankings into a global top-k with a heap.
+
+        Hybrid results are merged on their fused score. Vector results are
+        merged on the number of filter keywords they carry, then similarity,
+        matching the single-file ordering.
+        """
+        candidates = [r for results in shard_results for r in results]
+        if (mode or self.search_mode) == "hybrid" and all(
+            "score" in r for r in candidates
+        ):
+            return heapq.nlargest(k, candidates, key=lambda r: r["score"])
+        if keyword_filter:
+            wanted = set(keyword_filter)
+            return heapq.nlargest(
+                k,
+                candidates,
+                key=lambda r: (
+                    len(wanted.intersection(r["metadata"].get("keywords", []))),
+                    r["similarity"],
+                ),
+            )
+        return heapq.nlargest(k, candidates, key=lambda r: r["similarity"])
+
+    def start_reindex(self, dimension: int) -> concurrent.futures.Future:
+        """Run :meth:`reindex_dimensions` on a background thread.
+
+        :param dimension: Target embedding width.
+        :type dimension: int
+        :return: Future resolving to the number of rows migrated.
+        :rtype: concurrent.futures.Future
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(self.reindex_dimensions(dimension))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(
+            target=run, name=f"reindex-{self.collection_name}", daemon=True
+        ).start()
+        return future
+
+    def reindex_dimensions(self, dimension: int) -> int:
+        """Shrink every shard's embeddings to ``dimension`` online.
+
+        Shards are copied in parallel and only swapped once all copies have
+        succeeded, so queries never mix widths across shards for long.
+
+        :param dimension: Target embedding width.
+        :type dimension: int
+        :return: Number of rows migrated.
+        :rtype: int
+        """
+        shards = [shard for shard in self.shards if shard.dimension is not None]
+        started = []
+        try:
+            for shard in shards:
+                shard._begin_reindex(dimension)
+                started.append(shard)
+            executor = get_shard_executor()
+            futures = [
+                executor.submit(shard._fill_reindex_table, REINDEX_BATCH_SIZE)
+                for shard in shards
+            ]
+            copied = sum(future.result() for future in futures)
+            for shard in shards:
+                shard._finish_reindex()
+        except BaseException:
+            for shard in started:
+                shard._abort_reindex()
+            raise
+        first = self.shards[0]
+        if first not in shards:
+            # An empty shard 0 was not re-indexed but still embeds for all
+            first.embedding = first._embedding_client(dimension)
+            first.query_cache.clear()
+        for shard in self.shards[1:]:
+            shard.embedding = first.embedding
+        return copied
+
+    def delete_source(self, source: str, keep_ids: Optional[List[str]] = None) -> int:
+        """Delete a source's documents from every shard in parallel.
+
+        Each shard deletes its part in one transaction; see
+        ``DuckDBVectorStore.delete_source``.
+        """
+        futures = [
+            get_shard_executor().submit(shard.delete_source, source, keep_ids)
+            for shard in self.shards
+        ]
+        return sum(future.result() for future in futures)
+
+    def sources(self) -> Dict[str, int]:
+        """Return the number of documents registered for each source."""
+        counts: Dict[str, int] = {}
+        for shard in self.shards:
+            for source, count in shard.sources().items():
+                counts[source] = counts.get(source, 0) + count
+        return counts
+
+    def content_fingerprint(self) -> str:
+        """Combine the shards' :meth:`DuckDBVectorStore.content_fingerprint`."""
+        return ",".join(shard.content_fingerprint() for shard in self.shards)
+
+    def get(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """Get up to ``limit`` documents, taken from the shards in order."""
+        docs: List[Dict[str, Any]] = []
+        for shard in self.shards:
+            if len(docs) >= limit:
+                break
+            if shard.dimension is None:
+                continue
+            docs.extend(shard.get(limit=limit - len(docs)))
+        return docs
+
+    def load_index(self, rebuild: bool = False) -> None:
+        """(Re)build every shard's in-process index."""
+        for shard in self.shards:
+            shard.load_index(rebuild=rebuild)
+
+    def rebuild_index(self) -> None:
+        """Rebuild every shard's in-process index from DuckDB."""
+        for shard in self.shards:
+            shard.rebuild_index()
+
+    def rebuild_fts(self) -> bool:
+        """Bring every shard's BM25 index up to date now.
+
+        :return: True if hybrid search can run on every shard.
+        :rtype: bool
+        """
+        return all([shard.rebuild_fts() for shard in self.shards])
+
+    def save_index(self) -> None:
+        """Persist every shard's HNSW graph, if one is in use."""
+        for shard in self.shards:
+            shard.save_index()
+
+    def index_stats(self) -> Dict[str, Any]:
+        """Report summed index size plus each shard's own stats."""
+        per_shard = [shard.index_stats() for shard in self.shards]
+        return {
+            "backend": per_shard[0]["backend"],
+            "shards": self.num_shards,
+            "rows": sum(s["rows"] for s in per_shard),
+            "memory_bytes": sum(s["memory_bytes"] for s in per_shard),
+            "per_shard": per_shard,
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Report the embedding cache metrics owned by shard 0."""
+        return self.shards[0].cache_stats()
+
+    def as_retriever(
+        self, search_kwargs: Optional[Dict[str, Any]] = None
+    ) -> DuckDBRetriever:
+        """Return a LangChain retriever over all shards.
+
+        :param search_kwargs: Optional search parameters for the retriever.
+        :type search_kwargs: Optional[Dict[str, Any]]
+        :return: DuckDBRetriever instance.
+        :rtype: DuckDBRetriever
+        """
+        return DuckDBRetriever(self, search_kwargs or {})
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Parquet snapshots of vector collections for fast warm starts.
+
+A snapshot directory holds, per DuckDB file of a collection (one, or one per
+shard), the collection table and its keyword postings as Parquet, plus a
+``manifest.json`` recording each file's SHA-256, row count, content
+fingerprint, embedding model and dimension. Importing verifies the file
+checksums before loading and the fingerprint after it, so a truncated or
+mismatched snapshot never replaces a collection.
+
+Set ``VECTOR_SNAPSHOT_DIR`` to have empty collections restored from
+``$VECTOR_SNAPSHOT_DIR/<collection>`` when they are first opened, e.g. in a
+container image that ships a prebuilt snapshot.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict
+
+from .config import VECTOR_SNAPSHOT_DIR
+from .database import collection_stores
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_FORMAT = 1
+
+
+def file_sha256(path: str) -> str:
+    """Compute the SHA-256 of a file.
+
+    :param path: File to hash.
+    :type path: str
+    :return: Hex digest.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_snapshot(store: Any, directory: str) -> Dict[str, Any]:
+    """Export a collection to Parquet files and write the manifest.
+
+    :param store: ``DuckDBVectorStore`` or ``ShardedDuckDBVectorStore``.
+    :type store: Any
+    :param directory: Output directory.
+    :type directory: str
+    :return: The manifest written to ``manifest.json``.
+    :rtype: Dict[str, Any]
+    """
+    start = time.perf_counter()
+    parts = []
+    for part_store in collection_stores(store):
+        entry = part_store.export_parquet(directory)
+        for key in ("table_file", "keywords_file"):
+            entry[f"{key}_sha256"] = file_sha256(os.path.join(directory, entry[key]))
+        parts.append(entry)
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "collection": store.collection_name,
+        "shards": len(parts),
+        "rows": sum(part["rows"] for part in parts),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "parts": parts,
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(
+        f"📦 Exported {manifest['rows']} rows of '{store.collection_name}' to "
+        f"'{directory}' in {time.perf_counter() - start:.2f}s"
+    )
+    return manifest
+
+
+def verify_snapshot(directory: str) -> Dict[str, Any]:
+    """Check every file in a snapshot against its recorded SHA-256.
+
+    :param directory: Snapshot directory.
+    :type directory: str
+    :return: The snapshot manifest.
+    :rtype: Dict[str, Any]
+    :raises FileNotFoundError: If the manifest or a data file is missing.
+    :raises ValueError: If a checksum does not match.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+    for part in manifest["parts"]:
+        for key in ("table_file", "keywords_file"):
+            path = os.path.join(directory, part[key])
+            if file_sha256(path) != part[f"{key}_sha256"]:
+                raise ValueError(f"Checksum mismatch for '{path}'")
+    return manifest
+
+
+def import_snapshot(store: Any, directory: str) -> int:
+    """Verify a snapshot and bulk-load it into a collection, replacing its rows.
+
+    :param store: ``DuckDBVectorStore`` or ``ShardedDuckDBVectorStore``.
+    :type store: Any
+    :param directory: Snapshot directory.
+    :type directory: str
+    :return: Number of rows loaded.
+    :rtype: int
+    :raises ValueError: If the snapshot fails verification or its layout
+                        (collection name, shard count) does not match the store.
+    """
+    start = time.perf_counter()
+    manifest = verify_snapshot(directory)
+    stores = collection_stores(store)
+    names = [part["collection"] for part in manifest["parts"]]
+    if names != [part_store.collection_name for part_store in stores]:
+        raise ValueError(
+            f"Snapshot holds {names}, which does not match the layout of "
+            f"'{store.collection_name}' ({len(stores)} files)"
+        )
+    rows = sum(
+        part_store.import_parquet(directory, part)
+        for part_store, part in zip(stores, manifest["parts"])
+    )
+    logger.info(
+        f"📦 Imported {rows} rows into '{store.collection_name}' from '{directory}' "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return rows
+
+
+def restore_snapshot_if_empty(store: Any, root: str = VECTOR_SNAPSHOT_DIR) -> bool:
+    """Load ``root/<collection>`` into a collection that has no rows yet.
+
+    :param store: ``DuckDBVectorStore`` or ``ShardedDuckDBVectorStore``.
+    :type store: Any
+    :param root: Directory holding one snapshot per collection; empty disables.
+    :type root: str
+    :return: True if a snapshot was imported.
+    :rtype: bool
+    """
+    if not root:
+        return False
+    directory = os.path.join(root, store.collection_name)
+    if not os.path.exists(os.path.join(directory, MANIFEST_FILE)):
+        return False
+    if any(
+        part.dimension is not None and part.get(limit=1)
+        for part in collection_stores(store)
+    ):
+        return False
+    try:
+        import_snapshot(store, directory)
+    except (OSError, ValueError) as e:
+        logger.warning(
+            f"⚠️ Could not restore '{store.collection_name}' from snapshot: {e}"
+        )
+        return False
+    return True
@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+In-process vector indexes for the DuckDB vector store.
+
+This module provides indexes that hold a collection's embeddings in memory so
+similarity search does not have to scan the DuckDB table on every query:
+
+- InMemoryVectorIndex: exact search over a contiguous, pre-normalised float32
+  matrix using a single matrix-vector product and ``np.argpartition`` (or
+  one matrix-matrix product for a batch of queries)
+- HNSWVectorIndex: approximate nearest-neighbour search with an hnswlib graph
+  persisted next to the collection's ``.db`` file, falling back to exact
+  search for small collections and keyword-filtered queries
+- QuantizedVectorIndex: the exact scan over an int8 (per-vector scale) or
+  float16 matrix, whose approximate scores are re-ranked by the caller
+
+DuckDB remains the source of truth; indexes are loaded from it on startup and
+kept in sync incrementally by ``DuckDBVectorStore.add_documents``.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    import hnswlib
+
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryVectorIndex:
+    """Exact cosine-similarity index over a pre-normalised float32 matrix.
+
+    Rows are L2-normalised on insert, so a query is one matrix-vector product
+    against the normalised query vector. Capacity grows geometrically to keep
+    incremental inserts amortised O(1) per row, and rows freed by
+    :meth:`remove` are reused by later inserts, so replacing documents does
+    not grow the matrix.
+
+    :param dimension: Number of floats per embedding.
+    :type dimension: int
+    :param initial_capacity: Number of rows to preallocate.
+    :type initial_capacity: int
+    """
+
+    # Scores returned by search are exact cosine similarities
+    exact_scores = True
+
+    def __init__(self, dimension: int, initial_capacity: int = 1024) -> None:
+        self.dimension = dimension
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._keyword_rows: Dict[str, Set[int]] = {}
+        self._row_keywords: List[Tuple[str, ...]] = []
+        # Rows of removed documents, reused before the matrix grows
+        self._free_rows: List[int] = []
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        self._resize_storage(initial_capacity)
+        self._alive = np.zeros(initial_capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _grow(self, required: int) -> None:
+        capacity = self._alive.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2)
+        self._resize_storage(new_capacity)
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[: len(self._ids)] = self._alive[: len(self._ids)]
+        self._alive = alive
+
+    def _resize_storage(self, capacity: int) -> None:
+        """Reallocate vector storage for ``capacity`` rows, keeping existing rows."""
+        matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = matrix
+
+    def _store_vector(self, row: int, vector: np.ndarray) -> None:
+        """Write a normalised vector into storage row ``row``."""
+        self._matrix[row] = vector
+
+    def _score_rows(self, rows: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """Score storage rows against a normalised query; None means all rows."""
+        if rows is None:
+            return self._matrix[: len(self._ids)] @ query
+        return self._matrix[rows] @ query
+
+    def _storage_bytes(self) -> int:
+        return self._matrix.nbytes
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        keywords: Optional[List[Iterable[Optional[str]]]] = None,
+    ) -> np.ndarray:
+        """Insert or replace rows in the index.
+
+        :param ids: Document identifiers, one per embedding.
+        :type ids: List[str]
+        :param embeddings: Matrix of shape (len(ids), dimension).
+        :type embeddings: np.ndarray
+        :param keywords: Optional keywords per document for pre-filtering.
+        :type keywords: Optional[List[Iterable[Optional[str]]]]
+        :return: Matrix row of each inserted document.
+        :rtype: np.ndarray
+        """
+        rows = np.zeros(len(ids), dtype=np.int64)
+        if not ids:
+            return rows
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(
+            len(ids), self.dimension
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-8)
+        with self._lock:
+            self._grow(len(self._ids) + max(len(ids) - len(self._free_rows), 0))
+            for i, doc_id in enumerate(ids):
+                row = self._positions.get(doc_id)
+                if row is None and self._free_rows:
+                    row = self._free_rows.pop()
+                    self._ids[row] = doc_id
+                    self._positions[doc_id] = row
+                elif row is None:
+                    row = len(self._ids)
+                    self._ids.append(doc_id)
+                    self._row_keywords.append(())
+                    self._positions[doc_id] = row
+                self._store_vector(row, vectors[i])
+                self._alive[row] = True
+                rows[i] = row
+                doc_keywords = tuple(
+                    kw for kw in (keywords[i] if keywords else ()) if kw is not None
+                )
+                self._set_keywords(row, doc_keywords)
+        return rows
+
+    def _set_keywords(self, row: int, doc_keywords: Tuple[str, ...]) -> None:
+        for kw in self._row_keywords[row]:
+            rows = self._keyword_rows.get(kw)
+            if rows is not None:
+                rows.discard(row)
+        for kw in doc_keywords:
+            self._keyword_rows.setdefault(kw, set()).add(row)
+        self._row_keywords[row] = doc_keywords
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Remove rows from the index.
+
+        Removed rows are masked out and their slots are reused by later inserts.
+
+        :param ids: Document identifiers to remove.
+        :type ids: Iterable[str]
+        """
+        with self._lock:
+            for doc_id in ids:
+                row = self._positions.pop(doc_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._set_keywords(row, ())
+                    self._free_rows.append(row)
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        keyword_filter: Optional[List[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return the ids and cosine similarities of the top-k rows.
+
+        :param query_embedding: Query vector of length ``dimension``.
+        :type query_embedding: np.ndarray
+        :param k: Number of results to return.
+        :type k: int
+        :param keyword_filter: Only rows carrying one of these keywords are
+                               considered; rows matching more of them rank first.
+        :type keyword_filter: Optional[List[str]]
+        :return: List of (id, similarity) pairs in rank order.
+        :rtype: List[Tuple[str, float]]
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-8)
+        match_counts = None
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return []
+            mask = self._alive[:n].copy()
+            if keyword_filter:
+                match_counts = np.zeros(n, dtype=np.int32)
+                for kw in set(keyword_filter):
+                    rows = self._keyword_rows.get(kw)
+                    if rows:
+                        match_counts[list(rows)] += 1
+                mask &= match_counts > 0
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return []
+            if candidates.size == n:
+                scores = self._score_rows(None, query)
+            else:
+                scores = self._score_rows(candidates, query)
+            ids = self._ids
+        # Cosine similarity spans [-1, 1], so one extra keyword match always
+        # outranks any similarity difference
+        rank_key = scores
+        if match_counts is not None:
+            rank_key = scores + 3.0 * match_counts[candidates]
+        k = min(k, scores.size)
+        top = np.argpartition(-rank_key, k - 1)[:k]
+        top = top[np.argsort(-rank_key[top])]
+        rows = top if candidates.size == n else candidates[top]
+        return [(ids[row], float(scores[i])) for row, i in zip(rows, top)]
+
+    def search_many(
+        self, query_embeddings: np.ndarray, k: int
+    ) -> List[List[Tuple[str, float]]]:
+        """Return the top-k rows for several queries with one matrix product.
+
+        :param query_embeddings: Matrix of shape (num_queries, dimension).
+        :type query_embeddings: np.ndarray
+        :param k: Number of results per query.
+        :type k: int
+        :return: One ranked list of (id, similarity) pairs per query.
+        :rtype: List[List[Tuple[str, float]]]
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(
+            -1, self.dimension
+        )
+        queries = queries / np.maximum(
+            np.linalg.norm(queries, axis=1, keepdims=True), 1e-8
+        )
+        with self._lock:
+            n = len(self._ids)
+            candidates = np.flatnonzero(self._alive[:n])
+            if candidates.size == 0 or k <= 0:
+                return [[] for _ in queries]
+            # (rows, num_queries) score matrix from a single pass over storage
+            if candidates.size == n:
+                scores = self._score_rows(None, queries.T)
+            else:
+                scores = self._score_rows(candidates, queries.T)
+            ids = self._ids
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+        results = []
+        for q in range(scores.shape[1]):
+            column = top[np.argsort(-scores[top[:, q], q]), q]
+            rows = column if candidates.size == n else candidates[column]
+            results.append(
+                [(ids[row], float(scores[i, q])) for row, i in zip(rows, column)]
+            )
+        return results
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index.
+
+        :return: Size in bytes of the matrix, masks and id bookkeeping.
+        :rtype: int
+        """
+        with self._lock:
+            id_bytes = sum(len(doc_id) + 49 for doc_id in self._ids)
+            keyword_bytes = sum(
+                len(kw) + 49 + 8 * len(rows) for kw, rows in self._keyword_rows.items()
+            )
+            return int(
+                self._storage_bytes()
+                + self._alive.nbytes
+                + id_bytes
+                + 8 * len(self._positions)
+                + keyword_bytes
+            )
+
+
+class HNSWVectorIndex(InMemoryVectorIndex):
+    """Approximate nearest-neighbour index backed by an hnswlib HNSW graph.
+
+    The exact float32 matrix of :class:`InMemoryVectorIndex` is kept alongside
+    the graph. It serves collections smaller than ``min_rows``, keyword-filtered
+    queries (whose candidate sets are already small) and exact re-scoring of
+    the graph's candidates. If hnswlib is not installed every query is exact.
+
+    :param dimension: Number of floats per embedding.
+    :type dimension: int
+    :param initial_capacity: Number of rows to preallocate.
+    :type initial_capacity: int
+    :param m: HNSW graph degree; higher improves recall at the cost of memory.
+    :type m: int
+    :param ef_construction: Candidate list size while building the graph.
+    :type ef_construction: int
+    :param ef_search: Candidate list size at query time; higher improves recall at the cost of latency.
+    :type ef_search: int
+    :param min_rows: Collections below this size are searched exactly.
+    :type min_rows: int
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        initial_capacity: int = 1024,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        min_rows: int = 10000,
+    ) -> None:
+        super().__init__(dimension, initial_capacity)
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.min_rows = min_rows
+        self._graph = None
+        self._id_labels: Dict[str, int] = {}
+        self._label_ids: List[Optional[str]] = []
+        if not HNSWLIB_AVAILABLE:
+            logger.warning("hnswlib not available, HNSW index will use exact search")
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        keywords: Optional[List[Iterable[Optional[str]]]] = None,
+        build: bool = True,
+    ) -> np.ndarray:
+        """Insert or replace rows, adding them to the graph if one is attached.
+
+        Without a graph, one is built once the index reaches ``min_rows``,
+        unless ``build`` is False. Bulk loads pass False and then either
+        :meth:`load` a persisted graph or :meth:`rebuild`, so the graph is
+        never built twice.
+
+        :param build: Build the graph if the index has reached ``min_rows``.
+        :type build: bool
+        :return: Matrix row of each inserted document.
+        :rtype: np.ndarray
+        """
+        with self._lock:
+            rows = super().add(ids, embeddings, keywords)
+            if self._graph is not None:
+                self._add_to_graph(ids, rows)
+            elif build and HNSWLIB_AVAILABLE and len(self) >= self.min_rows:
+                self.rebuild()
+            return rows
+
+    def _add_to_graph(self, ids: List[str], rows: np.ndarray) -> None:
+        labels = []
+        for doc_id in ids:
+            label = self._id_labels.get(doc_id)
+            if label is None:
+                label = len(self._label_ids)
+                self._label_ids.append(doc_id)
+                self._id_labels[doc_id] = label
+            labels.append(label)
+        needed = len(self._label_ids)
+        if needed > self._graph.get_max_elements():
+            self._graph.resize_index(max(needed, self._graph.get_max_elements() * 2))
+        self._graph.add_items(self._matrix[rows], np.asarray(labels))
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            ids = list(ids)
+            super().remove(ids)
+            for doc_id in ids:
+                label = self._id_labels.pop(doc_id, None)
+                if label is None:
+                    continue
+                self._label_ids[label] = None
+                if self._graph is not None:
+                    self._graph.mark_deleted(label)
+            # Deleted labels are never reused, so compact the graph once they
+            # outnumber the live ones
+            if self._graph is not None and len(self._label_ids) > 2 * len(
+                self._id_labels
+            ):
+                self.rebuild()
+
+    def rebuild(self) -> None:
+        """Build a fresh graph from the live rows of the exact matrix.
+
+        Deleted labels are dropped, so a rebuild also compacts the graph.
+        """
+        if not HNSWLIB_AVAILABLE:
+            return
+        with self._lock:
+            ids = list(self._positions)
+            graph = hnswlib.Index(space="ip", dim=self.dimension)
+            graph.init_index(
+                max_elements=max(len(ids), 1),
+                ef_construction=self.ef_construction,
+                M=self.m,
+            )
+            graph.set_ef(self.ef_search)
+            self._graph = graph
+            self._label_ids = []
+            self._id_labels = {}
+            if ids:
+                rows = np.fromiter((self._positions[i] for i in ids), dtype=np.int64)
+                self._add_to_graph(ids, rows)
+        logger.info(f"🕸️ HNSW graph built over {len(ids)} vectors")
+
+    def save(self, path: str) -> None:
+        """Persist the graph and its label mapping next to the collection.
+
+        :param path: Path of the graph file; the mapping is written to ``path + '.json'``.
+        :type path: str
+        """
+        with self._lock:
+            if self._graph is None:
+                return
+            self._graph.save_index(f"{path}.tmp")
+            with open(f"{path}.json.tmp", "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "dimension": self.dimension,
+                        "m": self.m,
+                        "ef_construction": self.ef_construction,
+                        "label_ids": self._label_ids,
+                    },
+                    f,
+                )
+        os.replace(f"{path}.tmp", path)
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    def load(self, path: str) -> bool:
+        """Attach a persisted graph to the rows already loaded into the index.
+
+        Ids missing from the index are marked deleted and rows without a label
+        are inserted, so a graph saved before later ingestion stays usable.
+
+        :param path: Path of the graph file written by :meth:`save`.
+        :type path: str
+        :return: True if the graph was loaded, False if it was missing or incompatible.
+        :rtype: bool
+        """
+        if not HNSWLIB_AVAILABLE or not os.path.exists(path):
+            return False
+        try:
+            with open(f"{path}.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("dimension") != self.dimension:
+                return False
+            graph = hnswlib.Index(space="ip", dim=self.dimension)
+            graph.load_index(path, max_elements=max(len(meta["label_ids"]), 1))
+        except Exception as e:
+            logger.warning(f"Could not load HNSW graph from {path}: {e}")
+            return False
+        with self._lock:
+            graph.set_ef(self.ef_search)
+            self._graph = graph
+            self._label_ids = meta["label_ids"]
+            self._id_labels = {}
+            for label, doc_id in enumerate(self._label_ids):
+                if doc_id is not None and doc_id in self._positions:
+                    self._id_labels[doc_id] = label
+                    continue
+                self._label_ids[label] = None
+                try:
+                    graph.mark_deleted(label)
+                except RuntimeError:
+                    pass  # already deleted when the graph was saved
+            missing = [i for i in self._positions if i not in self._id_labels]
+            if missing:
+                rows = np.fromiter((self._positions[i] for i in missing), np.int64)
+                self._add_to_graph(missing, rows)
+        return True
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        keyword_filter: Optional[List[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        with self._lock:
+            graph = self._graph
+            live = len(self)
+        if graph is None or keyword_filter or live < self.min_rows:
+            return super().search(query_embedding, k, keyword_filter)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-8)
+        with self._lock:
+            k = min(k, len(self))
+            if k <= 0:
+                return []
+            labels, _ = graph.knn_query(query, k=k)
+            ids = [self._label_ids[label] for label in labels[0]]
+            ids = [doc_id for doc_id in ids if doc_id in self._positions]
+            rows = np.fromiter((self._positions[i] for i in ids), dtype=np.int64)
+            # Re-score exactly so similarities match the DuckDB path
+            scores = self._matrix[rows] @ query
+        order = np.argsort(-scores)
+        return [(ids[i], float(scores[i])) for i in order]
+
+    def search_many(
+        self, query_embeddings: np.ndarray, k: int
+    ) -> List[List[Tuple[str, float]]]:
+        with self._lock:
+            graph = self._graph
+            live = len(self)
+        if graph is None or live < self.min_rows:
+            return super().search_many(query_embeddings, k)
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(
+            -1, self.dimension
+        )
+        queries = queries / np.maximum(
+            np.linalg.norm(queries, axis=1, keepdims=True), 1e-8
+        )
+        with self._lock:
+            k = min(k, len(self))
+            if k <= 0:
+                return [[] for _ in queries]
+            # hnswlib searches the whole batch in one call
+            labels, _ = graph.knn_query(queries, k=k)
+            results = []
+            for query, row_labels in zip(queries, labels):
+                ids = [self._label_ids[label] for label in row_labels]
+                ids = [doc_id for doc_id in ids if doc_id in self._positions]
+                rows = np.fromiter((self._positions[i] for i in ids), dtype=np.int64)
+                scores = self._matrix[rows] @ query
+                order = np.argsort(-scores)
+                results.append([(ids[i], float(scores[i])) for i in order])
+        return results
+
+    def memory_bytes(self) -> int:
+        size = super().memory_bytes()
+        with self._lock:
+            if self._graph is not None:
+                elements = self._graph.get_max_elements()
+                # hnswlib stores each vector plus ~2*M links of 4 bytes per element
+                size += elements * (4 * self.dimension + 8 * self.m + 16)
+        return size
+
+    def stats(self) -> Dict[str, object]:
+        """Report ANN parameters and graph state.
+
+        :return: Dictionary describing the graph and its tuning parameters.
+        :rtype: Dict[str, object]
+        """
+        with self._lock:
+            return {
+                "hnswlib_available": HNSWLIB_AVAILABLE,
+                "graph_built": self._graph is not None,
+                "graph_labels": len(self._label_ids),
+                "m": self.m,
+                "ef_construction": self.ef_construction,
+                "ef_search": self.ef_search,
+                "min_rows": self.min_rows,
+            }
+
+
+class QuantizedVectorIndex(InMemoryVectorIndex):
+    """Exact-scan index over int8 or float16 vectors.
+
+    ``"int8"`` stores each normalised vector as int8 codes with a float32
+    per-vector scale (about 4x smaller than float32); ``"float16"`` halves it
+    but is slower to score, as NumPy has no fast float16 conversion.
+    Scores are approximate, so callers should ask for a shortlist larger than
+    k and re-rank it against full-precision vectors (see ``exact_scores``).
+
+    :param dimension: Number of floats per embedding.
+    :type dimension: int
+    :param initial_capacity: Number of rows to preallocate.
+    :type initial_capacity: int
+    :param quantization: ``"int8"`` or ``"float16"``.
+    :type quantization: str
+    :raises ValueError: If the quantization name is unknown.
+    """
+
+    exact_scores = False
+    # Rows dequantised per step while scoring; small blocks stay cache-resident
+    _SCORE_BLOCK = 256
+
+    def __init__(
+        self, dimension: int, initial_capacity: int = 1024, quantization: str = "int8"
+    ) -> None:
+        if quantization not in ("int8", "float16"):
+            raise ValueError(f"Unknown quantization: {quantization}")
+        self.quantization = quantization
+        self._scales: Optional[np.ndarray] = None
+        super().__init__(dimension, initial_capacity)
+
+    def _resize_storage(self, capacity: int) -> None:
+        dtype = np.int8 if self.quantization == "int8" else np.float16
+        codes = np.zeros((capacity, self.dimension), dtype=dtype)
+        scales = np.zeros(capacity, dtype=np.float32)
+        if self._matrix is not None:
+            n = len(self._ids)
+            codes[:n] = self._matrix[:n]
+            scales[:n] = self._scales[:n]
+        self._matrix, self._scales = codes, scales
+
+    def _store_vector(self, row: int, vector: np.ndarray) -> None:
+        if self.quantization == "int8":
+            scale = max(float(np.abs(vector).max()), 1e-8) / 127.0
+            self._matrix[row] = np.round(vector / scale).astype(np.int8)
+            self._scales[row] = scale
+        else:
+            self._matrix[row] = vector.astype(np.float16)
+
+    def _score_rows(self, rows: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        count = len(self._ids) if rows is None else len(rows)
+        # query is one vector or a (dimension, num_queries) matrix
+        scores = np.empty((count,) + query.shape[1:], dtype=np.float32)
+        for start in range(0, count, self._SCORE_BLOCK):
+            stop = min(start + self._SCORE_BLOCK, count)
+            block = slice(start, stop) if rows is None else rows[start:stop]
+            scores[start:stop] = self._matrix[block].astype(np.float32) @ query
+            if self.quantization == "int8":
+                scale = self._scales[block]
+                scores[start:stop] *= scale if query.ndim == 1 else scale[:, None]
+        return scores
+
+    def _storage_bytes(self) -> int:
+        return self._matrix.nbytes + (
+            self._scales.nbytes if self.quantization == "int8" else 0
+        )
+
+
+def create_vector_index(
+    backend: str, dimension: int, initial_capacity: int = 1024, **options
+) -> Optional[InMemoryVectorIndex]:
+    """Create the in-process index for a vector store backend name.
+
+    :param backend: ``"duckdb"`` (no index), ``"memory"`` (exact) or ``"hnsw"`` (ANN).
+    :type backend: str
+    :param dimension: Number of floats per embedding.
+    :type dimension: int
+    :param initial_capacity: Number of rows to preallocate.
+    :type initial_capacity: int
+    :param options: ``quantization`` (``"none"``, ``"int8"`` or ``"float16"``)
+                    for the memory backend, HNSW parameters for the hnsw backend.
+    :return: The index, or None when queries should be served by DuckDB.
+    :rtype: Optional[InMemoryVectorIndex]
+    :raises ValueError: If the backend name is unknown.
+    """
+    if backend == "duckdb":
+        return None
+    if backend == "memory":
+        quantization = options.get("quantization", "none")
+        if quantization != "none":
+            return QuantizedVectorIndex(dimension, initial_capacity, quantization)
+        return InMemoryVectorIndex(dimension, initial_capacity)
+    if backend == "hnsw":
+        return HNSWVectorIndex(dimension, initial_capacity, **options)
+    raise ValueError(f"Unknown vector index backend: {backend}")
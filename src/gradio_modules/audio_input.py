@@ -1,5 +1,6 @@
 import gradio as gr
 from backend.chat import get_chatbot_response
+from backend.markdown_formatter import format_markdown
 
 
 async def transcribe_and_respond_wrapper(
@@ -102,7 +103,7 @@ def toggle_edit_mode(transcription_output):
     return transcription_output, gr.update(visible=False), gr.update(visible=True)
 
 
-def send_edited_transcription_wrapper(
+async def send_edited_transcription_wrapper(
     edit_transcription, username_state, audio_history_state
 ):
     """Send edited transcription to chatbot and update history."""
@@ -110,9 +111,10 @@ def send_edited_transcription_wrapper(
     transcript = edit_transcription
     response = ""
     if transcript:
-        response_gen = get_chatbot_response(username, "audio_chat", transcript)
-        for chunk in response_gen:
+        # The backend streams raw tokens; format the complete answer once
+        async for chunk in get_chatbot_response(username, "audio_chat", transcript):
             response += chunk
+        response = format_markdown(response)
     history = audio_history_state if isinstance(audio_history_state, list) else []
     history.append({"audio": "edited", "transcript": transcript, "response": response})
     history_md = (
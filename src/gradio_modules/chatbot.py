@@ -24,6 +24,7 @@ The module integrates with Gradio to provide a web-based chat interface with:
 
 import logging
 import difflib
+from typing import AsyncIterator
 import gradio as gr
 from backend.chat import (
     get_chatbot_response,
@@ -40,7 +41,12 @@ async def _handle_send_message(
     username: str,
     _unused_chat_id: str,
     *_,
-) -> tuple:
+) -> AsyncIterator[tuple]:
+    """Answer a chat message, updating the chatbot as answer tokens arrive.
+
+    Partial answers are shown unformatted; the complete answer is formatted
+    and persisted once the stream ends.
+    """
     import uuid
 
     chat_id = f"chat_{uuid.uuid4().hex[:8]}"
@@ -63,13 +69,14 @@ async def _handle_send_message(
 
     if not user_message or not username:
         history = db.get_chat_messages(chat_id)
-        return (
+        yield (
             to_gradio_pairs(history),
             "",  # Clear user input box
             gr.State({}),
             to_gradio_pairs(history),
             gr.update(),
         )
+        return
 
     # Persist user message asynchronously
     await save_message_async(chat_id, username, "user", user_message)
@@ -96,9 +103,15 @@ async def _handle_send_message(
 
     try:
         response_generator = get_chatbot_response(username, chat_id, user_message)
+        pairs = to_gradio_pairs(history)
+        if pairs and pairs[-1][1] is None:
+            pairs.pop()  # The pending user message, shown with its partial answer
+        pairs.append((user_message, ""))
         full_response = ""
         async for chunk in response_generator:
             full_response += chunk
+            pairs[-1] = (user_message, full_response)
+            yield (pairs, "", gr.State({}), pairs, gr.update())
         # Pass response through markdown formatter
         from backend.markdown_formatter import format_markdown
 
@@ -110,7 +123,7 @@ async def _handle_send_message(
         pairs = to_gradio_pairs(updated_history)
         if pairs and pairs[-1][1] is not None:
             pairs[-1] = (pairs[-1][0], formatted_response)
-        return (
+        yield (
             pairs,
             "",
             gr.State({}),
@@ -119,7 +132,7 @@ async def _handle_send_message(
         )
     except Exception as e:
         logger.error(f"Error during chatbot response: {e}", exc_info=True)
-        return (
+        yield (
             to_gradio_pairs(history),
             f"Error: {str(e)}",
             gr.State({}),
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Semantic cache of chat answers for near-duplicate questions.
+
+The keyword cache only catches questions that are identical once stopwords
+are removed. :class:`AnswerCache` keeps answered questions with their
+embeddings in a DuckDB table of its own and answers a new question from the
+most similar stored one whose cosine similarity reaches
+``ANSWER_CACHE_THRESHOLD``, skipping retrieval and the LLM call.
+
+Every entry records the fingerprint of what its answer was derived from: the
+prompts, the chat model and the collection's contents. Entries under any other
+fingerprint are deleted as soon as it changes, so edited prompts or
+re-ingested documents never serve stale answers. Lookups are served from an
+in-process matrix of the current entries' embeddings. Hits, misses and the
+latency saved are counted per process and exposed through
+:meth:`AnswerCache.stats`.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import duckdb
+import numpy as np
+
+from backend.config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_THRESHOLD,
+)
+from backend.embedding_cache import text_hash
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class AnswerCache:
+    """DuckDB-backed cache of answers, looked up by question embedding.
+
+    :param path: Path of the DuckDB file.
+    :type path: str
+    :param threshold: Minimum cosine similarity for a hit.
+    :type threshold: float
+    :param max_entries: Entries kept before evicting; 0 disables eviction.
+    :type max_entries: int
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.seconds_saved = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = duckdb.connect(path)
+        # No key or index: DuckDB cannot update rows of indexed tables in place,
+        # and the table is only scanned by id to fetch a hit
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS answer_cache (
+                id VARCHAR NOT NULL,
+                fingerprint VARCHAR NOT NULL,
+                question VARCHAR NOT NULL,
+                answer VARCHAR NOT NULL,
+                context VARCHAR NOT NULL,
+                embedding FLOAT[] NOT NULL,
+                answer_seconds DOUBLE NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_used DOUBLE NOT NULL
+            )
+            """
+        )
+        # Current fingerprint, and its entries' ids and unit-length embeddings
+        self._fingerprint: Optional[str] = None
+        self._ids: List[str] = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    def _load(self, fingerprint: str) -> None:
+        """Drop entries of other fingerprints and load the matrix for this one."""
+        (stale,) = self._conn.execute(
+            "SELECT count(*) FROM answer_cache WHERE fingerprint <> ?", [fingerprint]
+        ).fetchone()
+        if stale:
+            self._conn.execute(
+                "DELETE FROM answer_cache WHERE fingerprint <> ?", [fingerprint]
+            )
+            self.invalidations += stale
+            logger.info(
+                f"♻️ Answer cache invalidated {stale} answers after a prompt or collection change"
+            )
+        rows = self._conn.execute(
+            "SELECT id, embedding FROM answer_cache WHERE fingerprint = ?",
+            [fingerprint],
+        ).fetchall()
+        self._fingerprint = fingerprint
+        self._ids = [row[0] for row in rows]
+        self._matrix = (
+            _normalize(np.asarray([row[1] for row in rows], dtype=np.float32))
+            if rows
+            else np.empty((0, 0), dtype=np.float32)
+        )
+
+    def lookup(
+        self, fingerprint: str, embedding: Sequence[float], spent: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """Find the cached answer to the most similar question.
+
+        :param fingerprint: Fingerprint of the prompts, model and collection.
+        :type fingerprint: str
+        :param embedding: Embedding of the incoming question.
+        :type embedding: Sequence[float]
+        :param spent: Seconds the turn has already spent, e.g. embedding the
+                      question; deducted from the latency saved by a hit.
+        :type spent: float
+        :return: ``question``, ``answer``, ``context``, ``similarity`` and
+                 ``seconds_saved`` of the hit, or None on a miss.
+        :rtype: Optional[Dict[str, Any]]
+        """
+        start = time.perf_counter()
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._load(fingerprint)
+            if not self._ids or self._matrix.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+            scores = self._matrix @ query
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            question, answer, context, answer_seconds = self._conn.execute(
+                "UPDATE answer_cache SET hits = hits + 1, last_used = ? WHERE id = ? "
+                "RETURNING question, answer, context, answer_seconds",
+                [time.time(), self._ids[best]],
+            ).fetchone()
+            saved = max(answer_seconds - spent - (time.perf_counter() - start), 0.0)
+            self.hits += 1
+            self.seconds_saved += saved
+            lookups = self.hits + self.misses
+            logger.info(
+                f"⚡ Answer cache hit (similarity {similarity:.3f}) saved {saved:.2f}s; "
+                f"hit rate {self.hits / lookups:.1%}, {self.seconds_saved:.1f}s saved in total"
+            )
+        return {
+            "question": question,
+            "answer": answer,
+            "context": context,
+            "similarity": similarity,
+            "seconds_saved": saved,
+        }
+
+    def put(
+        self,
+        fingerprint: str,
+        question: str,
+        embedding: Sequence[float],
+        answer: str,
+        context: str,
+        answer_seconds: float,
+    ) -> None:
+        """Cache the answer to a question.
+
+        :param fingerprint: Fingerprint of the prompts, model and collection.
+        :type fingerprint: str
+        :param question: The question as asked.
+        :type question: str
+        :param embedding: Embedding of the question.
+        :type embedding: Sequence[float]
+        :param answer: The generated answer.
+        :type answer: str
+        :param context: The retrieved context the answer was generated from.
+        :type context: str
+        :param answer_seconds: Seconds the turn took to produce the answer.
+        :type answer_seconds: float
+        """
+        entry_id = text_hash(f"{fingerprint}\0{question}")
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._load(fingerprint)
+            if self._ids and self._matrix.shape[1] != vector.shape[0]:
+                return
+            self._conn.execute("DELETE FROM answer_cache WHERE id = ?", [entry_id])
+            self._conn.execute(
+                "INSERT INTO answer_cache (id, fingerprint, question, answer, "
+                "context, embedding, answer_seconds, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    entry_id,
+                    fingerprint,
+                    question,
+                    answer,
+                    context,
+                    vector.tolist(),
+                    answer_seconds,
+                    time.time(),
+                ],
+            )
+            row = _normalize(vector)[None, :]
+            if entry_id in self._ids:
+                self._matrix[self._ids.index(entry_id)] = row[0]
+            else:
+                self._ids.append(entry_id)
+                self._matrix = (
+                    np.vstack([self._matrix, row]) if self._matrix.size else row
+                )
+            if self.max_entries and len(self._ids) > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until 90% of the budget is free."""
+        keep = int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM answer_cache WHERE id IN (SELECT id FROM answer_cache "
+            "ORDER BY last_used DESC OFFSET ?)",
+            [keep],
+        )
+        removed = len(self._ids) - keep
+        self._load(self._fingerprint)
+        logger.info(f"🧹 Answer cache evicted {removed} answers")
+
+    def clear(self) -> None:
+        """Remove every cached answer and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM answer_cache")
+            self._fingerprint = None
+            self._ids = []
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+            self.hits = self.misses = self.invalidations = 0
+            self.seconds_saved = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, latency saved and the cache's size.
+
+        :return: Dictionary with hits, misses, hit_rate, seconds_saved,
+                 invalidations, entries, threshold and path.
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT count(*) FROM answer_cache"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "seconds_saved": self.seconds_saved,
+                "invalidations": self.invalidations,
+                "entries": entries,
+                "threshold": self.threshold,
+                "path": self.path,
+            }
+
+    def close(self) -> None:
+        """Close the underlying DuckDB connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_answer_cache: Optional[AnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """Return the process-wide answer cache, or None when disabled.
+
+    :return: The shared :class:`AnswerCache` instance, or None.
+    :rtype: Optional[AnswerCache]
+    """
+    global _answer_cache
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            try:
+                _answer_cache = AnswerCache(ANSWER_CACHE_PATH)
+            except Exception as e:
+                logger.warning(f"⚠️ Answer cache unavailable: {e}")
+                return None
+        return _answer_cache
@@ -4,28 +4,47 @@ Chat Model module for the NYP FYP CNC Chatbot.
 Integrates with OpenAI and other LLM providers. Loads API keys and configuration from environment variables using dotenv.
 """
 
+import asyncio
 import contextlib
+import time
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langgraph.config import get_stream_writer
 from langgraph.graph import START, StateGraph
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langchain.prompts import PromptTemplate
-from typing import Sequence, List, Any, Optional, Dict, TypedDict  # noqa: F401
+from typing import (  # noqa: F401
+    Sequence,
+    List,
+    Any,
+    AsyncIterator,
+    Optional,
+    Dict,
+    Set,
+    TypedDict,
+)
 import openai
 import os
 import json
-import aiosqlite  # <--- ADD THIS IMPORT
 from openai.types.chat import ChatCompletionToolParam
 from openai.types.shared_params import FunctionDefinition
 import logging
 import threading
-from llm.keyword_cache import get_cached_response, set_cached_response
+import aiosqlite
+from llm.keyword_cache import (
+    aget_cached_response,
+    aset_cached_response,
+    get_cached_response,
+    set_cached_response,
+)
+from llm.checkpoint_pool import get_app_pool
+from llm.answer_cache import get_answer_cache
 from system_prompts import (
     get_chat_prompt_template,
     get_chat_contextual_sys_prompt,
     get_chat_system_prompt,
 )
+from backend.embedding_cache import text_hash
 from backend.markdown_formatter import format_markdown
 from infra_utils import rel2abspath, create_folders
 
@@ -69,9 +88,21 @@ CACHE_DIR = os.path.join(BASE_CHATBOT_DIR, "data", "cache")
 # Use capital letters for the API key variable
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+# Chunks retrieved as context per turn, and messages of history kept per thread
+CHAT_RETRIEVAL_K = int(os.getenv("CHAT_RETRIEVAL_K", "5"))
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "20"))
+
+# Seconds before a keyword match request is abandoned, and the size of each
+# event loop's shared HTTP connection pool to OpenAI
+KEYWORD_MATCH_TIMEOUT = float(os.getenv("KEYWORD_MATCH_TIMEOUT", "10"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+
 llm: Optional[ChatOpenAI] = None
 embedding: Optional[OpenAIEmbeddings] = None
 client: Optional[openai.OpenAI] = None
+# One AsyncOpenAI client per event loop; see _get_async_client
+async_clients: Dict[Any, openai.AsyncOpenAI] = {}
+async_clients_lock = threading.Lock()
 db: Optional[Any] = None
 app = None
 llm_init_lock = threading.Lock()
@@ -216,35 +247,40 @@ async def initialize_llm_and_db() -> None:
             logging.critical("One or more core components failed to initialize.")
 
 
+def _build_workflow() -> StateGraph:
+    """Build the LangGraph state machine for conversational AI."""
+    workflow = StateGraph(state_schema=State)
+    workflow.add_node("retrieve", retrieve_context)
+    workflow.add_node("model", call_model)
+    workflow.add_node("cached", answer_from_cache)
+    workflow.add_edge(START, "retrieve")
+    workflow.add_conditional_edges(
+        "retrieve",
+        lambda state: "cached" if state.get("cached_answer") else "model",
+        ["model", "cached"],
+    )
+    return workflow
+
+
+def _compile_with_checkpointer(checkpointer: Any) -> Any:
+    """Compile the workflow against a shared checkpoint connection."""
+    return _build_workflow().compile(checkpointer=checkpointer)
+
+
 async def _initialize_langgraph_workflow() -> None:
     """Initialize the LangGraph workflow for conversational AI.
 
-    This function creates and configures the LangGraph state machine
-    for handling conversational AI workflows with memory persistence.
+    ``app`` is compiled without a checkpointer and answers only when the
+    checkpoint database cannot be reached. Chat turns normally stream through
+    the app compiled against the running event loop's checkpoint connection
+    (see :mod:`llm.checkpoint_pool`), so no turn connects or compiles.
     """
     global app
 
-    workflow = StateGraph(state_schema=State)
-    workflow.add_node("model", call_model)
-    workflow.add_edge(START, "model")
-
-    try:
-        logging.info(f"Attempting to connect to SQLite at: {LANGCHAIN_CHECKPOINT_PATH}")
-        # Create a new connection for each compilation to avoid event loop binding issues
-        conn = await aiosqlite.connect(LANGCHAIN_CHECKPOINT_PATH)
-        sqlite_saver = AsyncSqliteSaver(conn)
-        app = workflow.compile(checkpointer=sqlite_saver)
-        # Close the connection after compilation to avoid keeping it bound to the event loop
-        await conn.close()
-        logging.info(
-            f"LangGraph workflow compiled with checkpointing at {LANGCHAIN_CHECKPOINT_PATH}"
-        )
-    except Exception as e:
-        logging.warning(f"Failed to connect to SQLite checkpoint: {e}")
-        app = workflow.compile()
-        logging.warning(
-            "LangGraph compiled without checkpointing. State will not persist across runs."
-        )
+    app = _build_workflow().compile()
+    logging.info(
+        f"LangGraph workflow compiled; checkpoints pooled at {LANGCHAIN_CHECKPOINT_PATH}"
+    )
 
 
 def is_llm_ready() -> bool:
@@ -285,8 +321,89 @@ qa_prompt = ChatPromptTemplate.from_messages(
 
 
 # --- Keyword Matching Function ---
-def match_keywords(question: str) -> List[str]:
-    """Match a question to relevant keywords using OpenAI function calling.
+KEYWORD_MATCH_TOOL = ChatCompletionToolParam(
+    type="function",
+    function=FunctionDefinition(
+        name="match_keywords",
+        description="Match the question to relevant keywords",
+        parameters={
+            "type": "object",
+            "properties": {
+                "prediction": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of matched keywords",
+                }
+            },
+            "required": ["prediction"],
+        },
+    ),
+)
+
+
+def _keyword_match_request(question: str) -> Dict[str, Any]:
+    """Build the chat completion arguments for keyword matching."""
+    return {
+        "model": "gpt-4o-mini",
+        "temperature": 0.0,
+        "messages": [
+            {
+                "role": "user",
+                "content": f"Match the following question to relevant keywords: {question}",
+            }
+        ],
+        "tools": [KEYWORD_MATCH_TOOL],
+        "tool_choice": {"type": "function", "function": {"name": "match_keywords"}},
+        "timeout": KEYWORD_MATCH_TIMEOUT,
+    }
+
+
+def _parse_cached_keywords(cached: Optional[str]) -> Optional[List[str]]:
+    """Decode a keyword cache entry, or None if missing or malformed."""
+    if cached is not None:
+        with contextlib.suppress(Exception):
+            predictions = json.loads(cached)
+            if isinstance(predictions, list):
+                return predictions
+    return None
+
+
+def _get_async_client() -> Optional[openai.AsyncOpenAI]:
+    """Return the running event loop's AsyncOpenAI client, creating it on first use.
+
+    httpx connection pools are bound to the loop that opened them, so each loop
+    gets one client whose pool all of its keyword matches share.
+    """
+    if not OPENAI_API_KEY:
+        return None
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    with async_clients_lock:
+        for closed in [other for other in async_clients if other.is_closed()]:
+            del async_clients[closed]
+        async_client = async_clients.get(loop)
+        if async_client is None:
+            async_client = openai.AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                    ),
+                    timeout=KEYWORD_MATCH_TIMEOUT,
+                ),
+            )
+            async_clients[loop] = async_client
+        return async_client
+
+
+async def amatch_keywords(question: str) -> List[str]:
+    """Match a question to relevant keywords without blocking the event loop.
+
+    Uses the loop's shared :class:`openai.AsyncOpenAI` client and reads and
+    writes the keyword cache on worker threads. A request that takes longer
+    than ``KEYWORD_MATCH_TIMEOUT`` seconds gives up and matches nothing.
 
     :param question: The question text to match against keywords.
     :type question: str
@@ -295,51 +412,60 @@ def match_keywords(question: str) -> List[str]:
     """
     if not question:
         return []
-    cached = get_cached_response(question)
+    cached = _parse_cached_keywords(await aget_cached_response(question))
     if cached is not None:
-        with contextlib.suppress(Exception):
-            predictions = json.loads(cached)
-            if isinstance(predictions, list):
-                return predictions
+        return cached
+    async_client = _get_async_client()
+    if async_client is None:
+        logging.error("OpenAI client not initialized")
+        return []
     try:
+        r = await async_client.chat.completions.create(
+            **_keyword_match_request(question)
+        )
+        predictions = _extract_predictions_from_response(r, question)
+        await aset_cached_response(question, json.dumps(predictions))
+        return predictions
+    except openai.APITimeoutError:
+        logging.warning(
+            f"Keyword matching timed out after {KEYWORD_MATCH_TIMEOUT}s for '{question}'"
+        )
+        return []
+    except openai.APIError as e:
+        logging.error(
+            f"OpenAI API error during keyword matching for '{question}': {e}",
+            exc_info=True,
+        )
+        return []
+    except Exception as e:
+        logging.error(
+            f"An unexpected error occurred during keyword matching for '{question}': {e}",
+            exc_info=True,
+        )
+        return []
 
-        def get_chat_completion():
-            return ChatCompletionToolParam(
-                type="function",
-                function=FunctionDefinition(
-                    name="match_keywords",
-                    description="Match the question to relevant keywords",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "prediction": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "List of matched keywords",
-                            }
-                        },
-                        "required": ["prediction"],
-                    },
-                ),
-            )
 
-        tool_param = get_chat_completion()
+def match_keywords(question: str) -> List[str]:
+    """Match a question to relevant keywords using OpenAI function calling.
+
+    Blocking version of :func:`amatch_keywords` for synchronous callers.
+
+    :param question: The question text to match against keywords.
+    :type question: str
+    :return: List of matched keywords.
+    :rtype: List[str]
+    """
+    if not question:
+        return []
+    cached = _parse_cached_keywords(get_cached_response(question))
+    if cached is not None:
+        return cached
+    try:
         if client is None:
             logging.error("OpenAI client not initialized")
             return []
 
-        r = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.0,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"Match the following question to relevant keywords: {question}",
-                }
-            ],
-            tools=[tool_param],
-            tool_choice={"type": "function", "function": {"name": "match_keywords"}},
-        )
+        r = client.chat.completions.create(**_keyword_match_request(question))
         predictions = _extract_predictions_from_response(r, question)
         set_cached_response(question, json.dumps(predictions))
         return predictions
@@ -422,25 +548,22 @@ def route_retriever(question: str) -> Optional[Any]:
         )
         return None
 
-    matched_keywords = match_keywords(question)
+    return _retriever_for_keywords(match_keywords(question))
 
+
+def _retriever_for_keywords(matched_keywords: List[str]) -> Any:
+    """Return a retriever filtered on ``matched_keywords``, or unfiltered if empty."""
     if not matched_keywords:
         logging.info("No keywords matched for routing, returning default retriever.")
-        if db:
-            return db.as_retriever(search_kwargs={"k": 5})
-        logging.error("db is None in route_retriever's default path.")
-        return None
+        return db.as_retriever(search_kwargs={"k": CHAT_RETRIEVAL_K})
 
     keyword_filter = build_keyword_filter(matched_keywords)
     logging.info(
         f"Keywords matched: {matched_keywords}. Applying filter: {keyword_filter}."
     )
-    if db:
-        return db.as_retriever(
-            search_kwargs={"k": 5, "filter": {"keywords": matched_keywords}}
-        )
-    logging.error("db is None in route_retriever's filtered path.")
-    return None
+    return db.as_retriever(
+        search_kwargs={"k": CHAT_RETRIEVAL_K, "filter": {"keywords": matched_keywords}}
+    )
 
 
 # --- LangGraph State and Nodes ---
@@ -453,18 +576,150 @@ class State(TypedDict):
         chat_history: Sequence of conversation messages.
         context: Retrieved context for the current query.
         answer: Generated response.
+        timings: Seconds spent in each stage of the current turn.
+        cached_answer: Answer found in the answer cache, if any.
     """
 
     input: str
     chat_history: Sequence[BaseMessage]
     context: str
     answer: str
+    timings: Dict[str, float]
+    cached_answer: str
+
+
+async def _timed(timings: Dict[str, float], stage: str, awaitable: Any) -> Any:
+    """Await ``awaitable`` and record its duration under ``stage``."""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = time.perf_counter() - start
+
+
+def _answer_fingerprint() -> str:
+    """Fingerprint of everything a cached answer depends on besides the question."""
+    return text_hash(
+        "\0".join(
+            [
+                system_prompt,
+                contextualize_q_system_prompt,
+                str(getattr(llm, "model_name", "")),
+                str(db.dimension),
+                db.content_fingerprint(),
+            ]
+        )
+    )
+
+
+def _lookup_answer(embedded: List[float], spent: float) -> Optional[Dict[str, Any]]:
+    """Look up a cached answer for a question embedding; runs on a worker thread."""
+    answer_cache = get_answer_cache()
+    if answer_cache is None:
+        return None
+    return answer_cache.lookup(_answer_fingerprint(), embedded, spent)
+
+
+def _store_answer(
+    question: str, embedded: List[float], answer: str, context: str, seconds: float
+) -> None:
+    """Cache a generated answer; runs on a worker thread."""
+    answer_cache = get_answer_cache()
+    if answer_cache is not None:
+        answer_cache.put(
+            _answer_fingerprint(), question, embedded, answer, context, seconds
+        )
+
+
+async def retrieve_context(state: State) -> Dict[str, Any]:
+    """
+    Fill ``context`` with the chunks most relevant to the question.
+
+    The keyword match and the query embedding are both network round-trips,
+    so they run concurrently; the search then reuses the cached embedding.
+    The thread's history is already loaded from the checkpoint when the node
+    runs. A keyword-filtered search that finds nothing falls back to an
+    unfiltered one.
+
+    A question that opens a thread is first looked up in the answer cache by
+    its embedding; on a hit the cached answer is returned as
+    ``cached_answer`` without searching. The keyword match is cancelled
+    whenever the node returns or raises before it finishes.
+
+    Args:
+        state: Current LangGraph state.
+
+    Returns:
+        State update with ``context``, ``cached_answer`` and the stage ``timings``.
+    """
+    question = state["input"]
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    if db is None or not question:
+        return {"context": "", "timings": timings}
+    keyword_task = asyncio.ensure_future(
+        _timed(timings, "keyword_match", amatch_keywords(question))
+    )
+    try:
+        try:
+            embedded = await _timed(
+                timings, "query_embedding", db.aembed_query(question)
+            )
+        except Exception as e:
+            logging.warning(f"Query embedding failed, retrying in search: {e}")
+            embedded = None
+        if embedded is not None and not state.get("chat_history"):
+            try:
+                cached = await _timed(
+                    timings,
+                    "answer_cache",
+                    asyncio.to_thread(
+                        _lookup_answer, embedded, time.perf_counter() - start
+                    ),
+                )
+            except Exception as e:
+                logging.warning(f"Answer cache lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                timings["retrieval"] = time.perf_counter() - start
+                return {
+                    "context": cached["context"],
+                    "cached_answer": cached["answer"],
+                    "timings": timings,
+                }
+        try:
+            keywords = await keyword_task
+        except Exception as e:
+            logging.warning(f"Keyword matching failed, searching unfiltered: {e}")
+            keywords = []
+    finally:
+        # Leave no keyword match running if this node fails or is cancelled
+        keyword_task.cancel()
+    try:
+        search_start = time.perf_counter()
+        docs = await _retriever_for_keywords(keywords).ainvoke(question)
+        if not docs and keywords:
+            docs = await _retriever_for_keywords([]).ainvoke(question)
+        timings["search"] = time.perf_counter() - search_start
+    except Exception as e:
+        logging.error(f"Retrieval failed for chat question: {e}")
+        docs = []
+    timings["retrieval"] = time.perf_counter() - start
+    return {
+        "context": "\n\n".join(doc.page_content for doc in docs),
+        "timings": timings,
+    }
 
 
 async def call_model(state: State) -> State:
     """
     Call the LLM model with the given state.
 
+    The answer is streamed with ``llm.astream`` and each token is written to
+    the graph's ``custom`` stream as ``{"token": text}`` while the full answer
+    is assembled for the checkpoint. A thread's opening answer is written to
+    the answer cache on a background task, after the turn has completed.
+
     Args:
         state: Current LangGraph state.
 
@@ -478,40 +733,122 @@ async def call_model(state: State) -> State:
         logging.error("LLM not initialized")
         return _error_state(
             state["input"],
-            state["chat_history"],
+            state.get("chat_history", []),
             "AI not ready",
             "No context due to initialization error.",
         )
     try:
+        chat_history = list(state.get("chat_history") or [])
         messages = qa_prompt.format_messages(
             input=state["input"],
-            chat_history=state["chat_history"],
+            chat_history=chat_history,
             context=state.get("context", ""),
         )
-        response = await llm.ainvoke(messages)
-        if not response or not response.content:
+        write = get_stream_writer()
+        timings = dict(state.get("timings", {}))
+        parts: List[str] = []
+        start = time.perf_counter()
+        async for chunk in llm.astream(messages):
+            token = chunk.content if isinstance(chunk.content, str) else ""
+            if not token:
+                continue
+            if not parts:
+                timings["first_token"] = time.perf_counter() - start
+            parts.append(token)
+            write({"token": token})
+        timings["model"] = time.perf_counter() - start
+        if not parts:
             return _error_state(
                 state["input"],
-                state["chat_history"],
+                chat_history,
                 "No response from model",
                 "No context available.",
             )
-        return {
-            "input": str(state["input"]),
-            "chat_history": state["chat_history"],
-            "context": str(state["context"]),
-            "answer": str(response.content),
-        }
+        answer = "".join(parts)
+        if not chat_history:
+            _cache_answer_in_background(state, answer, timings)
+        return _completed_turn(state, answer, timings)
     except Exception as e:
         logging.error(f"Error in model call: {e}")
         return _error_state(
             state["input"],
-            state["chat_history"],
+            state.get("chat_history", []),
             "Sorry, I encountered an error. Please try again.",
             "Error during model call.",
         )
 
 
+# Answer-cache writes still running; held so they are not garbage collected
+_cache_tasks: Set["asyncio.Task[None]"] = set()
+
+
+def _cache_answer_in_background(
+    state: State, answer: str, timings: Dict[str, float]
+) -> None:
+    """Cache a thread's opening answer without delaying the turn's completion."""
+    task = asyncio.get_running_loop().create_task(
+        _cache_answer(dict(state), answer, dict(timings))
+    )
+    _cache_tasks.add(task)
+    task.add_done_callback(_cache_task_done)
+
+
+def _cache_task_done(task: "asyncio.Task[None]") -> None:
+    """Forget a finished cache write and log it if it failed."""
+    _cache_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning(f"Could not cache answer: {task.exception()}")
+
+
+async def _cache_answer(state: State, answer: str, timings: Dict[str, float]) -> None:
+    """Store a thread's opening answer in the answer cache."""
+    if db is None or get_answer_cache() is None:
+        return
+    try:
+        # The retrieval node embedded the question, so this is a cache hit
+        embedded = await db.aembed_query(state["input"])
+        await asyncio.to_thread(
+            _store_answer,
+            state["input"],
+            embedded,
+            answer,
+            str(state.get("context", "")),
+            timings.get("retrieval", 0.0) + timings.get("model", 0.0),
+        )
+    except Exception as e:
+        logging.warning(f"Could not cache answer: {e}")
+
+
+async def answer_from_cache(state: State) -> State:
+    """
+    Answer with the cached answer found by the retrieval node.
+
+    Args:
+        state: Current LangGraph state.
+
+    Returns:
+        Updated state with the cached answer.
+    """
+    answer = state["cached_answer"]
+    get_stream_writer()({"token": answer})
+    return _completed_turn(state, answer, dict(state.get("timings", {})))
+
+
+def _completed_turn(state: State, answer: str, timings: Dict[str, float]) -> State:
+    """Record a question and its answer in the thread's capped history."""
+    chat_history = list(state.get("chat_history") or []) + [
+        HumanMessage(content=state["input"]),
+        AIMessage(content=answer),
+    ]
+    return {
+        "input": str(state["input"]),
+        "chat_history": chat_history[-CHAT_HISTORY_MAX_MESSAGES:],
+        "context": str(state.get("context", "")),
+        "answer": answer,
+        "timings": timings,
+    }
+
+
 def _error_state(
     question: str, chat_history: Sequence[BaseMessage], answer: str, context: str
 ) -> State:
@@ -536,87 +873,127 @@ def _error_state(
 
 
 # --- Main Answer Retrieval Function ---
-async def get_convo_hist_answer(question: str, thread_id: str) -> Dict[str, str]:
+async def astream_convo_hist_answer(
+    question: str, thread_id: str
+) -> AsyncIterator[Dict[str, Any]]:
     """
-    Retrieves a conversational answer using the LangGraph RAG workflow.
+    Stream a conversational answer from the LangGraph RAG workflow.
+
+    Yields ``{"token": text}`` for each answer token as the model produces it,
+    then one final ``{"answer", "context", "timings"}`` event with the whole
+    answer, which is checkpointed once when the model node finishes. Errors
+    end the stream with a final event carrying an error answer.
 
     Args:
         question: The user's question.
         thread_id: Unique identifier for the conversation thread.
 
-    Returns:
-        Dictionary containing the answer and context.
-
-    Raises:
-        Exception: If LangGraph workflow fails or components are not initialized.
+    Yields:
+        Token events followed by the final answer event.
     """
-    print(
-        f"[DEBUG] chatModel.get_convo_hist_answer called with question: {question}, thread_id: {thread_id}"
-    )
-
     if app is None:
         logging.error(
             "LangGraph app is not compiled. Cannot get conversational answer."
         )
-        error_answer = (
-            "I'm sorry, the AI assistant is not fully set up. Please try again later."
-        )
-        return {
-            "answer": format_markdown(error_answer),
+        yield {
+            "answer": "I'm sorry, the AI assistant is not fully set up. Please try again later.",
             "context": "",
         }
+        return
 
     if llm is None or db is None:
         logging.error("LLM or Chroma DB not initialized. Cannot answer question.")
-        error_answer = "I'm sorry, I cannot process your request right now due to an internal system error (AI not ready)."
-        return {
-            "answer": format_markdown(error_answer),
+        yield {
+            "answer": "I'm sorry, I cannot process your request right now due to an internal system error (AI not ready).",
             "context": "No context due to initialization error.",
         }
+        return
 
-    initial_state: State = {
+    # chat_history is left out so the thread's checkpointed history carries over
+    initial_state: Dict[str, Any] = {
         "input": question,
-        "chat_history": [],
         "context": "",
         "answer": "",
+        "timings": {},
+        "cached_answer": "",
     }
 
+    config = {"configurable": {"thread_id": thread_id}}
+    result: Dict[str, Any] = {}
+    streamed = False
     try:
-        # Create a new SQLite connection for this specific call to avoid event loop binding issues
-        conn = await aiosqlite.connect(LANGCHAIN_CHECKPOINT_PATH)
-        sqlite_saver = AsyncSqliteSaver(conn)
-
-        # Create a new app instance with the fresh connection
-        workflow = StateGraph(state_schema=State)
-        workflow.add_node("model", call_model)
-        workflow.add_edge(START, "model")
-        temp_app = workflow.compile(checkpointer=sqlite_saver)
-
-        result = await temp_app.ainvoke(
-            initial_state, config={"configurable": {"thread_id": thread_id}}
-        )
-
-        # Close the connection after use
-        await conn.close()
-
-        answer = result.get("answer", "No answer generated.")
-        context = result.get("context", "No context retrieved.")
-
-        # Format markdown content immediately after LLM response
-        answer = format_markdown(answer)
-
-        print(
-            f"[DEBUG] chatModel.get_convo_hist_answer returning formatted answer: {answer}"
+        pool = get_app_pool(LANGCHAIN_CHECKPOINT_PATH, _compile_with_checkpointer)
+        try:
+            async with pool.acquire() as chat_app:
+                async for mode, data in chat_app.astream(
+                    initial_state, config=config, stream_mode=["custom", "values"]
+                ):
+                    if mode == "custom":
+                        streamed = True
+                        yield data
+                    else:
+                        result = data
+        except (OSError, aiosqlite.Error) as e:
+            if streamed:
+                raise
+            logging.warning(
+                f"Checkpoint database unavailable, answering without history: {e}"
+            )
+            async for mode, data in app.astream(
+                initial_state, config=config, stream_mode=["custom", "values"]
+            ):
+                if mode == "custom":
+                    yield data
+                else:
+                    result = data
+
+        timings = result.get("timings", {})
+        logging.info(
+            "⏱️ Chat turn stages: "
+            + ", ".join(f"{stage}={seconds:.3f}s" for stage, seconds in timings.items())
         )
-        return {"answer": answer, "context": context}
+        yield {
+            "answer": result.get("answer", "No answer generated."),
+            "context": result.get("context", "No context retrieved."),
+            "timings": timings,
+        }
     except Exception as e:
-        print(f"[ERROR] chatModel.get_convo_hist_answer exception: {e}")
+        print(f"[ERROR] chatModel.astream_convo_hist_answer exception: {e}")
         logging.error(
             f"Error invoking LangGraph workflow for thread '{thread_id}': {e}",
             exc_info=True,
         )
-        error_answer = "I'm sorry, I encountered an error while processing your request. Please try again."
-        return {
-            "answer": format_markdown(error_answer),
+        yield {
+            "answer": "I'm sorry, I encountered an error while processing your request. Please try again.",
             "context": "",
         }
+
+
+async def get_convo_hist_answer(question: str, thread_id: str) -> Dict[str, str]:
+    """
+    Retrieves a conversational answer using the LangGraph RAG workflow.
+
+    Collects :func:`astream_convo_hist_answer` for callers that need the
+    whole answer at once.
+
+    Args:
+        question: The user's question.
+        thread_id: Unique identifier for the conversation thread.
+
+    Returns:
+        Dictionary containing the answer, context and per-stage timings.
+    """
+    print(
+        f"[DEBUG] chatModel.get_convo_hist_answer called with question: {question}, thread_id: {thread_id}"
+    )
+    result: Dict[str, Any] = {}
+    async for event in astream_convo_hist_answer(question, thread_id):
+        if "answer" in event:
+            result = event
+
+    # Format markdown content immediately after LLM response
+    result["answer"] = format_markdown(result.get("answer", "No answer generated."))
+    print(
+        f"[DEBUG] chatModel.get_convo_hist_answer returning formatted answer: {result['answer']}"
+    )
+    return result
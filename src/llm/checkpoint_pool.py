@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Long-lived LangGraph apps backed by shared SQLite checkpoint connections.
+
+Opening an ``aiosqlite`` connection and compiling a ``StateGraph`` on every
+chat turn costs more than the checkpoint reads and writes themselves. A
+:class:`CheckpointAppPool` instead keeps, per event loop, one connection in
+WAL mode with an app compiled against an ``AsyncSqliteSaver`` on it. Every
+turn on the loop streams through that app: the saver locks each checkpoint
+read and write, not the whole run, so turns only queue for the writes
+themselves while the LLM streams concurrently.
+
+aiosqlite connections are bound to the loop that opened them, so Gradio's
+loop and any loop started with ``asyncio.run`` each get their own pool (see
+:func:`get_app_pool`). The connection is pinged when a turn starts and
+replaced if it has gone stale; a replaced connection is closed once the turns
+still using it finish. Each pool closes its connection on its own loop when
+that loop shuts down, and :func:`close_app_pools` closes the pools of loops
+that are still running.
+"""
+
+import asyncio
+import contextlib
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedApp:
+    """A checkpoint connection, the app compiled against it and its turns."""
+
+    __slots__ = ("conn", "app", "turns")
+
+    def __init__(self, conn: aiosqlite.Connection, app: Any):
+        self.conn = conn
+        self.app = app
+        self.turns = 0
+
+
+class CheckpointAppPool:
+    """A compiled LangGraph app shared by the turns of one event loop.
+
+    Must be created on the event loop it serves.
+
+    :param db_path: Path of the SQLite checkpoint database.
+    :type db_path: str
+    :param compile_app: Compiles the graph with the given checkpointer.
+    :type compile_app: Callable[[AsyncSqliteSaver], Any]
+    """
+
+    def __init__(
+        self, db_path: str, compile_app: Callable[[AsyncSqliteSaver], Any]
+    ):
+        self.db_path = db_path
+        self.compile_app = compile_app
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+        self._current: Optional[_SharedApp] = None
+        self._lock = asyncio.Lock()
+        self.stats = {"opened": 0, "recovered": 0}
+        self._closer = self.loop.create_task(self._close_at_shutdown())
+
+    async def _close_at_shutdown(self) -> None:
+        """Close the pool when the loop cancels its pending tasks.
+
+        ``asyncio.run`` (and uvicorn, which serves Gradio) cancel every
+        pending task before closing the loop, so connection threads are
+        stopped on the loop that owns them instead of outliving it.
+        """
+        try:
+            await self.loop.create_future()
+        finally:
+            await self.close()
+
+    async def _open(self) -> _SharedApp:
+        """Open a WAL-mode connection and compile an app against it."""
+        conn = await aiosqlite.connect(self.db_path)
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        await conn.execute("PRAGMA busy_timeout=5000")
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        self.stats["opened"] += 1
+        return _SharedApp(conn, self.compile_app(saver))
+
+    async def _healthy(self, entry: _SharedApp) -> bool:
+        """Ping a connection; far cheaper than the turn it is used for."""
+        try:
+            await entry.conn.execute("SELECT 1")
+        except Exception:
+            return False
+        return True
+
+    async def _discard(self, entry: _SharedApp) -> None:
+        with contextlib.suppress(Exception):
+            await entry.conn.close()
+
+    async def _checkout(self) -> _SharedApp:
+        async with self._lock:
+            if self.closed:
+                raise RuntimeError("Checkpoint pool is closed")
+            entry = self._current
+            if entry is not None:
+                if await self._healthy(entry):
+                    entry.turns += 1
+                    return entry
+                logger.warning("♻️ Reopening stale checkpoint connection")
+                self.stats["recovered"] += 1
+                self._current = None
+                if not entry.turns:
+                    await self._discard(entry)
+            entry = await self._open()
+            entry.turns += 1
+            self._current = entry
+            return entry
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Use the loop's compiled app for one turn.
+
+        Concurrent turns share the app; a connection replaced during the
+        turn is closed when the last turn using it returns.
+
+        :return: Async context manager yielding the compiled app.
+        :rtype: AsyncIterator[Any]
+        """
+        entry = await self._checkout()
+        try:
+            yield entry.app
+        finally:
+            entry.turns -= 1
+            if entry is not self._current and not entry.turns:
+                await self._discard(entry)
+
+    async def close(self) -> None:
+        """Close the connection, or leave it to the last turn still using it."""
+        self.closed = True
+        entry, self._current = self._current, None
+        if entry is not None and not entry.turns:
+            await self._discard(entry)
+        if self._closer is not asyncio.current_task():
+            self._closer.cancel()
+
+
+_pools: Dict[asyncio.AbstractEventLoop, CheckpointAppPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_app_pool(
+    db_path: str, compile_app: Callable[[AsyncSqliteSaver], Any]
+) -> CheckpointAppPool:
+    """Return the running event loop's pool, creating it on first use.
+
+    :param db_path: Path of the SQLite checkpoint database.
+    :type db_path: str
+    :param compile_app: Compiles the graph with the given checkpointer.
+    :type compile_app: Callable[[AsyncSqliteSaver], Any]
+    :return: The pool for the running loop.
+    :rtype: CheckpointAppPool
+    """
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        for closed in [other for other in _pools if other.is_closed()]:
+            # Its pool closed itself when the loop shut down
+            del _pools[closed]
+        pool = _pools.get(loop)
+        if pool is None or pool.closed:
+            pool = CheckpointAppPool(db_path, compile_app)
+            _pools[loop] = pool
+        return pool
+
+
+def close_app_pools(timeout: float = 5.0) -> None:
+    """Close the pools of every event loop that can still run their shutdown.
+
+    Call it at shutdown from a thread that is not running any of the loops.
+    Pools whose loop was shut down with ``asyncio.run`` have already closed
+    themselves; pools whose loop is closed but was never shut down that way
+    are reported, since their connection threads cannot be stopped any more.
+
+    :param timeout: Seconds to wait for each pool.
+    :type timeout: float
+    """
+    with _pools_lock:
+        pools: List[CheckpointAppPool] = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        loop = pool.loop
+        if pool.closed:
+            continue
+        try:
+            if loop.is_closed():
+                logger.warning(
+                    "⚠️ Checkpoint pool's event loop closed before the pool did"
+                )
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(pool.close(), loop).result(timeout)
+            else:
+                loop.run_until_complete(pool.close())
+        except Exception as e:
+            logger.warning(f"⚠️ Could not close checkpoint pool cleanly: {e}")
+
+
+def pool_stats() -> Dict[str, int]:
+    """Sum connection counts over all pools.
+
+    :return: ``pools``, ``opened`` and ``recovered`` counts.
+    :rtype: Dict[str, int]
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {
+        "pools": len(pools),
+        "opened": sum(p.stats["opened"] for p in pools),
+        "recovered": sum(p.stats["recovered"] for p in pools),
+    }
+
@@ -5,6 +5,7 @@ Handles text classification and RAG workflows. Loads API keys and configuration
 """
 
 #!/usr/bin/env python3
+import asyncio
 import openai
 import os
 from langchain_core.prompts import ChatPromptTemplate
@@ -15,7 +16,13 @@ from dotenv import load_dotenv
 from langchain.prompts import PromptTemplate
 import time
 from infra_utils import get_chatbot_dir
-from typing import Optional, Dict, Any  # noqa: F401
+from typing import Optional, Dict, Any, List  # noqa: F401
+from langchain.retrievers.multi_query import MultiQueryRetriever
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
 import re  # Import regex module for cleaning
 
 
@@ -61,6 +68,27 @@ def clean_text_for_classification(text: str) -> str:
     return text
 
 
+class BatchedMultiQueryRetriever(MultiQueryRetriever):
+    """MultiQueryRetriever that retrieves all generated queries in one batch.
+
+    The stock retriever embeds and searches each query variant separately;
+    this one hands them to ``DuckDBRetriever.get_many_relevant_documents``,
+    which embeds them in one request and scores them in one pass.
+    """
+
+    def retrieve_documents(
+        self, queries: List[str], run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.retriever.get_many_relevant_documents(queries)
+
+    async def aretrieve_documents(
+        self, queries: List[str], run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return await asyncio.to_thread(
+            self.retriever.get_many_relevant_documents, queries
+        )
+
+
 # --- Workflow Re-initialization for Dependency Injection ---
 # Global variables for the workflow components
 multiquery_retriever = None
@@ -107,9 +135,7 @@ def initialize_classification_workflow():
 
     multiquery_retriever = None
     if db and llm:
-        from langchain.retrievers.multi_query import MultiQueryRetriever
-
-        multiquery_retriever = MultiQueryRetriever.from_llm(
+        multiquery_retriever = BatchedMultiQueryRetriever.from_llm(
             retriever=db.as_retriever(search_kwargs={"k": 3}),
             llm=llm,
             prompt=multi_query_template,
@@ -35,7 +35,8 @@ from langchain_community.document_transformers.openai_functions import (
 from langchain.schema import Document
 from langchain_openai import ChatOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from backend.database import DuckDBVectorStore
+from backend.database import DuckDBVectorStore, stable_document_id
+from backend.embedding_cache import text_hash
 
 from glob import glob
 import yake
@@ -201,6 +202,8 @@ def dataProcessing(file: str, collection: Optional[DuckDBVectorStore] = None) ->
     document_list_cleaned: List[Document] = []
     for doc in document_list_raw:
         cleaned_content = global_clean_text_for_classification(doc.page_content)
+        # The source keys the collection's registry; see DuckDBVectorStore.delete_source
+        doc.metadata.setdefault("source", file)
         document_list_cleaned.append(
             Document(page_content=cleaned_content, metadata=doc.metadata)
         )
@@ -209,8 +212,8 @@ def dataProcessing(file: str, collection: Optional[DuckDBVectorStore] = None) ->
     perf_monitor.start_timer("keyword_extraction")
 
     def extract_and_process_keywords(doc: Document) -> Document:
-        doc_hash = hash(doc.page_content)
-        cache_key = str(doc_hash)
+        # hash() is salted per process, which made the shared cache miss on every run
+        cache_key = text_hash(doc.page_content)
         cached_data_str = get_cached_response(cache_key)
         if cached_data_str:
             with contextlib.suppress(Exception):
@@ -293,7 +296,16 @@ def dataProcessing(file: str, collection: Optional[DuckDBVectorStore] = None) ->
 
     perf_monitor.start_timer("database_insertion")
     if collection is not None:
-        parallelDatabaseInsertion(batches=batches, collection=collection)
+        failed = parallelDatabaseInsertion(batches=batches, collection=collection)
+        if failed:
+            logging.warning(
+                f"⚠️ Keeping previous chunks of '{Path(file).name}': {failed} batches failed"
+            )
+        else:
+            # Chunks were upserted under stable ids; drop the ones the edit removed
+            collection.delete_source(
+                file, keep_ids=[_chunk_id(chunk) for chunk in chunks]
+            )
     else:
         logging.warning("No DuckDB vector store provided for data processing.")
     perf_monitor.end_timer("database_insertion")
@@ -761,9 +773,23 @@ def optimized_batching(
     logging.debug(f"⚡ Advanced batching complete with memory limit {max_memory_mb}MB")
 
 
+def _chunk_id(doc: Document) -> str:
+    """
+    Return the id a chunk is stored under: stable across runs for unchanged content.
+
+    :param doc: The chunk.
+    :type doc: Document
+    :return: The document id.
+    :rtype: str
+    """
+    return doc.metadata.get("id") or stable_document_id(
+        doc.page_content, doc.metadata.get("source")
+    )
+
+
 def parallelDatabaseInsertion(
     batches: Iterable[list[Document]], collection: DuckDBVectorStore
-) -> None:
+) -> int:
     """
     Optimized database insertion with error handling and performance monitoring.
 
@@ -771,10 +797,9 @@ def parallelDatabaseInsertion(
     :type batches: Iterable[list[Document]]
     :param collection: The DuckDB vector store collection to insert documents into.
     :type collection: DuckDBVectorStore
+    :return: Number of batches that failed.
+    :rtype: int
     """
-    import threading
-
-    insertion_lock = threading.Lock()
     successful_insertions = 0
     failed_insertions = 0
 
@@ -783,22 +808,25 @@ def parallelDatabaseInsertion(
 
     if total_batches == 0:
         logging.info("No batches to insert into the database.")
-        return
+        return 0
 
     def insert_batch(batch_data: tuple[int, list[Document]]):
         batch_idx, batch = batch_data
         try:
-            with insertion_lock:
-                docs_for_duckdb = []
-                for doc in batch:
-                    docs_for_duckdb.append(
-                        {
-                            "id": doc.metadata.get("id", str(hash(doc.page_content))),
-                            "content": doc.page_content,
-                            "metadata": doc.metadata,
-                        }
-                    )
-                collection.add_documents(docs_for_duckdb)
+            # No lock here: the store embeds batches concurrently and
+            # serialises only its own DuckDB writes
+            docs_for_duckdb = []
+            for doc in batch:
+                docs_for_duckdb.append(
+                    {
+                        "id": _chunk_id(doc),
+                        "content": doc.page_content,
+                        "metadata": doc.metadata,
+                    }
+                )
+            inserted = collection.add_documents(docs_for_duckdb)
+            if inserted is not None and inserted < len(batch):
+                return f"❌ Batch {batch_idx}: {len(batch) - inserted} of {len(batch)} docs failed to embed."
             return f"✅ Batch {batch_idx}: {len(batch)} docs inserted."
         except Exception as e:
             logging.error(f"❌ Batch {batch_idx} failed: {e}")
@@ -827,6 +855,7 @@ def parallelDatabaseInsertion(
     logging.info(
         f"⚡ Database insertion complete: {successful_insertions} batches successful, {failed_insertions} failed ({total_docs} total docs)."
     )
+    return failed_insertions
 
 
 def updateKeywordsDatabank(keywords_bank: list[str]) -> None:
@@ -991,6 +1020,12 @@ def initialiseDatabase():
                 failed_files += 1
             logging.debug(result)
 
+    # Persist ANN graphs once after the bulk load instead of per batch
+    for collection in (chat_db, classification_db):
+        save_index = getattr(collection, "save_index", None)
+        if save_index:
+            save_index()
+
     perf_monitor.end_timer("database_initialization")
     total_time = perf_monitor.get_metrics().get("database_initialization", 0)
     logging.info(
@@ -4,9 +4,11 @@ Keyword caching module for OpenAI responses with filler word filtering.
 Caches responses based on cleaned keywords to avoid redundant API calls.
 """
 
+import asyncio
 import os
 import shelve
 import hashlib
+import threading
 from typing import Optional
 import logging
 
@@ -55,6 +57,9 @@ def _ensure_cache_exists():
 
 # Cache initialization flag
 _cache_initialized = False
+# shelve files do not support concurrent access, and async callers reach the
+# cache from worker threads
+_cache_lock = threading.Lock()
 
 
 def filter_filler_words(text: str) -> str:
@@ -81,7 +86,7 @@ def get_cached_response(keyword: str) -> Optional[str]:
     cleaned = filter_filler_words(keyword)
     key = _keyword_hash(cleaned)
     try:
-        with shelve.open(CACHE_PATH) as db:
+        with _cache_lock, shelve.open(CACHE_PATH) as db:
             return db.get(key)
     except Exception as e:
         logging.warning(f"Error reading from keyword cache: {e}")
@@ -99,7 +104,7 @@ def set_cached_response(keyword: str, response: str) -> None:
     key = _keyword_hash(cleaned)
 
     try:
-        with shelve.open(CACHE_PATH) as db:
+        with _cache_lock, shelve.open(CACHE_PATH) as db:
             # Check if this keyword already exists in cache
             if key not in db:
                 db[key] = response
@@ -110,10 +115,20 @@ def set_cached_response(keyword: str, response: str) -> None:
         logging.error(f"Error writing to keyword cache: {e}")
 
 
+async def aget_cached_response(keyword: str) -> Optional[str]:
+    """Async version of :func:`get_cached_response` that reads on a worker thread."""
+    return await asyncio.to_thread(get_cached_response, keyword)
+
+
+async def aset_cached_response(keyword: str, response: str) -> None:
+    """Async version of :func:`set_cached_response` that writes on a worker thread."""
+    await asyncio.to_thread(set_cached_response, keyword, response)
+
+
 def clear_cache() -> None:
     """Clear the entire keyword cache."""
     try:
-        with shelve.open(CACHE_PATH) as db:
+        with _cache_lock, shelve.open(CACHE_PATH) as db:
             db.clear()
         logging.info("Keyword cache cleared successfully")
     except Exception as e:
@@ -123,7 +138,7 @@ def clear_cache() -> None:
 def get_cache_stats() -> dict:
     """Get statistics about the keyword cache."""
     try:
-        with shelve.open(CACHE_PATH) as db:
+        with _cache_lock, shelve.open(CACHE_PATH) as db:
             keys = list(db.keys())
             return {
                 "total_entries": len(keys),
@@ -19,6 +19,7 @@ class PerformanceMonitor:
     def __init__(self) -> None:
         self.start_times = {}
         self.metrics = {}
+        self.throughput = {}
 
     def start_timer(self, operation: str) -> None:
         """
@@ -56,6 +57,33 @@ class PerformanceMonitor:
         """
         return self.metrics.copy()
 
+    def record_throughput(self, operation: str, items: int, duration: float) -> float:
+        """
+        Record the throughput of a batch operation.
+
+        :param operation: The name of the operation.
+        :type operation: str
+        :param items: Number of items processed.
+        :type items: int
+        :param duration: Time taken in seconds.
+        :type duration: float
+        :return: Items processed per second.
+        :rtype: float
+        """
+        rate = items / duration if duration > 0 else 0.0
+        self.throughput[operation] = rate
+        logger.info(f"⚡ {operation}: {items} items in {duration:.2f}s ({rate:.1f}/s)")
+        return rate
+
+    def get_throughput(self) -> Dict[str, float]:
+        """
+        Get the most recent throughput of each recorded operation.
+
+        :return: A dictionary of operation names to items per second.
+        :rtype: Dict[str, float]
+        """
+        return self.throughput.copy()
+
     def mark_startup_phase(self, phase_name: str) -> None:
         """
         Mark a specific startup phase completion.
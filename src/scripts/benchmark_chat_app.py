@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-turn LangGraph overhead: per-turn setup against a shared app.
+
+The per-turn path opens an ``aiosqlite`` connection, builds and compiles the
+chat ``StateGraph``, invokes it and closes the connection on every turn, as
+``get_convo_hist_answer`` used to. The pooled path uses the app shared by
+:class:`llm.checkpoint_pool.CheckpointAppPool`. The model node is replaced by
+a stub so only graph and checkpoint overhead is timed; each stage's median is
+reported in milliseconds.
+
+Usage:
+    python scripts/benchmark_chat_app.py --turns 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import aiosqlite  # noqa: E402
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver  # noqa: E402
+from langgraph.graph import START, StateGraph  # noqa: E402
+
+from llm.checkpoint_pool import CheckpointAppPool  # noqa: E402
+from llm.chatModel import State  # noqa: E402
+
+
+async def stub_model(state: State) -> State:
+    """Stand-in for ``call_model`` that answers without an LLM call."""
+    return {**state, "answer": "ok"}
+
+
+def build_workflow() -> StateGraph:
+    workflow = StateGraph(state_schema=State)
+    workflow.add_node("model", stub_model)
+    workflow.add_edge(START, "model")
+    return workflow
+
+
+def initial_state(turn: int) -> State:
+    return {
+        "input": f"question {turn}",
+        "chat_history": [],
+        "context": "",
+        "answer": "",
+    }
+
+
+def median_ms(samples):
+    return round(statistics.median(samples) * 1000, 3)
+
+
+async def per_turn_setup(db_path: str, turns: int, threads: int) -> dict:
+    """Time each stage of the connect-compile-invoke-close path."""
+    stages = {"connect": [], "compile": [], "invoke": [], "close": [], "total": []}
+    for turn in range(turns):
+        config = {"configurable": {"thread_id": f"t{turn % threads}"}}
+        t0 = time.perf_counter()
+        conn = await aiosqlite.connect(db_path)
+        t1 = time.perf_counter()
+        chat_app = build_workflow().compile(checkpointer=AsyncSqliteSaver(conn))
+        t2 = time.perf_counter()
+        await chat_app.ainvoke(initial_state(turn), config=config)
+        t3 = time.perf_counter()
+        await conn.close()
+        t4 = time.perf_counter()
+        for name, value in zip(stages, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t4 - t0)):
+            stages[name].append(value)
+    return {name: median_ms(values) for name, values in stages.items()}
+
+
+async def pooled(db_path: str, turns: int, threads: int) -> dict:
+    """Time each stage of a turn through the shared app."""
+    pool = CheckpointAppPool(
+        db_path, lambda saver: build_workflow().compile(checkpointer=saver)
+    )
+    # Warm the pool so the timings reflect steady state
+    async with pool.acquire():
+        pass
+    stages = {"acquire": [], "invoke": [], "release": [], "total": []}
+    for turn in range(turns):
+        config = {"configurable": {"thread_id": f"t{turn % threads}"}}
+        t0 = time.perf_counter()
+        async with pool.acquire() as chat_app:
+            t1 = time.perf_counter()
+            await chat_app.ainvoke(initial_state(turn), config=config)
+            t2 = time.perf_counter()
+        t3 = time.perf_counter()
+        for name, value in zip(stages, (t1 - t0, t2 - t1, t3 - t2, t3 - t0)):
+            stages[name].append(value)
+    await pool.close()
+    return {name: median_ms(values) for name, values in stages.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat app per-turn overhead")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=20, help="Chat threads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "per_turn_setup_ms": asyncio.run(
+                per_turn_setup(
+                    os.path.join(tmp, "per_turn.sqlite"), args.turns, args.threads
+                )
+            ),
+            "pooled_ms": asyncio.run(
+                pooled(os.path.join(tmp, "pooled.sqlite"), args.turns, args.threads)
+            ),
+        }
+    results["saved_per_turn_ms"] = round(
+        results["per_turn_setup_ms"]["total"] - results["pooled_ms"]["total"], 3
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark quantised vector index storage against full-precision float32.
+
+For each representation (float32, float16, int8) this reports index memory,
+query latency and recall@k after re-ranking a shortlist of
+``k * rerank_factor`` candidates with the full-precision vectors, the same
+two-stage scheme ``DuckDBVectorStore`` uses for quantised collections.
+
+Vectors come from an existing DuckDB collection when ``--collection`` is given,
+otherwise from a synthetic clustered dataset.
+
+Usage:
+    python scripts/benchmark_quantization.py --rows 50000 --dimension 1536
+    python scripts/benchmark_quantization.py --collection chat --rerank-factor 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from backend.vector_index import InMemoryVectorIndex, QuantizedVectorIndex  # noqa: E402
+
+
+def load_collection_vectors(collection: str) -> np.ndarray:
+    """Load every embedding of a DuckDB collection as a float32 matrix."""
+    import duckdb
+    from infra_utils import get_chatbot_dir
+
+    db_file = os.path.join(
+        get_chatbot_dir(),
+        "data",
+        "vector_store",
+        "duckdb_collections",
+        f"{collection}.db",
+    )
+    conn = duckdb.connect(db_file, read_only=True)
+    try:
+        data = conn.execute(f"SELECT embedding FROM {collection}").fetchnumpy()
+    finally:
+        conn.close()
+    return np.stack(data["embedding"]).astype(np.float32)
+
+
+def synthetic_vectors(rows: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """Generate clustered vectors resembling document embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(rows // 100, 1), dimension))
+    labels = rng.integers(0, len(centers), rows)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((rows, dimension))
+    return vectors.astype(np.float32)
+
+
+def run(vectors: np.ndarray, queries: np.ndarray, k: int, rerank_factor: int) -> list:
+    """Build each index variant and measure memory, latency and recall."""
+    ids = [str(i) for i in range(len(vectors))]
+    normalised = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    truth = [set(np.argsort(-(normalised @ q))[:k].tolist()) for q in queries]
+
+    results = []
+    for name in ("float32", "float16", "int8"):
+        if name == "float32":
+            index = InMemoryVectorIndex(vectors.shape[1], len(vectors))
+        else:
+            index = QuantizedVectorIndex(vectors.shape[1], len(vectors), name)
+        index.add(ids, vectors)
+        shortlist_size = k if index.exact_scores else k * rerank_factor
+
+        latencies = []
+        hits = 0
+        for q, expected in zip(queries, truth):
+            start = time.perf_counter()
+            shortlist = [int(i) for i, _ in index.search(q, shortlist_size)]
+            if not index.exact_scores:
+                qn = q / np.linalg.norm(q)
+                exact = normalised[shortlist] @ qn
+                shortlist = [shortlist[i] for i in np.argsort(-exact)[:k]]
+            latencies.append(time.perf_counter() - start)
+            hits += len(expected.intersection(shortlist))
+
+        results.append(
+            {
+                "representation": name,
+                "memory_mb": index.memory_bytes() / (1024 * 1024),
+                "p50_ms": float(np.percentile(latencies, 50) * 1000),
+                "p95_ms": float(np.percentile(latencies, 95) * 1000),
+                f"recall@{k}": hits / (k * len(queries)),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantised vector index benchmark")
+    parser.add_argument("--collection", help="DuckDB collection to read vectors from")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.collection:
+        vectors = load_collection_vectors(args.collection)
+    else:
+        vectors = synthetic_vectors(args.rows, args.dimension)
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+    queries = vectors[picks] + 0.1 * rng.standard_normal(
+        (len(picks), vectors.shape[1])
+    ).astype(np.float32)
+
+    results = run(vectors, queries, args.k, args.rerank_factor)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"📊 {len(vectors)} vectors x {vectors.shape[1]} dims, "
+        f"{len(queries)} queries, k={args.k}, rerank factor={args.rerank_factor}"
+    )
+    print("| Representation | Memory (MB) | p50 (ms) | p95 (ms) | Recall |")
+    print("|---|---|---|---|---|")
+    for row in results:
+        print(
+            f"| {row['representation']} | {row['memory_mb']:.1f} | {row['p50_ms']:.2f} "
+            f"| {row['p95_ms']:.2f} | {row[f'recall@{args.k}']:.3f} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
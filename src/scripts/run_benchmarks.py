@@ -235,6 +235,10 @@ def write_benchmark_report(results, total_runtime=None):
                     "Database Initialization",
                 ],
             ),
+            (
+                "Chat Benchmarks",
+                ["LLM Chat App Per-Turn Overhead"],
+            ),
         ]
 
         for group_name, keys in groups:
@@ -298,6 +302,12 @@ def main():
             "python -c 'from llm.keyword_cache import filter_filler_words; filter_filler_words(\"the quick brown fox jumps over the lazy dog\")'",
             5,
         ),
+        (
+            # Prints per-stage medians for per-turn setup vs the pooled app
+            "LLM Chat App Per-Turn Overhead",
+            f"python {BASE_DIR / 'scripts' / 'benchmark_chat_app.py'} --turns 50",
+            3,
+        ),
         (
             "LLM DataProcessing Import",
             "python -c 'import llm.dataProcessing'",
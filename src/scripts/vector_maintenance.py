@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Compact vector collections and rebuild their indexes.
+
+Reports file size and query latency before and after for each collection.
+DuckDB files are locked to one process, so run this while the app is stopped,
+or set ``VECTOR_MAINTENANCE_INTERVAL_HOURS`` to have the app run it on a
+schedule. See :mod:`backend.maintenance`.
+
+Usage:
+    python scripts/vector_maintenance.py
+    python scripts/vector_maintenance.py --collection classification --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from backend.database import get_duckdb_collection  # noqa: E402
+from backend.maintenance import maintain_collection  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector collection maintenance")
+    parser.add_argument(
+        "--collection",
+        action="append",
+        help="Collection to maintain (repeatable; default: chat and classification)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print reports as JSON")
+    args = parser.parse_args()
+
+    reports = []
+    for name in args.collection or ["chat", "classification"]:
+        try:
+            report = maintain_collection(get_duckdb_collection(name))
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            sys.exit(1)
+        reports.append(report)
+        if not args.json:
+            print(
+                f"✅ {name}: {report['bytes_before'] / (1024 * 1024):.1f} MB -> "
+                f"{report['bytes_after'] / (1024 * 1024):.1f} MB, query "
+                f"{report['query_ms_before']:.1f} ms -> "
+                f"{report['query_ms_after']:.1f} ms ({report['seconds']:.1f}s)"
+            )
+    if args.json:
+        print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
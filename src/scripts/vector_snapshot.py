@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Export, import and verify Parquet snapshots of vector collections.
+
+A snapshot carries embeddings, keywords and metadata, so a new replica or
+container can load a collection in seconds instead of re-running extraction,
+keyword extraction and embedding. See :mod:`backend.snapshot`.
+
+Usage:
+    python scripts/vector_snapshot.py export --collection classification --output snapshots/classification
+    python scripts/vector_snapshot.py import --collection classification --input snapshots/classification
+    python scripts/vector_snapshot.py verify snapshots/classification
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from backend.database import get_duckdb_collection  # noqa: E402
+from backend.snapshot import export_snapshot, import_snapshot, verify_snapshot  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector collection snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_cmd = commands.add_parser("export", help="Write a collection to Parquet")
+    export_cmd.add_argument("--collection", required=True)
+    export_cmd.add_argument("--output", required=True, help="Snapshot directory")
+    import_cmd = commands.add_parser(
+        "import", help="Replace a collection with a snapshot"
+    )
+    import_cmd.add_argument("--collection", required=True)
+    import_cmd.add_argument("--input", required=True, help="Snapshot directory")
+    verify_cmd = commands.add_parser("verify", help="Check snapshot checksums")
+    verify_cmd.add_argument("directory")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            manifest = export_snapshot(
+                get_duckdb_collection(args.collection), args.output
+            )
+            print(f"✅ Exported {manifest['rows']} rows to {args.output}")
+        elif args.command == "import":
+            rows = import_snapshot(get_duckdb_collection(args.collection), args.input)
+            print(f"✅ Imported {rows} rows into '{args.collection}'")
+        else:
+            manifest = verify_snapshot(args.directory)
+            print(json.dumps({k: v for k, v in manifest.items() if k != "parts"}))
+            print("✅ Checksums match")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
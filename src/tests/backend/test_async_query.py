@@ -0,0 +1,59 @@
+"""Async query path and the retriever's native async retrieval."""
+
+import asyncio
+
+import pytest
+
+from conftest import make_docs
+
+TEXTS = ["tuition fees payment", "library opening hours", "campus map"]
+
+
+@pytest.fixture(params=["duckdb", "memory"])
+def store(request, make_store):
+    store = make_store(index_backend=request.param)
+    store.add_documents(make_docs(TEXTS, keywords=[["fees"], ["library"], ["map"]]))
+    return store
+
+
+def test_aquery_matches_query(store):
+    expected = store.query("library hours", k=2, keyword_filter=["library", "map"])
+
+    results = asyncio.run(
+        store.aquery("library hours", k=2, keyword_filter=["library", "map"])
+    )
+
+    assert results == expected
+
+
+def test_concurrent_aqueries_run_on_the_query_pool(store):
+    questions = ["library hours", "campus map", "tuition fees"] * 4
+
+    async def run_all():
+        return await asyncio.gather(*(store.aquery(q, k=1) for q in questions))
+
+    results = asyncio.run(run_all())
+
+    assert [r[0]["content"] for r in results] == [
+        "library opening hours",
+        "campus map",
+        "tuition fees payment",
+    ] * 4
+
+
+def test_async_retriever_returns_documents(store):
+    retriever = store.as_retriever({"k": 2, "search_type": "similarity"})
+
+    documents = asyncio.run(retriever.ainvoke("library hours"))
+
+    assert documents[0].page_content == "library opening hours"
+    assert documents[0].metadata["keywords"] == ["library"]
+    assert [d.page_content for d in documents] == [
+        d.page_content for d in retriever.invoke("library hours")
+    ]
+
+
+def test_aquery_on_an_empty_collection(make_store):
+    store = make_store(embedding_model="unknown-width-model")
+
+    assert asyncio.run(store.aquery("anything")) == []
@@ -0,0 +1,139 @@
+"""Streaming chat answers from the backend to the Gradio chatbot."""
+
+import asyncio
+
+import pytest
+
+from backend import chat
+from llm import chatModel
+
+
+def _stream(events):
+    async def astream_convo_hist_answer(question, thread_id):
+        for event in events:
+            yield event
+
+    return astream_convo_hist_answer
+
+
+@pytest.fixture
+def ready(monkeypatch):
+    async def check_rate_limit(username, operation):
+        return {"allowed": True}
+
+    monkeypatch.setattr(chat, "check_rate_limit", check_rate_limit)
+    monkeypatch.setattr(chatModel, "is_llm_ready", lambda: True)
+
+
+def _collect(username="alice", message="when are exams"):
+    async def main():
+        return [
+            chunk
+            async for chunk in chat.get_chatbot_response(username, "chat_1", message)
+        ]
+
+    return asyncio.run(main())
+
+
+def test_tokens_are_yielded_as_they_arrive(ready, monkeypatch):
+    events = [
+        {"token": "Exams"},
+        {"token": " on Monday"},
+        {"answer": "Exams on Monday"},
+    ]
+    monkeypatch.setattr(chatModel, "astream_convo_hist_answer", _stream(events))
+
+    assert _collect() == ["Exams", " on Monday"]
+
+
+def test_answers_without_tokens_are_yielded_whole(ready, monkeypatch):
+    events = [{"answer": "Cached answer", "context": ""}]
+    monkeypatch.setattr(chatModel, "astream_convo_hist_answer", _stream(events))
+
+    assert _collect() == ["Cached answer"]
+
+
+def test_error_after_tokens_is_appended(ready, monkeypatch):
+    events = [{"token": "Exams"}, {"answer": "Sorry, please try again."}]
+    monkeypatch.setattr(chatModel, "astream_convo_hist_answer", _stream(events))
+
+    assert _collect() == ["Exams", "\n\nSorry, please try again."]
+
+
+def test_unavailable_chat_yields_one_message(ready, monkeypatch):
+    assert _collect(username="") == [
+        "Error: User not logged in. Please log in to chat."
+    ]
+    monkeypatch.setattr(chatModel, "is_llm_ready", lambda: False)
+    assert _collect() == ["[Error] LLM is not ready. Please try again later."]
+
+
+class FakeChatDatabase:
+    def __init__(self):
+        self.messages = {}
+
+    def get_chat_messages(self, chat_id):
+        return list(self.messages.get(chat_id, []))
+
+    def add_api_call_record(self, **record):
+        pass
+
+
+def test_gradio_handler_updates_the_chatbot_per_chunk(monkeypatch):
+    pytest.importorskip("gradio")
+    from gradio_modules import chatbot
+
+    database = FakeChatDatabase()
+
+    async def save_message_async(chat_id, username, role, content):
+        database.messages.setdefault(chat_id, []).append(
+            {"role": role, "content": content}
+        )
+
+    async def get_chatbot_response(username, chat_id, message):
+        for chunk in ["Exams", " on **Monday**"]:
+            yield chunk
+
+    monkeypatch.setattr(chatbot, "get_consolidated_database", lambda: database)
+    monkeypatch.setattr(chatbot, "save_message_async", save_message_async)
+    monkeypatch.setattr(chatbot, "get_chatbot_response", get_chatbot_response)
+
+    async def main():
+        # The handler reuses its pairs list, so record the last pair as it goes
+        return [
+            update[0][-1]
+            async for update in chatbot._handle_send_message(
+                "when are exams", [], "alice", ""
+            )
+        ]
+
+    shown = asyncio.run(main())
+
+    assert shown[:-1] == [
+        ("when are exams", "Exams"),
+        ("when are exams", "Exams on **Monday**"),
+    ]
+    (messages,) = database.messages.values()
+    assert [m["role"] for m in messages] == ["user", "assistant"]
+    assert shown[-1] == ("when are exams", messages[-1]["content"])
+
+
+def test_edited_transcription_collects_and_formats_the_answer(monkeypatch):
+    pytest.importorskip("gradio")
+    from gradio_modules import audio_input
+
+    async def get_chatbot_response(username, chat_id, message):
+        for chunk in ["Exams", " on Monday"]:
+            yield chunk
+
+    monkeypatch.setattr(audio_input, "get_chatbot_response", get_chatbot_response)
+    monkeypatch.setattr(audio_input, "format_markdown", lambda text: f"<{text}>")
+
+    response, status, history, _ = asyncio.run(
+        audio_input.send_edited_transcription_wrapper("when are exams", "alice", [])
+    )
+
+    assert response == "<Exams on Monday>"
+    assert history == [
+        {"audio": "edited", "transcript": "when are exams", "response": response}
+    ]
@@ -0,0 +1,149 @@
+"""One writer plus per-thread read cursors over a DuckDB file."""
+
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from backend.duckdb_connections import DuckDBConnectionManager
+from conftest import run_in_thread
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DuckDBConnectionManager(str(tmp_path / "store.db"))
+    manager.writer.execute("CREATE TABLE t (x INTEGER)")
+    manager.writer.execute("INSERT INTO t VALUES (1), (2)")
+    yield manager
+    manager.close()
+
+
+def test_each_thread_gets_its_own_reader(manager):
+    main = manager.reader()
+
+    other = run_in_thread(manager.reader)
+
+    assert manager.reader() is main
+    assert other is not main
+
+
+def test_readers_see_only_committed_writes(manager):
+    count = "SELECT count(*) FROM t"
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as worker:
+        # Open the worker's cursor first; opening one waits for the write lock
+        worker.submit(manager.reader).result(10)
+        with manager.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (3)")
+            during = worker.submit(
+                lambda: manager.reader().execute(count).fetchall()
+            ).result(10)
+        after = worker.submit(lambda: manager.reader().execute(count).fetchall())
+
+        assert during == [(2,)]
+        assert after.result(10) == [(3,)]
+
+
+def test_failed_transactions_roll_back(manager):
+    with pytest.raises(RuntimeError):
+        with manager.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (3)")
+            raise RuntimeError("boom")
+
+    assert manager.reader().execute("SELECT count(*) FROM t").fetchall() == [(2,)]
+
+
+def test_cursors_of_exited_threads_are_closed(manager):
+    run_in_thread(manager.reader)
+    run_in_thread(manager.reader)
+
+    manager.reader()
+
+    assert list(manager._cursors) == [threading.get_ident()]
+
+
+def test_checkpoint_after_an_unconsumed_read_on_this_thread(manager):
+    def read_then_checkpoint():
+        manager.reader().execute("SELECT x FROM t ORDER BY x").fetchone()
+        return manager.checkpoint()
+
+    assert run_in_thread(read_then_checkpoint) is True
+    # A fresh cursor is opened for the next read
+    assert manager.reader().execute("SELECT count(*) FROM t").fetchall() == [(2,)]
+
+
+def test_checkpoint_after_consumed_reads_on_other_threads(manager):
+    for _ in range(3):
+        run_in_thread(lambda: manager.reader().execute("SELECT * FROM t").fetchall())
+    reader = manager.reader()
+    reader.execute("SELECT count(*) FROM t").fetchall()
+
+    assert manager.checkpoint()
+
+
+def test_exclusive_waits_for_reads_and_holds_new_ones_back(manager):
+    events = []
+    swapping = threading.Event()
+
+    def swap():
+        with manager.exclusive() as conn:
+            swapping.set()
+            events.append("swap")
+            conn.execute("CREATE TABLE t_new AS SELECT * FROM t")
+            conn.execute("DROP TABLE t")
+            conn.execute("ALTER TABLE t_new RENAME TO t")
+
+    def read():
+        with manager.read() as conn:
+            events.append("read")
+            return conn.execute("SELECT count(*) FROM t").fetchall()
+
+    with manager.read():
+        swapper = threading.Thread(target=swap, daemon=True)
+        swapper.start()
+        swapper.join(0.2)
+        # The swap waits for the running read
+        assert swapper.is_alive() and not swapping.is_set()
+    assert swapping.wait(10)
+    assert run_in_thread(read) == [(2,)]
+    swapper.join(10)
+    assert events == ["swap", "read"]
+
+
+def test_reads_inside_a_write_do_not_wait(manager):
+    with manager.write():
+        with manager.read() as conn:
+            assert conn.execute("SELECT count(*) FROM t").fetchall() == [(2,)]
+
+
+def test_waiting_exclusive_holds_new_reads_but_not_nested_ones(manager):
+    count = "SELECT count(*) FROM t"
+    events = []
+
+    def swap():
+        with manager.exclusive():
+            events.append("swap")
+
+    def read(nested=False):
+        with manager.read(nested=nested) as conn:
+            events.append("nested read" if nested else "read")
+            return conn.execute(count).fetchall()
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    with manager.read():
+        swapper = threading.Thread(target=swap, daemon=True)
+        swapper.start()
+        while not manager._swaps_waiting:
+            time.sleep(0.01)
+        # A new read queues behind the waiting swap, so steady reads cannot
+        # starve it...
+        queued = pool.submit(read)
+        with pytest.raises(concurrent.futures.TimeoutError):
+            queued.result(0.2)
+        # ...while reads belonging to the running one go ahead
+        assert read() == [(2,)]
+        assert pool.submit(read, True).result(10) == [(2,)]
+    assert queued.result(10) == [(2,)]
+    swapper.join(10)
+    pool.shutdown()
+    assert events == ["read", "nested read", "swap", "read"]
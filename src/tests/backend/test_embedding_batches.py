@@ -0,0 +1,78 @@
+"""Token-budgeted, concurrent, retried document embedding."""
+
+import pytest
+
+from backend import database
+from backend.database import _plan_embedding_batches
+from conftest import FakeEmbeddings, make_docs
+
+
+@pytest.fixture
+def store(make_store, monkeypatch):
+    monkeypatch.setattr(database, "EMBEDDING_RETRY_BACKOFF", 0.0)
+    store = make_store()
+    # Every text goes to the embedding client
+    store.embedding_cache = None
+    return store
+
+
+class FailingEmbeddings(FakeEmbeddings):
+    """Fails requests containing ``poison`` (``failures`` times, or always)."""
+
+    failures = None
+
+    def embed_documents(self, texts, chunk_size=None):
+        if any("poison" in text for text in texts) and FailingEmbeddings.failures != 0:
+            if FailingEmbeddings.failures:
+                FailingEmbeddings.failures -= 1
+            raise RuntimeError("rate limited")
+        return super().embed_documents(texts, chunk_size)
+
+
+def test_batches_respect_item_and_token_limits():
+    texts = ["a" * 40] * 5 + ["b" * 400] + ["c"]
+
+    batches = _plan_embedding_batches(texts, max_items=2, max_tokens=30)
+
+    assert [i for batch in batches for i in batch] == list(range(len(texts)))
+    assert all(len(batch) <= 2 for batch in batches)
+    # A text over the token budget still gets a batch of its own
+    assert [5] in batches
+
+
+def test_documents_are_embedded_in_batches(store, monkeypatch):
+    monkeypatch.setattr(database, "EMBEDDING_BATCH_SIZE", 4)
+    texts = [f"document number {i}" for i in range(10)]
+
+    written = store.add_documents(make_docs(texts))
+
+    assert written == 10
+    assert FakeEmbeddings.requests == 3
+    assert FakeEmbeddings.texts == 10
+
+
+def test_duplicate_texts_are_embedded_once(store):
+    store.add_documents(make_docs(["same text", "same text", "other text"]))
+
+    assert FakeEmbeddings.texts == 2
+    assert len(store.get(limit=10)) == 3
+
+
+def test_failed_batches_are_retried(store, monkeypatch):
+    monkeypatch.setattr(database, "EMBEDDING_MAX_RETRIES", 2)
+    store.embedding = FailingEmbeddings("text-embedding-3-small")
+    FailingEmbeddings.failures = 2
+
+    assert store.add_documents(make_docs(["poison pill", "fine"])) == 2
+
+
+def test_batches_failing_every_retry_are_skipped(store, monkeypatch):
+    monkeypatch.setattr(database, "EMBEDDING_BATCH_SIZE", 1)
+    monkeypatch.setattr(database, "EMBEDDING_MAX_RETRIES", 1)
+    store.embedding = FailingEmbeddings("text-embedding-3-small")
+    FailingEmbeddings.failures = None
+
+    assert store.add_documents(make_docs(["poison pill", "fine"])) == 1
+    assert [doc["content"] for doc in store.get(limit=10)] == ["fine"]
+    with pytest.raises(RuntimeError):
+        store.add_documents(make_docs(["poison again"]))
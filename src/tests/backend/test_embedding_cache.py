@@ -0,0 +1,115 @@
+"""Persistent content-addressed embedding cache."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from backend import embedding_cache
+from backend.embedding_cache import EmbeddingCache
+from conftest import FakeEmbeddings, make_docs
+
+VECTOR_BYTES = 4 * 4
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Make time.time() strictly increasing so recency order is deterministic."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_bytes=0)
+    yield cache
+    cache.close()
+
+
+def _vector(value):
+    return np.full(4, value, dtype=np.float32)
+
+
+def test_vectors_round_trip_per_model(cache):
+    cache.put_many("model-a", ["one", "two"], [_vector(1), _vector(2)])
+
+    found = cache.get_many("model-a", ["two", "missing", "one"])
+
+    assert np.array_equal(found[0], _vector(2))
+    assert found[1] is None
+    assert np.array_equal(found[2], _vector(1))
+    assert cache.get("model-b", "one") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+    assert stats["size_bytes"] == 2 * VECTOR_BYTES
+
+
+def test_lookups_do_not_write(cache):
+    cache.put_many("model", ["one"], [_vector(1)])
+    writes = cache._conn.total_changes
+
+    for _ in range(10):
+        cache.get("model", "one")
+
+    assert cache._conn.total_changes == writes
+
+
+def test_pending_hits_are_written_back_in_batches(cache, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_TOUCH_BATCH", 2)
+    cache.put_many("model", ["one", "two"], [_vector(1), _vector(2)])
+    writes = cache._conn.total_changes
+
+    cache.get("model", "one")
+    assert cache._conn.total_changes == writes
+    cache.get("model", "two")
+    assert cache._conn.total_changes == writes + 2
+
+
+def test_eviction_keeps_recently_read_vectors(tmp_path, clock):
+    cache = EmbeddingCache(str(tmp_path / "lru.sqlite"), max_bytes=3 * VECTOR_BYTES)
+    for i, text in enumerate(["a", "b", "c"]):
+        cache.put("model", text, _vector(i))
+    # "a" is the oldest write but the most recent read
+    cache.get("model", "a")
+
+    cache.put("model", "d", _vector(3))
+
+    # Evicting down to 90% of the budget drops the two least recently used
+    assert cache.get("model", "b") is None
+    assert cache.get("model", "c") is None
+    assert cache.get("model", "a") is not None
+    assert cache.get("model", "d") is not None
+    assert cache.stats()["evictions"] == 2
+    cache.close()
+
+
+def test_recency_survives_close(tmp_path, clock):
+    path = str(tmp_path / "reopen.sqlite")
+    cache = EmbeddingCache(path, max_bytes=0)
+    cache.put_many("model", ["a", "b"], [_vector(0), _vector(1)])
+    cache.get("model", "a")
+    cache.close()
+
+    reopened = EmbeddingCache(path, max_bytes=0)
+    order = reopened._conn.execute(
+        "SELECT text_hash FROM embeddings ORDER BY last_used"
+    ).fetchall()
+    reopened.close()
+
+    assert [h for (h,) in order] == [
+        embedding_cache.text_hash("b"),
+        embedding_cache.text_hash("a"),
+    ]
+
+
+def test_reingesting_unchanged_content_skips_the_api(make_store, tmp_path):
+    store = make_store()
+    store.embedding_cache = EmbeddingCache(str(tmp_path / "store.sqlite"))
+    docs = make_docs(["cached chunk one", "cached chunk two"])
+
+    store.add_documents(docs)
+    requests = FakeEmbeddings.requests
+    store.add_documents(docs)
+
+    assert FakeEmbeddings.requests == requests
+    store.embedding_cache.close()
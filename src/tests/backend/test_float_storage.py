@@ -0,0 +1,93 @@
+"""FLOAT[N] embedding storage, in-DuckDB ranking and the legacy JSON migration."""
+
+import json
+import os
+
+import duckdb
+
+from conftest import fake_vector, make_docs
+
+
+def _legacy_collection(store_dir, name, rows):
+    """Write a collection in the pre-FLOAT[N] layout, with JSON embeddings."""
+    os.makedirs(store_dir, exist_ok=True)
+    conn = duckdb.connect(os.path.join(store_dir, f"{name}.db"))
+    cols = ", ".join(f"keyword{i} VARCHAR" for i in range(10))
+    conn.execute(f"""
+        CREATE TABLE {name} (
+            id VARCHAR PRIMARY KEY,
+            content TEXT,
+            embedding JSON,
+            metadata JSON,
+            {cols}
+        )
+    """)
+    for doc_id, content, embedding in rows:
+        conn.execute(
+            f"INSERT INTO {name} (id, content, embedding, metadata) VALUES (?, ?, ?, ?)",
+            [
+                doc_id,
+                content,
+                json.dumps(embedding),
+                json.dumps({"keywords": ["fees"]}),
+            ],
+        )
+    conn.close()
+
+
+def test_embeddings_are_stored_as_fixed_width_arrays(make_store):
+    store = make_store()
+    store.add_documents(make_docs(["tuition fees", "library hours"]))
+
+    assert store.dimension == 1536
+    assert store._table_columns()["embedding"] == "FLOAT[1536]"
+    assert store.read_meta() == {
+        "embedding_model": "text-embedding-3-small",
+        "dimension": 1536,
+    }
+
+
+def test_query_ranks_by_cosine_similarity(make_store):
+    store = make_store()
+    store.add_documents(
+        make_docs(["tuition fees payment", "library opening hours", "campus map"])
+    )
+
+    results = store.query("when are library hours", k=2)
+
+    assert [r["content"] for r in results][0] == "library opening hours"
+    assert len(results) == 2
+    assert results[0]["similarity"] >= results[1]["similarity"]
+    assert results[0]["metadata"]["source"] == "doc1.txt"
+
+
+def test_upsert_replaces_rows_with_the_same_id(make_store):
+    store = make_store()
+    store.add_documents([{"id": "a", "content": "old text", "metadata": {}}])
+    store.add_documents([{"id": "a", "content": "new text", "metadata": {}}])
+
+    assert [doc["content"] for doc in store.get(limit=10)] == ["new text"]
+
+
+def test_legacy_json_embeddings_are_migrated(make_store):
+    store = make_store()
+    name = "legacy_collection"
+    store_dir = store.base_db_dir
+    matching = fake_vector("exam timetable", 1536)
+    _legacy_collection(
+        store_dir,
+        name,
+        [
+            ("a", "exam timetable", matching),
+            ("b", "canteen menu", fake_vector("canteen menu", 1536)),
+            ("bad", "truncated row", matching[:10]),
+        ],
+    )
+
+    migrated = make_store(collection_name=name)
+
+    assert migrated._table_columns()["embedding"] == "FLOAT[1536]"
+    assert sorted(doc["id"] for doc in migrated.get(limit=10)) == ["a", "b"]
+    assert migrated.query("exam timetable", k=1)[0]["id"] == "a"
+    # Postings are backfilled from the keywords kept in the metadata
+    assert migrated.query("menu", k=5, keyword_filter=["fees"])
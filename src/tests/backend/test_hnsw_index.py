@@ -0,0 +1,153 @@
+"""HNSW index backend and the vector index backend setting."""
+
+import importlib
+import os
+
+import numpy as np
+import pytest
+
+from backend import config, database
+from backend.vector_index import HNSWLIB_AVAILABLE, HNSWVectorIndex
+from conftest import make_docs
+
+needs_hnswlib = pytest.mark.skipif(not HNSWLIB_AVAILABLE, reason="hnswlib missing")
+
+
+@pytest.fixture
+def reload_config(monkeypatch):
+    """Re-import backend.config under a patched environment, then restore it."""
+
+    def reload(**env):
+        for name in ("VECTOR_INDEX_BACKEND", "VECTOR_INDEX_IN_MEMORY"):
+            monkeypatch.delenv(name, raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return importlib.reload(config)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(config)
+
+
+@pytest.mark.parametrize(
+    "env, backend",
+    [
+        ({}, "duckdb"),
+        ({"VECTOR_INDEX_IN_MEMORY": "true"}, "memory"),
+        ({"VECTOR_INDEX_BACKEND": "hnsw"}, "hnsw"),
+        ({"VECTOR_INDEX_BACKEND": "hnsw", "VECTOR_INDEX_IN_MEMORY": "true"}, "hnsw"),
+        (
+            {"VECTOR_INDEX_BACKEND": "duckdb", "VECTOR_INDEX_IN_MEMORY": "true"},
+            "duckdb",
+        ),
+    ],
+)
+def test_index_backend_setting_wins_over_the_in_memory_alias(
+    reload_config, env, backend
+):
+    reloaded = reload_config(**env)
+
+    assert reloaded.VECTOR_INDEX_BACKEND == backend
+    assert reloaded.VECTOR_INDEX_IN_MEMORY == (backend == "memory")
+
+
+def _random_unit_vectors(count, dimension, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+@needs_hnswlib
+def test_graph_search_recalls_the_exact_neighbours():
+    vectors = _random_unit_vectors(500, 16)
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    index = HNSWVectorIndex(16, min_rows=100, ef_search=200)
+    index.add(ids, vectors)
+
+    assert index.stats()["graph_built"]
+    for query in vectors[:20]:
+        approximate = index.search(query, 5)
+        exact = super(HNSWVectorIndex, index).search(query, 5)
+        assert approximate[0] == exact[0]
+        assert len({i for i, _ in approximate} & {i for i, _ in exact}) >= 4
+
+
+@needs_hnswlib
+def test_small_collections_and_filters_are_searched_exactly():
+    index = HNSWVectorIndex(16, min_rows=100)
+    vectors = _random_unit_vectors(10, 16)
+    index.add([f"doc{i}" for i in range(10)], vectors, [["fees"]] * 10)
+
+    assert not index.stats()["graph_built"]
+    assert index.search(vectors[3], 1)[0][0] == "doc3"
+    assert index.search(vectors[3], 1, keyword_filter=["fees"])[0][0] == "doc3"
+
+
+@needs_hnswlib
+def test_graph_is_compacted_once_most_labels_are_deleted():
+    vectors = _random_unit_vectors(100, 16)
+    index = HNSWVectorIndex(16, min_rows=10)
+    index.add([f"doc{i}" for i in range(100)], vectors)
+    index.remove([f"doc{i}" for i in range(40)])
+
+    assert index.stats()["graph_labels"] == 100
+    index.remove([f"doc{i}" for i in range(40, 60)])
+    assert index.stats()["graph_labels"] == 40
+    index.add(["new"], vectors[:1])
+    assert index.search(vectors[0], 1)[0][0] == "new"
+    assert index.search(vectors[70], 1)[0][0] == "doc70"
+
+
+@needs_hnswlib
+def test_saved_graph_is_reloaded_and_updated(tmp_path):
+    path = str(tmp_path / "graph.hnsw")
+    vectors = _random_unit_vectors(200, 16)
+    ids = [f"doc{i}" for i in range(200)]
+    index = HNSWVectorIndex(16, min_rows=50)
+    index.add(ids, vectors)
+    index.save(path)
+
+    reloaded = HNSWVectorIndex(16, min_rows=50)
+    # One row was deleted and one added after the graph was saved
+    reloaded.add(ids[1:] + ["new"], np.vstack([vectors[1:], vectors[:1]]))
+
+    assert reloaded.load(path)
+    assert reloaded.search(vectors[0], 1)[0][0] == "new"
+    assert HNSWVectorIndex(8).load(path) is False
+
+
+@needs_hnswlib
+def test_hnsw_store_persists_its_graph(make_store, monkeypatch):
+    monkeypatch.setattr(database, "HNSW_MIN_ROWS", 2)
+    store = make_store(index_backend="hnsw")
+    store.add_documents(
+        make_docs(["tuition fees payment", "library opening hours", "campus map"])
+    )
+    store.rebuild_index()
+
+    assert os.path.exists(store.index_file)
+    assert store.query("library hours", k=1)[0]["content"] == "library opening hours"
+    assert store.index_stats()["graph_built"]
+
+
+@needs_hnswlib
+def test_warm_start_loads_the_graph_without_building_it(make_store, monkeypatch):
+    monkeypatch.setattr(database, "HNSW_MIN_ROWS", 2)
+    store = make_store(index_backend="hnsw")
+    store.add_documents(
+        make_docs(["tuition fees payment", "library opening hours", "campus map"])
+    )
+    store.save_index()
+    store.connections.close()
+    builds = []
+    rebuild = HNSWVectorIndex.rebuild
+    monkeypatch.setattr(
+        HNSWVectorIndex, "rebuild", lambda self: builds.append(1) or rebuild(self)
+    )
+
+    reopened = make_store(collection_name=store.collection_name, index_backend="hnsw")
+
+    assert builds == []
+    assert reopened.index_stats()["graph_built"]
+    assert reopened.query("library hours", k=1)[0]["content"] == "library opening hours"
+    reopened.rebuild_index()
+    assert builds == [1]
@@ -0,0 +1,150 @@
+"""Hybrid BM25 + vector retrieval fused with reciprocal rank fusion."""
+
+import duckdb
+import pytest
+
+from backend import database, maintenance
+from backend.database import _reciprocal_rank_fusion
+from conftest import make_docs
+
+
+def _fts_installed():
+    try:
+        duckdb.connect().execute("LOAD fts")
+    except duckdb.Error:
+        return False
+    return True
+
+
+needs_fts = pytest.mark.skipif(
+    not _fts_installed(), reason="DuckDB FTS extension not installed"
+)
+
+
+class RecordingConnection:
+    """Proxy for the writer connection that records the SQL it runs."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.statements = []
+
+    def execute(self, sql, *args):
+        self.statements.append(" ".join(sql.split()))
+        return self._conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_rrf_sums_weighted_reciprocal_ranks():
+    fused = dict(_reciprocal_rank_fusion([["a", "b"], ["b", "c"]], [0.5, 0.5], rrf_k=1))
+
+    assert fused["b"] == pytest.approx(0.5 / 3 + 0.5 / 2)
+    assert fused["a"] == pytest.approx(0.5 / 2)
+    assert fused["c"] == pytest.approx(0.5 / 3)
+
+
+def test_rrf_orders_by_fused_score_and_honours_weights():
+    rankings = [["vector_top", "both"], ["lexical_top", "both"]]
+
+    assert [i for i, _ in _reciprocal_rank_fusion(rankings, [0.5, 0.5])][0] == "both"
+    assert _reciprocal_rank_fusion(rankings, [1.0, 0.0])[0][0] == "vector_top"
+    assert _reciprocal_rank_fusion(rankings, [0.0, 1.0])[0][0] == "lexical_top"
+
+
+def test_query_path_never_installs_the_extension(make_store):
+    store = make_store()
+    store.add_documents(make_docs(["library opening hours", "campus map"]))
+    expected = store.query("library hours", k=2, mode="vector")
+    store.conn = RecordingConnection(store.conn)
+
+    results = store.query("library hours", k=2, mode="hybrid")
+
+    assert not any(s.startswith("INSTALL") for s in store.conn.statements)
+    assert "LOAD fts" in store.conn.statements
+    if not store._fts_available:
+        assert results == expected
+
+
+def test_maintenance_retries_installing_a_missing_extension(make_store, monkeypatch):
+    store = make_store()
+    store.add_documents(make_docs(["library opening hours"]))
+    store.search_mode = "hybrid"
+    store._fts_available = False
+    installs = []
+    monkeypatch.setattr(
+        store, "load_fts", lambda install=False: installs.append(install)
+    )
+
+    maintenance.maintain_store(store, probe_queries=1)
+
+    assert installs == [True]
+
+
+def test_sharded_rebuild_fts_rebuilds_every_shard(make_store, monkeypatch):
+    store = make_store(num_shards=2)
+    store.add_documents(make_docs(["library opening hours", "campus map"]))
+    installs = []
+    for shard in store.shards:
+        shard._fts_available = False
+        monkeypatch.setattr(
+            shard, "load_fts", lambda install=False: installs.append(install)
+        )
+
+    assert not store.rebuild_fts()
+    assert installs == [True, True]
+def test_writes_rebuild_the_bm25_index_once_off_the_query_path(
+    make_store, monkeypatch
+):
+    monkeypatch.setattr(database, "HYBRID_FTS_REBUILD_DELAY", 0.2)
+    store = make_store()
+    builds = []
+    monkeypatch.setattr(store, "_ensure_fts", lambda: builds.append(1))
+    # As if the extension were loaded but no BM25 index had been built yet
+    store._fts_available = True
+    for i in range(3):
+        store.add_documents(make_docs([f"exam venue {i}"], source=f"batch{i}.txt"))
+
+    results = store.query("exam venue", k=2, mode="hybrid")
+
+    assert builds == []
+    assert results == store.query("exam venue", k=2, mode="vector")
+    store._fts_timer.join(5)
+    assert builds == [1]
+
+
+@needs_fts
+def test_hybrid_query_surfaces_exact_term_matches(make_store):
+    store = make_store(search_mode="hybrid")
+    store.add_documents(
+        make_docs(
+            [
+                "policy POL1234 covers refunds",
+                "refund rules for course fees",
+                "campus library hours",
+            ]
+        )
+    )
+    # What the background timer runs once the writes pause
+    store._ensure_fts()
+
+    results = store.query("POL1234", k=2, lexical_weight=1.0)
+
+    assert store._fts_available
+    assert results[0]["content"] == "policy POL1234 covers refunds"
+    assert all("score" in r for r in results)
+
+
+@needs_fts
+def test_bm25_index_is_rebuilt_after_writes(make_store):
+    store = make_store(search_mode="hybrid")
+    store.add_documents(make_docs(["campus library hours"]))
+    store._ensure_fts()
+    store.add_documents(make_docs(["XYZ987 exam venue"], source="new.txt"))
+
+    # The previous index keeps serving until the rebuild
+    assert store._fts_ready() and store._fts_dirty
+    store._ensure_fts()
+    assert store.query("XYZ987", k=1, lexical_weight=1.0)[0]["content"] == (
+        "XYZ987 exam venue"
+    )
@@ -0,0 +1,71 @@
+"""Keyword filtering through the (keyword, doc_id) posting table."""
+
+import pytest
+
+from conftest import make_docs
+
+TEXTS = ["tuition fees and loans", "library opening hours", "fees for the library"]
+KEYWORDS = [["fees", "loans"], ["library"], ["fees", "library"]]
+
+
+@pytest.fixture(params=["duckdb", "memory"])
+def store(request, make_store):
+    store = make_store(index_backend=request.param)
+    store.add_documents(make_docs(TEXTS, keywords=KEYWORDS))
+    return store
+
+
+def _postings(store):
+    return sorted(
+        store.conn.execute(
+            f"SELECT keyword, doc_id FROM {store.keyword_table}"
+        ).fetchall()
+    )
+
+
+def test_filter_keeps_only_matching_documents(store):
+    results = store.query("opening hours", k=5, keyword_filter=["loans"])
+
+    assert [r["content"] for r in results] == ["tuition fees and loans"]
+
+
+def test_documents_matching_more_keywords_rank_first(store):
+    results = store.query(
+        "library opening hours", k=5, keyword_filter=["fees", "library"]
+    )
+
+    assert results[0]["content"] == "fees for the library"
+    assert {r["content"] for r in results} == set(TEXTS)
+
+
+def test_keywords_beyond_the_legacy_columns_are_filterable(make_store):
+    store = make_store()
+    keywords = [f"kw{i}" for i in range(15)]
+    store.add_documents(make_docs(["many keywords"], keywords=[keywords]))
+
+    assert store.query("many", keyword_filter=["kw14"])[0]["content"] == "many keywords"
+
+
+def test_upserts_replace_postings(make_store):
+    store = make_store()
+    store.add_documents(
+        [{"id": "a", "content": "text", "metadata": {"keywords": ["old"]}}]
+    )
+    store.add_documents(
+        [{"id": "a", "content": "text", "metadata": {"keywords": ["new"]}}]
+    )
+
+    assert _postings(store) == [("new", "a")]
+    assert store.query("text", keyword_filter=["old"]) == []
+
+
+def test_missing_posting_table_is_backfilled_from_metadata(make_store):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS, keywords=KEYWORDS))
+    expected = _postings(store)
+    store.conn.execute(f"DROP TABLE {store.keyword_table}")
+    store.connections.close()
+
+    reopened = make_store(collection_name=store.collection_name)
+
+    assert _postings(reopened) == expected
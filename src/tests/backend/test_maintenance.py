@@ -0,0 +1,156 @@
+"""Compaction and scheduled maintenance of collections."""
+
+import concurrent.futures
+import threading
+
+import pytest
+
+from backend.database import collection_stores
+from backend.maintenance import maintain_collection
+from conftest import make_docs, run_in_thread
+
+TEXTS = [f"timetable {i} for module {i % 6}" for i in range(60)]
+
+
+def _contents(store):
+    return sorted(doc["content"] for doc in store.get(limit=1000))
+
+
+@pytest.fixture
+def churned(make_store):
+    """A collection whose documents were all upserted twice."""
+    store = make_store(index_backend="memory")
+    store.add_documents(make_docs(TEXTS, keywords=[[f"m{i % 6}"] for i in range(60)]))
+    store.add_documents(make_docs(TEXTS, keywords=[[f"m{i % 6}"] for i in range(60)]))
+    return store
+
+
+def test_collection_stores_lists_the_files_of_a_collection(make_store):
+    single = make_store()
+    sharded = make_store(num_shards=3)
+
+    assert collection_stores(single) == [single]
+    assert collection_stores(sharded) == sharded.shards
+
+
+def test_compact_keeps_every_row_and_posting(churned):
+    contents = _contents(churned)
+    before = churned.query("module 4", k=5, keyword_filter=["m4"])
+
+    churned.compact()
+
+    assert _contents(churned) == contents
+    assert churned.sources() == {f"doc{i}.txt": 1 for i in range(60)}
+    after = churned.query("module 4", k=5, keyword_filter=["m4"])
+    assert [r["similarity"] for r in after] == pytest.approx(
+        [r["similarity"] for r in before]
+    )
+
+
+def test_compact_after_a_query_on_the_same_thread(churned):
+    def query_then_compact():
+        churned.query("timetable 3", k=3)
+        # A result left unconsumed keeps this thread's read transaction open
+        churned.connections.reader().execute(
+            f"SELECT count(*) FROM {churned.collection_name}"
+        ).fetchone()
+        churned.compact()
+        return churned.query("timetable 3", k=1)[0]["content"]
+
+    assert run_in_thread(query_then_compact) == "timetable 3 for module 3"
+
+
+def test_compact_while_another_thread_keeps_its_reader(churned, caplog):
+    queried, finish = threading.Event(), threading.Event()
+
+    def reader():
+        churned.query("timetable 5", k=3)
+        churned.get(limit=5)
+        queried.set()
+        finish.wait(10)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        assert queried.wait(10)
+        run_in_thread(churned.compact)
+    finally:
+        finish.set()
+        thread.join()
+    assert len(_contents(churned)) == 60
+    assert "CHECKPOINT" not in caplog.text
+
+
+def test_compact_after_content_fingerprints_on_two_threads(make_store, caplog):
+    store = make_store()
+    store.add_documents(make_docs(["exams start on monday", "library hours"]))
+    fingerprinted, finish = threading.Event(), threading.Event()
+
+    def other_thread():
+        store.content_fingerprint()
+        fingerprinted.set()
+        finish.wait(10)
+
+    thread = threading.Thread(target=other_thread, daemon=True)
+    thread.start()
+    try:
+        assert fingerprinted.wait(10)
+
+        def fingerprint_then_compact():
+            store.add_documents(make_docs(["new notice"], source="new.txt"))
+            fingerprint = store.content_fingerprint()
+            store.compact()
+            return fingerprint
+
+        fingerprint = run_in_thread(fingerprint_then_compact)
+    finally:
+        finish.set()
+        thread.join()
+
+    assert fingerprint.startswith("3:")
+    assert store.content_fingerprint() == fingerprint
+    # A read left open on either thread makes the final checkpoint fail or hang
+    assert "CHECKPOINT" not in caplog.text
+
+
+@pytest.mark.parametrize("shards", [None, 2])
+def test_maintain_collection_reports_each_file(make_store, shards):
+    store = make_store(**({"num_shards": shards} if shards else {}))
+    store.add_documents(make_docs(TEXTS))
+
+    report = run_in_thread(lambda: maintain_collection(store, probe_queries=4))
+
+    assert report["collection"] == store.collection_name
+    assert len(report["parts"]) == (shards or 1)
+    assert report["bytes_before"] == sum(p["bytes_before"] for p in report["parts"])
+    assert report["bytes_after"] > 0
+    assert report["query_ms_after"] >= 0
+    assert len(_contents(store)) == 60
+
+
+def test_queries_during_compact_wait_for_the_swap(churned):
+    compacting, finish = threading.Event(), threading.Event()
+    original = churned._index_source_table
+
+    def slow_index_source_table():
+        # Runs inside the swap, after the old tables were dropped
+        compacting.set()
+        finish.wait(10)
+        original()
+
+    churned._index_source_table = slow_index_source_table
+    query = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    # Open the query thread's cursor first; opening one waits for the write lock
+    query.submit(churned.query, "timetable 3", 1).result(10)
+    compact = threading.Thread(target=churned.compact, daemon=True)
+    compact.start()
+    try:
+        assert compacting.wait(10)
+        result = query.submit(churned.query, "timetable 3", 1)
+        with pytest.raises(concurrent.futures.TimeoutError):
+            result.result(0.2)
+    finally:
+        finish.set()
+        compact.join(10)
+    assert result.result(10)[0]["content"] == "timetable 3 for module 3"
+    query.shutdown()
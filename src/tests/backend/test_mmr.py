@@ -0,0 +1,78 @@
+"""Maximal marginal relevance selection and search."""
+
+import asyncio
+
+import numpy as np
+
+from backend.database import _mmr_select
+from conftest import make_docs
+
+QUERY = [1.0, 0.0, 0.0]
+CANDIDATES = np.array(
+    [
+        [0.9, 0.1, 0.0],  # most relevant
+        [0.9, 0.12, 0.0],  # near-duplicate of the first
+        [0.6, 0.0, 0.8],  # less relevant, different direction
+    ]
+)
+
+
+def test_relevance_only_keeps_similarity_order():
+    assert _mmr_select(QUERY, CANDIDATES, 3, lambda_mult=1.0) == [0, 1, 2]
+
+
+def test_diversity_skips_near_duplicates():
+    assert _mmr_select(QUERY, CANDIDATES, 2, lambda_mult=0.5) == [0, 2]
+
+
+def test_selection_is_bounded_by_the_pool():
+    assert _mmr_select(QUERY, CANDIDATES, 10, 0.5) == [0, 2, 1]
+    assert _mmr_select(QUERY, np.empty((0, 3)), 3, 0.5) == []
+    assert _mmr_select(QUERY, CANDIDATES, 0, 0.5) == []
+
+
+def _store(make_store):
+    store = make_store()
+    store.add_documents(
+        make_docs(
+            [
+                "library opening hours weekdays",
+                "library opening hours weekdays and holidays",
+                "library study rooms booking",
+            ]
+        )
+    )
+    return store
+
+
+def test_mmr_search_prefers_new_content(make_store):
+    store = _store(make_store)
+
+    plain = store.query("library opening hours", k=2)
+    diverse = store.max_marginal_relevance_search(
+        "library opening hours", k=2, fetch_k=3, lambda_mult=0.5
+    )
+
+    assert "study rooms" not in " ".join(r["content"] for r in plain)
+    assert diverse[1]["content"] == "library study rooms booking"
+
+
+def test_async_mmr_and_retriever_match_sync(make_store):
+    store = _store(make_store)
+    expected = store.max_marginal_relevance_search(
+        "library opening hours", k=2, fetch_k=3, lambda_mult=0.5
+    )
+    retriever = store.as_retriever(
+        {"k": 2, "search_type": "mmr", "fetch_k": 3, "lambda_mult": 0.5}
+    )
+
+    results = asyncio.run(
+        store.amax_marginal_relevance_search(
+            "library opening hours", k=2, fetch_k=3, lambda_mult=0.5
+        )
+    )
+
+    assert results == expected
+    assert [d.page_content for d in retriever.invoke("library opening hours")] == [
+        r["content"] for r in expected
+    ]
@@ -0,0 +1,58 @@
+"""int8/float16 quantised memory index with exact re-ranking."""
+
+import numpy as np
+import pytest
+
+from backend.vector_index import InMemoryVectorIndex, QuantizedVectorIndex
+from conftest import make_docs
+
+
+def _vectors(count=200, dimension=32, seed=1):
+    return np.random.default_rng(seed).standard_normal((count, dimension))
+
+
+@pytest.mark.parametrize("quantization, ratio", [("int8", 3.0), ("float16", 1.9)])
+def test_quantized_scores_approximate_exact_ones(quantization, ratio):
+    vectors = _vectors()
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    exact = InMemoryVectorIndex(32, initial_capacity=256)
+    quantized = QuantizedVectorIndex(
+        32, initial_capacity=256, quantization=quantization
+    )
+    exact.add(ids, vectors)
+    quantized.add(ids, vectors)
+
+    for query in vectors[:10]:
+        approximate = dict(quantized.search(query, 20))
+        for doc_id, score in exact.search(query, 5):
+            assert abs(approximate[doc_id] - score) < 0.02
+    assert not quantized.exact_scores
+    assert exact._storage_bytes() / quantized._storage_bytes() > ratio
+
+
+def test_unknown_quantization_is_rejected():
+    with pytest.raises(ValueError):
+        QuantizedVectorIndex(8, quantization="int4")
+
+
+def test_store_reranks_the_shortlist_at_full_precision(make_store):
+    docs = make_docs(["tuition fees payment", "library opening hours", "campus map"])
+    exact = make_store()
+    quantized = make_store(index_backend="memory", quantization="int8")
+    exact.add_documents(docs)
+    quantized.add_documents(docs)
+
+    expected = exact.query("library hours", k=2)
+    results = quantized.query("library hours", k=2)
+
+    assert [r["id"] for r in results] == [r["id"] for r in expected]
+    assert [r["similarity"] for r in results] == pytest.approx(
+        [r["similarity"] for r in expected], abs=1e-6
+    )
+    assert quantized.index_stats()["quantization"] == "int8"
+
+
+def test_quantization_needs_the_memory_backend(make_store):
+    store = make_store(quantization="int8")
+
+    assert store.quantization == "none"
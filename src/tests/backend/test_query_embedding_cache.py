@@ -0,0 +1,149 @@
+"""In-process LRU query embedding cache with in-flight deduplication."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend import embedding_cache
+from backend.embedding_cache import QueryEmbeddingCache
+from conftest import FakeEmbeddings, make_docs
+
+
+def test_values_are_computed_once_and_evicted_lru():
+    cache = QueryEmbeddingCache(max_size=2, ttl=0)
+    calls = []
+
+    def compute(key):
+        return lambda: calls.append(key) or key.upper()
+
+    assert cache.get_or_compute("a", compute("a")) == "A"
+    cache.get_or_compute("b", compute("b"))
+    cache.get_or_compute("a", compute("a"))
+    cache.get_or_compute("c", compute("c"))
+    cache.get_or_compute("b", compute("b"))
+
+    assert calls == ["a", "b", "c", "b"]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(max_size=8, ttl=10)
+    cache.get_or_compute("a", lambda: 1)
+
+    now[0] = 11.0
+
+    assert cache.get_or_compute("a", lambda: 2) == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = QueryEmbeddingCache(max_size=8, ttl=0)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    owner = threading.Thread(
+        target=lambda: results.append(cache.get_or_compute("k", slow))
+    )
+    owner.start()
+    started.wait(5)
+    waiter = threading.Thread(
+        target=lambda: results.append(cache.get_or_compute("k", slow))
+    )
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert results == ["value", "value"]
+    assert calls == [1]
+
+
+def test_failures_are_not_cached():
+    cache = QueryEmbeddingCache(max_size=8, ttl=0)
+
+    def fail():
+        raise RuntimeError("api down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+
+
+def test_batch_lookup_computes_only_missing_keys():
+    cache = QueryEmbeddingCache(max_size=8, ttl=0)
+    cache.get_or_compute("a", lambda: "A")
+    batches = []
+
+    def compute_many(keys):
+        batches.append(keys)
+        return [key.upper() for key in keys]
+
+    found = cache.get_or_compute_many(["a", "b", "c", "b"], compute_many)
+
+    assert found == {"a": "A", "b": "B", "c": "C"}
+    assert batches == [["b", "c"]]
+
+
+def test_async_lookup_shares_the_cache():
+    cache = QueryEmbeddingCache(max_size=8, ttl=0)
+
+    async def compute():
+        return "async"
+
+    assert asyncio.run(cache.aget_or_compute("k", compute)) == "async"
+    assert cache.get_or_compute("k", lambda: "sync") == "async"
+
+
+def test_cancelled_owner_does_not_cancel_its_waiters():
+    cache = QueryEmbeddingCache(max_size=8, ttl=0)
+    started, release = asyncio.Event(), asyncio.Event()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        started.set()
+        await release.wait()
+        return [0.5, 0.5]
+
+    async def main():
+        owner = asyncio.ensure_future(cache.aget_or_compute("k", compute))
+        await started.wait()
+        waiter = asyncio.ensure_future(cache.aget_or_compute("k", compute))
+        await asyncio.sleep(0)
+        # e.g. the owner's client disconnected mid-turn
+        owner.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await waiter
+
+    assert asyncio.run(main()) == [0.5, 0.5]
+    assert calls == [1]
+    assert cache.get_or_compute("k", lambda: "recomputed") == [0.5, 0.5]
+
+def test_repeated_queries_embed_once(make_store):
+    store = make_store()
+    store.embedding_cache = None
+    store.add_documents(make_docs(["library opening hours"]))
+    requests = FakeEmbeddings.requests
+
+    for _ in range(3):
+        store.query("library hours")
+
+    assert FakeEmbeddings.requests == requests + 1
+    assert store.cache_stats()["query"]["hits"] == 2
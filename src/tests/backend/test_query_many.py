@@ -0,0 +1,75 @@
+"""Batch retrieval for several query variants at once."""
+
+import pytest
+
+from backend.database import _union_rankings
+from conftest import FakeEmbeddings, make_docs, run_in_thread
+
+TEXTS = [
+    "tuition fees payment deadline",
+    "library opening hours",
+    "campus shuttle map",
+    "exam timetable release",
+]
+
+
+@pytest.fixture(params=["duckdb", "memory", "int8"])
+def store(request, make_store):
+    if request.param == "int8":
+        store = make_store(index_backend="memory", quantization="int8")
+    else:
+        store = make_store(index_backend=request.param)
+    store.embedding_cache = None
+    store.add_documents(make_docs(TEXTS))
+    return store
+
+
+def test_union_keeps_each_ids_best_similarity():
+    union = _union_rankings([[("a", 0.9), ("b", 0.5)], [("b", 0.7), ("c", 0.6)]])
+
+    assert union == [("a", 0.9), ("b", 0.7), ("c", 0.6)]
+
+
+def test_each_variant_ranks_like_a_single_query(store):
+    variants = ["library hours", "exam timetable", "shuttle map"]
+    embeddings = [store._embed_query(text) for text in variants]
+
+    rankings = store.rank_many_by_vectors(variants, embeddings, k=2)
+
+    for text, ranking in zip(variants, rankings):
+        expected = store.query(text, k=2)
+        # Only the top hit is unambiguous; the rest share similarity 0
+        assert ranking[0][0] == expected[0]["id"]
+        assert [sim for _, sim in ranking] == pytest.approx(
+            [r["similarity"] for r in expected], abs=1e-5
+        )
+
+
+def test_query_many_embeds_all_variants_in_one_request(store):
+    requests = FakeEmbeddings.requests
+
+    results = store.query_many(
+        ["when is the library open", "library hours", "library hours"], k=2
+    )
+
+    assert FakeEmbeddings.requests == requests + 1
+    ids = [r["id"] for r in results]
+    assert len(ids) == len(set(ids))
+    assert results[0]["content"] == "library opening hours"
+
+
+def test_batch_ranking_leaves_no_read_transaction_open(make_store):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS))
+
+    variants = ["library hours", "exam timetable"]
+    embeddings = [store._embed_query(text) for text in variants]
+
+    def query_then_checkpoint():
+        # Sharded query_many ranks each shard this way before fetching rows
+        store.rank_many_by_vectors(variants, embeddings, k=2)
+        with store.connections.write() as writer:
+            writer.execute("CHECKPOINT")
+        return True
+
+    assert run_in_thread(query_then_checkpoint)
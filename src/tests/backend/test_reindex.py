@@ -0,0 +1,138 @@
+"""Online re-indexing to a smaller embedding width."""
+
+import logging
+import os
+import threading
+import time
+
+import pytest
+
+from backend import database
+from conftest import FAKE_MODEL_WIDTH, make_docs, run_in_thread
+
+TEXTS = [f"notice {i} about exam week {i % 4}" for i in range(30)]
+
+
+def test_reindex_shrinks_the_width_and_keeps_serving(make_store):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS))
+    reduced = make_store(dimensions=256)
+    reduced.add_documents(make_docs(TEXTS))
+
+    assert store.start_reindex(256).result(timeout=10) == 30
+
+    assert store.dimension == 256
+    assert store.read_meta() == {
+        "embedding_model": "text-embedding-3-small",
+        "dimension": 256,
+    }
+    assert store.embedding.dimensions == 256
+    # Stored vectors were truncated, so they rank like freshly embedded ones
+    after = store.query("exam week 2", k=5)
+    assert [r["similarity"] for r in after] == pytest.approx(
+        [r["similarity"] for r in reduced.query("exam week 2", k=5)]
+    )
+    store.add_documents(make_docs(["a new notice"], source="new.txt"))
+    assert len(store.get(limit=100)) == 31
+
+
+@pytest.mark.parametrize("backend", ["duckdb", "memory"])
+def test_queries_during_repeated_reindexing_never_fail(make_store, backend):
+    store = make_store(index_backend=backend)
+    store.add_documents(make_docs(TEXTS))
+    stop, errors, answered = threading.Event(), [], []
+
+    def query_loop(i):
+        while not stop.is_set():
+            try:
+                results = store.query(f"exam week {i % 4}", k=3)
+                store.query_many([f"notice {i}", "exam week 1"], k=2)
+            except Exception as e:
+                errors.append(e)
+                return
+            answered.append(len(results))
+
+    threads = [
+        threading.Thread(target=query_loop, args=(i,), daemon=True) for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for width in (1024, 512, 256, 128, 64, 32, 16):
+            store.reindex_dimensions(width)
+            store.add_documents(make_docs([f"notice at {width}"], source=f"{width}.txt"))
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(10)
+
+    assert errors == []
+    assert answered and all(n == 3 for n in answered)
+    assert store.dimension == 16
+    assert len(store.query("notice at 16", k=40)) == 37
+
+
+def test_sharded_reindex_keeps_one_embedding_client(make_store):
+    store = make_store(num_shards=2)
+    store.add_documents(make_docs(TEXTS))
+
+    store.start_reindex(256).result(timeout=10)
+
+    first = store.shards[0]
+    assert first.embedding.dimensions == 256
+    assert all(shard.embedding is first.embedding for shard in store.shards)
+    assert all(shard.dimension == 256 for shard in store.shards)
+
+
+def test_reindex_after_a_query_does_not_hang(make_store):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS))
+
+    def query_then_reindex():
+        store.query("exam week 1", k=3)
+        store.content_fingerprint()
+        return store.reindex_dimensions(128)
+
+    assert run_in_thread(query_then_reindex) == 30
+    assert store.dimension == 128
+
+
+def test_unknown_width_model_records_its_meta(make_store):
+    store = make_store(embedding_model="in-house-embedder")
+
+    assert store.read_meta() == {
+        "embedding_model": "in-house-embedder",
+        "dimension": None,
+    }
+    store.add_documents(make_docs(["first document"]))
+    assert store.read_meta() == {
+        "embedding_model": "in-house-embedder",
+        "dimension": FAKE_MODEL_WIDTH,
+    }
+
+
+def test_failed_automatic_reindex_is_logged(make_store, monkeypatch, caplog):
+    existing = make_store()
+    existing.add_documents(make_docs(TEXTS[:3]))
+    existing.connections.close()
+    name = existing.collection_name
+
+    def fail(self, dimension):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(database, "EMBEDDING_AUTO_REINDEX", True)
+    monkeypatch.setattr(database, "VECTOR_MAINTENANCE_INTERVAL_HOURS", 0)
+    monkeypatch.setattr(database.DuckDBVectorStore, "reindex_dimensions", fail)
+    monkeypatch.setenv(f"{name.upper()}_EMBEDDING_DIMENSIONS", "256")
+
+    with caplog.at_level(logging.ERROR, logger="backend.database"):
+        store = database.get_duckdb_collection(name)
+        try:
+            deadline = time.monotonic() + 10
+            while "disk full" not in caplog.text and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            store.connections.close()
+
+    assert f"Re-indexing '{name}' to 256 dimensions failed: disk full" in caplog.text
+    assert os.path.exists(store.db_file)
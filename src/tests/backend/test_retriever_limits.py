@@ -0,0 +1,70 @@
+"""Score threshold and context token budget of the retriever."""
+
+from backend.database import _estimate_tokens
+from conftest import make_docs
+
+RESULTS = [
+    {"content": "best match " * 20, "metadata": {"source": "a"}, "similarity": 0.9},
+    {"content": "good match " * 20, "metadata": {"source": "b"}, "similarity": 0.7},
+    {"content": "weak match " * 20, "metadata": {"source": "c"}, "similarity": 0.3},
+]
+
+
+def _retriever(make_store, **search_kwargs):
+    return make_store().as_retriever({"search_type": "similarity", **search_kwargs})
+
+
+def test_without_limits_results_pass_through(make_store):
+    retriever = _retriever(make_store, score_threshold=None, max_context_tokens=0)
+
+    docs = retriever._to_documents(RESULTS)
+
+    assert [d.metadata for d in docs] == [r["metadata"] for r in RESULTS]
+
+
+def test_score_threshold_drops_dissimilar_results(make_store):
+    docs = _retriever(make_store, score_threshold=0.5)._to_documents(RESULTS)
+
+    assert [d.metadata["source"] for d in docs] == ["a", "b"]
+    assert [d.metadata["similarity"] for d in docs] == [0.9, 0.7]
+    assert all(d.metadata["dropped_chunks"] == 1 for d in docs)
+
+
+def test_token_budget_stops_before_overflowing(make_store):
+    first_two = sum(_estimate_tokens(r["content"]) for r in RESULTS[:2])
+    retriever = _retriever(
+        make_store, score_threshold=None, max_context_tokens=first_two
+    )
+
+    docs = retriever._to_documents(RESULTS)
+
+    assert [d.metadata["source"] for d in docs] == ["a", "b"]
+    assert docs[0].metadata["dropped_chunks"] == 1
+
+
+def test_best_result_is_kept_even_over_budget(make_store):
+    retriever = _retriever(make_store, score_threshold=None, max_context_tokens=1)
+
+    docs = retriever._to_documents(RESULTS)
+
+    assert [d.metadata["source"] for d in docs] == ["a"]
+    assert docs[0].metadata["dropped_chunks"] == 2
+
+
+def test_limits_apply_to_retrieved_documents(make_store):
+    store = make_store()
+    store.add_documents(
+        make_docs(["bus routes to campus", "campus bus timetable", "cafeteria menu"])
+    )
+    retriever = store.as_retriever(
+        {"k": 3, "search_type": "similarity", "score_threshold": 0.3}
+    )
+
+    docs = retriever.invoke("campus bus")
+
+    assert sorted(d.page_content for d in docs) == [
+        "bus routes to campus",
+        "campus bus timetable",
+    ]
+    assert all(d.metadata["similarity"] >= 0.3 for d in docs)
+    assert all(d.metadata["dropped_chunks"] == 1 for d in docs)
@@ -0,0 +1,113 @@
+"""Collections hash-partitioned across several DuckDB files."""
+
+import pytest
+
+from backend.sharded_store import shard_for
+from conftest import FakeEmbeddings, make_docs
+
+TEXTS = [f"document {i} about topic {i % 5}" for i in range(40)]
+
+
+@pytest.fixture
+def sharded(make_store):
+    store = make_store(num_shards=3)
+    store.add_documents(make_docs(TEXTS, keywords=[[f"t{i % 5}"] for i in range(40)]))
+    return store
+
+
+def test_shard_assignment_is_stable_and_spread():
+    shards = [shard_for(f"id{i}", 4) for i in range(400)]
+
+    assert shards == [shard_for(f"id{i}", 4) for i in range(400)]
+    assert all(shards.count(n) > 50 for n in range(4))
+
+
+def test_documents_are_partitioned_by_id(sharded):
+    counts = [len(shard.get(limit=100)) for shard in sharded.shards]
+
+    assert sum(counts) == 40
+    assert all(counts)
+    for shard_number, shard in enumerate(sharded.shards):
+        assert all(
+            shard_for(doc["id"], 3) == shard_number for doc in shard.get(limit=100)
+        )
+
+
+def test_queries_merge_to_the_single_file_ranking(sharded, make_store):
+    single = make_store()
+    single.add_documents(make_docs(TEXTS, keywords=[[f"t{i % 5}"] for i in range(40)]))
+
+    for kwargs in ({}, {"keyword_filter": ["t3"]}):
+        expected = single.query("topic 3 document", k=6, **kwargs)
+        results = sharded.query("topic 3 document", k=6, **kwargs)
+        # Equally similar documents may come back in either order
+        assert [r["similarity"] for r in results] == pytest.approx(
+            [r["similarity"] for r in expected]
+        )
+        assert [r["metadata"].get("keywords") for r in results] == [
+            r["metadata"].get("keywords") for r in expected
+        ]
+
+
+def test_shards_share_one_embedding_client_and_query_cache(sharded):
+    first = sharded.shards[0]
+
+    assert all(shard.embedding is first.embedding for shard in sharded.shards)
+    assert all(shard.query_cache is first.query_cache for shard in sharded.shards)
+    assert all(
+        shard.embedding_cache is first.embedding_cache for shard in sharded.shards
+    )
+
+
+def test_query_is_embedded_once_for_all_shards(sharded):
+    requests = FakeEmbeddings.requests
+
+    sharded.query("a question nobody asked before", k=3)
+
+    assert FakeEmbeddings.requests == requests + 1
+
+
+def test_shard_count_cannot_change(sharded, make_store):
+    with pytest.raises(ValueError, match="has 3 shards"):
+        make_store(collection_name=sharded.collection_name, num_shards=2)
+
+
+def test_single_file_collection_is_imported_without_embedding(make_store):
+    single = make_store()
+    single.add_documents(make_docs(TEXTS[:10]))
+    single.connections.close()
+    requests = FakeEmbeddings.requests
+
+    sharded = make_store(collection_name=single.collection_name, num_shards=2)
+
+    assert FakeEmbeddings.requests == requests
+    assert sum(len(shard.get(limit=100)) for shard in sharded.shards) == 10
+
+
+def test_delete_source_and_query_many_span_shards(sharded):
+    assert sharded.delete_source("doc0.txt") == 1
+    assert sharded.sources()["doc1.txt"] == 1
+
+    results = sharded.query_many(["topic 1", "topic 2"], k=2)
+
+    assert len({r["id"] for r in results}) == len(results) <= 4
+    assert all("document 0 " not in r["content"] for r in results)
+
+
+def test_keyword_filtered_query_many_ranks_by_match_count(make_store):
+    # Documents carrying both filter keywords outrank closer single matches
+    keywords = [["t1", "t2"] if i in (20, 33) else [f"t{i % 5}"] for i in range(40)]
+    single = make_store()
+    single.add_documents(make_docs(TEXTS, keywords=keywords))
+    sharded = make_store(collection_name="sharded_kw", num_shards=3)
+    sharded.add_documents(make_docs(TEXTS, keywords=keywords))
+    queries = ["topic 1 document", "topic 2 document"]
+
+    expected = single.query_many(queries, k=2, keyword_filter=["t1", "t2"])
+    results = sharded.query_many(queries, k=2, keyword_filter=["t1", "t2"])
+
+    assert sorted(r["content"] for r in expected) == [
+        "document 20 about topic 0",
+        "document 33 about topic 3",
+    ]
+    assert [r["content"] for r in results] == [r["content"] for r in expected]
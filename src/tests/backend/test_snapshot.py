@@ -0,0 +1,173 @@
+"""Parquet snapshots of vector collections."""
+
+import json
+import os
+import threading
+
+import pytest
+
+from backend.snapshot import (
+    MANIFEST_FILE,
+    export_snapshot,
+    import_snapshot,
+    restore_snapshot_if_empty,
+    verify_snapshot,
+)
+from conftest import FakeEmbeddings, make_docs, run_in_thread
+
+TEXTS = ["tuition fees payment", "library opening hours", "campus shuttle map"]
+KEYWORDS = [["fees"], ["library"], ["map"]]
+
+
+def _rows(store):
+    return sorted((d["id"], d["content"]) for d in store.get(limit=100))
+
+
+def _reopen_empty(make_store, store, **options):
+    """Delete a collection's files and open an empty one under the same name."""
+    for part in getattr(store, "shards", [store]):
+        part.connections.close()
+        os.remove(part.db_file)
+    return make_store(collection_name=store.collection_name, **options)
+
+
+def _rewrite_manifest(directory, change):
+    path = os.path.join(directory, MANIFEST_FILE)
+    with open(path) as f:
+        manifest = json.load(f)
+    change(manifest)
+    with open(path, "w") as f:
+        json.dump(manifest, f)
+
+
+@pytest.mark.parametrize("shards", [None, 2])
+def test_round_trip_restores_rows_without_embedding(make_store, tmp_path, shards):
+    options = {"num_shards": shards} if shards else {}
+    source = make_store(**options)
+    source.add_documents(make_docs(TEXTS, keywords=KEYWORDS))
+    manifest = export_snapshot(source, str(tmp_path))
+    rows = _rows(source)
+    fingerprint = source.content_fingerprint()
+    target = _reopen_empty(make_store, source, **options)
+    assert _rows(target) == []
+    requests = FakeEmbeddings.requests
+
+    assert import_snapshot(target, str(tmp_path)) == 3
+    assert FakeEmbeddings.requests == requests
+
+    assert manifest["rows"] == 3
+    assert _rows(target) == rows
+    assert target.query("opening", k=1, keyword_filter=["library"])[0]["content"] == (
+        "library opening hours"
+    )
+    assert target.content_fingerprint() == fingerprint
+
+
+def test_corrupted_files_fail_the_checksum(make_store, tmp_path):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS))
+    manifest = export_snapshot(store, str(tmp_path))
+    with open(tmp_path / manifest["parts"][0]["table_file"], "ab") as f:
+        f.write(b"garbage")
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        verify_snapshot(str(tmp_path))
+
+
+def test_fingerprint_mismatch_rolls_the_import_back(make_store, tmp_path):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS))
+    export_snapshot(store, str(tmp_path))
+    _rewrite_manifest(
+        str(tmp_path), lambda m: m["parts"][0].update(fingerprint="12345")
+    )
+    store.delete_source("doc0.txt")
+    store.add_documents(make_docs(["existing row"], source="other.txt"))
+    rows = _rows(store)
+
+    with pytest.raises(ValueError):
+        import_snapshot(store, str(tmp_path))
+
+    assert _rows(store) == rows
+
+
+def test_layout_and_model_must_match(make_store, tmp_path):
+    source = make_store()
+    source.add_documents(make_docs(TEXTS))
+    export_snapshot(source, str(tmp_path))
+
+    with pytest.raises(ValueError, match="does not match the layout"):
+        import_snapshot(make_store(num_shards=2), str(tmp_path))
+    other_model = _reopen_empty(
+        make_store, source, embedding_model="text-embedding-3-large"
+    )
+    with pytest.raises(ValueError, match="uses text-embedding-3-small"):
+        import_snapshot(other_model, str(tmp_path))
+    assert _rows(other_model) == []
+
+
+def test_only_empty_collections_are_restored(make_store, tmp_path):
+    source = make_store()
+    source.add_documents(make_docs(TEXTS))
+    export_snapshot(source, str(tmp_path / source.collection_name))
+
+    empty = _reopen_empty(make_store, source)
+    assert restore_snapshot_if_empty(empty, str(tmp_path))
+    assert len(_rows(empty)) == 3
+    assert not restore_snapshot_if_empty(empty, str(tmp_path))
+    assert not restore_snapshot_if_empty(empty, "")
+
+
+def test_export_leaves_no_read_transaction_open(make_store, tmp_path):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS))
+
+    def export_then_checkpoint():
+        export_snapshot(store, str(tmp_path))
+        with store.connections.write() as writer:
+            writer.execute("CHECKPOINT")
+        return True
+
+    assert run_in_thread(export_then_checkpoint)
+
+
+@pytest.mark.parametrize("backend", ["duckdb", "memory"])
+def test_queries_during_repeated_imports_never_fail(make_store, tmp_path, backend):
+    store = make_store(index_backend=backend)
+    snapshots = []
+    other = ["exam timetable", "parking permit", "dorm rules"]
+    for name, texts in (("a", TEXTS), ("b", other)):
+        for i in range(3):
+            store.delete_source(f"doc{i}.txt")
+        store.add_documents(make_docs(texts, keywords=KEYWORDS))
+        export_snapshot(store, str(tmp_path / name))
+        snapshots.append((str(tmp_path / name), set(texts)))
+    stop, errors, answered = threading.Event(), [], []
+
+    def query_loop(i):
+        while not stop.is_set():
+            try:
+                results = store.query(f"library hours {i % 3}", k=3)
+                store.query_many(["campus map", "fees"], k=2, keyword_filter=["map"])
+            except Exception as e:
+                errors.append(e)
+                return
+            answered.append({d["content"] for d in results})
+
+    threads = [
+        threading.Thread(target=query_loop, args=(i,), daemon=True) for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for n in range(10):
+            assert import_snapshot(store, snapshots[n % 2][0]) == 3
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(10)
+
+    assert errors == []
+    assert answered and all(
+        contents in [texts for _, texts in snapshots] for contents in answered
+    )
@@ -0,0 +1,67 @@
+"""Source registry: stable ids and deleting the documents of a source."""
+
+import pytest
+
+from backend.database import stable_document_id
+from conftest import make_docs
+
+
+def _contents(store):
+    return sorted(doc["content"] for doc in store.get(limit=100))
+
+
+def test_stable_ids_depend_on_source_and_content():
+    assert stable_document_id("text", "a.pdf") == stable_document_id("text", "a.pdf")
+    assert stable_document_id("text", "a.pdf") != stable_document_id("text", "b.pdf")
+    assert stable_document_id("text") == stable_document_id("text", None)
+    assert len(stable_document_id("text")) == 32
+
+
+@pytest.mark.parametrize("shards", [None, 2])
+def test_reingesting_a_source_overwrites_its_rows(make_store, shards):
+    store = make_store(**({"num_shards": shards} if shards else {}))
+    store.add_documents(make_docs(["one", "two"], source="a.pdf"))
+    store.add_documents(make_docs(["one", "two"], source="a.pdf"))
+    store.add_documents(make_docs(["three"], source="b.pdf"))
+
+    assert _contents(store) == ["one", "three", "two"]
+    assert store.sources() == {"a.pdf": 2, "b.pdf": 1}
+
+
+@pytest.mark.parametrize("shards", [None, 2])
+def test_delete_source_keeps_the_listed_ids(make_store, shards):
+    store = make_store(**({"num_shards": shards} if shards else {}))
+    store.add_documents(make_docs(["intro", "old section", "outro"], source="a.pdf"))
+    store.add_documents(make_docs(["unrelated"], source="b.pdf"))
+    kept = [stable_document_id(text, "a.pdf") for text in ("intro", "outro")]
+
+    assert store.delete_source("a.pdf", keep_ids=kept) == 1
+
+    assert _contents(store) == ["intro", "outro", "unrelated"]
+    assert store.sources() == {"a.pdf": 2, "b.pdf": 1}
+    assert "old section" not in [r["content"] for r in store.query("old section")]
+    assert store.delete_source("a.pdf") == 2
+    assert store.sources() == {"b.pdf": 1}
+
+
+def test_documents_shared_with_another_source_are_kept(make_store):
+    store = make_store()
+    store.add_documents(make_docs(["shared appendix", "only in a"], source="a.pdf"))
+    shared = stable_document_id("shared appendix", "a.pdf")
+    with store.connections.write():
+        store.conn.execute(
+            f"INSERT INTO {store.source_table} VALUES ('b.pdf', ?)", [shared]
+        )
+
+    assert store.delete_source("a.pdf") == 1
+
+    assert _contents(store) == ["shared appendix"]
+    assert store.sources() == {"b.pdf": 1}
+
+
+def test_deleting_an_unknown_source_is_a_no_op(make_store):
+    store = make_store()
+    assert store.delete_source("a.pdf") == 0
+    assert store.sources() == {}
+    store.add_documents(make_docs(["text"], source="a.pdf"))
+    assert store.delete_source("missing.pdf") == 0
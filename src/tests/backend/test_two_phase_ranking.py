@@ -0,0 +1,43 @@
+"""Ranking on id and embedding, then fetching rows for the top-k only."""
+
+from conftest import make_docs
+
+TEXTS = ["tuition fees payment", "library opening hours", "campus map"]
+
+
+def test_fetch_hits_keeps_rank_order_and_skips_unknown_ids(make_store):
+    store = make_store()
+    store.add_documents(
+        [{"id": t[:3], "content": t, "metadata": {"n": i}} for i, t in enumerate(TEXTS)]
+    )
+
+    hits = store._fetch_hits([("cam", 0.9), ("gone", 0.8), ("tui", 0.5)])
+
+    assert [(h["id"], h["similarity"]) for h in hits] == [("cam", 0.9), ("tui", 0.5)]
+    assert hits[0]["content"] == "campus map"
+    assert hits[0]["metadata"] == {"n": 2}
+
+
+def test_ranking_can_be_restricted_to_candidates(make_store):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS))
+    ids = {doc["content"]: doc["id"] for doc in store.get(limit=10)}
+    query = store._embed_query("library hours")
+
+    results = store._rank_in_duckdb(
+        query, 2, candidate_ids=[ids["campus map"], ids["tuition fees payment"]]
+    )
+
+    assert {r["content"] for r in results} == {"campus map", "tuition fees payment"}
+
+
+def test_top_k_is_fetched_in_similarity_order(make_store):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS))
+
+    results = store._rank_in_duckdb(store._embed_query("library opening hours"), 3)
+
+    assert results[0]["content"] == "library opening hours"
+    assert [r["similarity"] for r in results] == sorted(
+        (r["similarity"] for r in results), reverse=True
+    )
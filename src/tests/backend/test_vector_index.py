@@ -0,0 +1,99 @@
+"""In-process exact vector index and its use by DuckDBVectorStore."""
+
+import numpy as np
+
+from backend.vector_index import InMemoryVectorIndex, create_vector_index
+from conftest import make_docs
+
+
+def _unit(*components):
+    vector = np.zeros(4, dtype=np.float32)
+    vector[: len(components)] = components
+    return vector
+
+
+def test_search_returns_exact_cosine_similarities():
+    index = InMemoryVectorIndex(4, initial_capacity=2)
+    index.add(["x", "y", "z"], np.stack([_unit(1), _unit(0, 1), _unit(1, 1)]))
+
+    hits = index.search(_unit(1), k=2)
+
+    assert [doc_id for doc_id, _ in hits] == ["x", "z"]
+    assert hits[0][1] == np.float32(1.0)
+    assert abs(hits[1][1] - np.sqrt(0.5)) < 1e-6
+    assert len(index) == 3
+
+
+def test_add_replaces_and_remove_masks_rows():
+    index = InMemoryVectorIndex(4)
+    index.add(["x", "y"], np.stack([_unit(1), _unit(0, 1)]))
+    index.add(["x"], np.stack([_unit(0, 0, 1)]))
+    index.remove(["y"])
+
+    assert index.search(_unit(0, 1), k=5) == [("x", 0.0)]
+
+
+def test_removed_rows_are_reused_by_later_inserts():
+    index = InMemoryVectorIndex(4, initial_capacity=2)
+    index.add(["x", "y"], np.stack([_unit(1), _unit(0, 1)]), [["fees"], ["loans"]])
+    for i in range(10):
+        index.remove(["y"] if i == 0 else [f"new{i - 1}"])
+        index.add([f"new{i}"], np.stack([_unit(0, 0, 1)]))
+
+    assert len(index) == 2
+    assert len(index._ids) == index._alive.shape[0] == 2
+    assert index.search(_unit(0, 0, 1), k=5)[0] == ("new9", 1.0)
+    assert index.search(_unit(0, 1), k=5, keyword_filter=["loans"]) == []
+
+
+def test_keyword_filter_ranks_more_matches_first():
+    index = InMemoryVectorIndex(4)
+    index.add(
+        ["one", "two", "none"],
+        np.stack([_unit(1), _unit(0, 1), _unit(1)]),
+        [["fees"], ["fees", "loans"], []],
+    )
+
+    hits = index.search(_unit(1), k=5, keyword_filter=["fees", "loans"])
+
+    assert [doc_id for doc_id, _ in hits] == ["two", "one"]
+
+
+def test_search_many_matches_single_searches():
+    index = InMemoryVectorIndex(4)
+    index.add(["x", "y", "z"], np.stack([_unit(1), _unit(0, 1), _unit(1, 1)]))
+    queries = np.stack([_unit(1), _unit(0, 1)])
+
+    assert index.search_many(queries, 2) == [index.search(q, 2) for q in queries]
+
+
+def test_duckdb_backend_has_no_index():
+    assert create_vector_index("duckdb", 4) is None
+
+
+def test_memory_backend_store_matches_duckdb_ranking(make_store):
+    docs = make_docs(["tuition fees payment", "library opening hours", "campus map"])
+    scanned = make_store()
+    indexed = make_store(index_backend="memory")
+    scanned.add_documents(docs)
+    indexed.add_documents(docs)
+
+    expected = scanned.query("library hours", k=3)
+    results = indexed.query("library hours", k=3)
+
+    assert [r["id"] for r in results] == [r["id"] for r in expected]
+    assert np.allclose(
+        [r["similarity"] for r in results], [r["similarity"] for r in expected]
+    )
+    assert indexed.index_stats()["rows"] == 3
+
+
+def test_memory_index_is_loaded_from_an_existing_collection(make_store):
+    store = make_store()
+    store.add_documents(make_docs(["tuition fees", "library hours"]))
+    store.connections.close()
+
+    reopened = make_store(collection_name=store.collection_name, index_backend="memory")
+
+    assert len(reopened.index) == 2
+    assert reopened.query("library", k=1)[0]["content"] == "library hours"
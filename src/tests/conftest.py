@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the backend and LLM tests.
+
+Paths under ``get_chatbot_dir()`` are computed when ``backend.config`` is
+imported, and inside Docker they ignore ``HOME``, so the function is pointed
+at a temporary directory before anything else from the app is imported.
+Embeddings come from :class:`FakeEmbeddings`, a deterministic bag-of-words
+model, so no test talks to the OpenAI API.
+"""
+
+import atexit
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="nypai-tests-")
+atexit.register(shutil.rmtree, os.environ["HOME"], ignore_errors=True)
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import infra_utils
+
+CHATBOT_DIR = os.path.join(os.environ["HOME"], ".nypai-chatbot")
+infra_utils.get_chatbot_dir = lambda: CHATBOT_DIR
+
+import numpy as np
+import pytest
+
+from backend import database
+from backend.config import EMBEDDING_MODEL_DIMENSIONS
+
+# Width used by FakeEmbeddings for models without a known width
+FAKE_MODEL_WIDTH = 64
+
+
+def fake_vector(text: str, width: int) -> list:
+    """Embed ``text`` as a bag of hashed words, so shared words mean similarity."""
+    vector = np.zeros(width, dtype=np.float32)
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        slot = int(hashlib.sha256(word.encode()).hexdigest()[:8], 16) % width
+        vector[slot] += 1.0
+    if not vector.any():
+        vector[0] = 1.0
+    return vector.tolist()
+
+
+class FakeEmbeddings:
+    """Stand-in for ``OpenAIEmbeddings`` that counts the requests it serves.
+
+    Reduced ``dimensions`` return the leading components of the full
+    vector, like the OpenAI models that support them.
+    """
+
+    requests = 0
+    texts = 0
+
+    def __init__(self, model: str = "", dimensions: int = None, **kwargs):
+        self.model = model
+        self.dimensions = dimensions
+        self.width = EMBEDDING_MODEL_DIMENSIONS.get(model, FAKE_MODEL_WIDTH)
+
+    def _embed(self, texts):
+        FakeEmbeddings.requests += 1
+        FakeEmbeddings.texts += len(texts)
+        return [
+            fake_vector(text, self.width)[: self.dimensions or self.width]
+            for text in texts
+        ]
+
+    def embed_query(self, text):
+        return self._embed([text])[0]
+
+    def embed_documents(self, texts, chunk_size=None):
+        return self._embed(list(texts))
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts, chunk_size=None):
+        return self.embed_documents(texts)
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch):
+    """Replace the OpenAI embedding client and reset its counters."""
+    monkeypatch.setattr(database, "OpenAIEmbeddings", FakeEmbeddings)
+    FakeEmbeddings.requests = 0
+    FakeEmbeddings.texts = 0
+    return FakeEmbeddings
+
+
+@pytest.fixture
+def make_store():
+    """Open uniquely named collections and close their connections afterwards.
+
+    Passing ``num_shards`` opens a ``ShardedDuckDBVectorStore``.
+    """
+    stores = []
+
+    def make(embedding_model: str = "text-embedding-3-small", **options):
+        name = options.pop("collection_name", None) or f"test_{uuid.uuid4().hex[:12]}"
+        store_class = database.DuckDBVectorStore
+        if "num_shards" in options:
+            from backend.sharded_store import ShardedDuckDBVectorStore
+
+            store_class = ShardedDuckDBVectorStore
+        store = store_class(
+            db_path="",
+            collection_name=name,
+            embedding_model=embedding_model,
+            **options,
+        )
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        for part in getattr(store, "shards", [store]):
+            try:
+                part.connections.close()
+            except Exception:
+                pass
+
+
+def make_docs(texts, source=None, keywords=None):
+    """Build document dictionaries for ``add_documents``."""
+    docs = []
+    for i, text in enumerate(texts):
+        metadata = {"source": source or f"doc{i}.txt"}
+        if keywords is not None:
+            metadata["keywords"] = keywords[i]
+        docs.append({"content": text, "metadata": metadata})
+    return docs
+
+
+def run_in_thread(target, timeout=10):
+    """Run ``target`` on a new thread, failing instead of hanging the suite.
+
+    DuckDB spins forever in some lock-ups, e.g. ``CHECKPOINT`` while a read
+    transaction is open, so such tests run their steps through this.
+    """
+    result = {}
+
+    def run():
+        try:
+            result["value"] = target()
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"timed out after {timeout}s"
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
@@ -0,0 +1,112 @@
+"""Semantic cache of chat answers."""
+
+import itertools
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from llm import answer_cache
+from llm.answer_cache import AnswerCache
+
+
+def _unit(angle):
+    """Two-dimensional unit vector; cosine similarity is cos(angle difference)."""
+    return [float(np.cos(angle)), float(np.sin(angle))]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Make ``last_used`` strictly increase by one second per write."""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(
+        answer_cache,
+        "time",
+        SimpleNamespace(
+            time=lambda: float(next(ticks)), perf_counter=time.perf_counter
+        ),
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.duckdb"), threshold=0.9)
+    yield cache
+    cache.close()
+
+
+def _put(cache, question, angle, fingerprint="v1"):
+    cache.put(fingerprint, question, _unit(angle), f"answer to {question}", "ctx", 2.0)
+
+
+def test_similar_questions_hit_at_the_threshold(cache):
+    _put(cache, "when are exams", 0.0)
+
+    hit = cache.lookup("v1", _unit(np.arccos(0.91)), spent=0.5)
+
+    assert hit["answer"] == "answer to when are exams"
+    assert hit["question"] == "when are exams"
+    assert hit["context"] == "ctx"
+    assert hit["similarity"] == pytest.approx(0.91, abs=1e-6)
+    assert 0.0 < hit["seconds_saved"] <= 1.5
+    assert cache.stats()["hits"] == 1
+
+
+def test_dissimilar_questions_miss(cache):
+    _put(cache, "when are exams", 0.0)
+
+    assert cache.lookup("v1", _unit(np.arccos(0.89))) is None
+    assert cache.lookup("v1", [1.0, 0.0, 0.0]) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 2)
+
+
+def test_fingerprint_change_invalidates_every_answer(cache):
+    _put(cache, "when are exams", 0.0)
+    _put(cache, "where is the library", 1.0)
+
+    assert cache.lookup("v2", _unit(0.0)) is None
+
+    stats = cache.stats()
+    assert stats["invalidations"] == 2
+    assert stats["entries"] == 0
+    assert cache.lookup("v1", _unit(0.0)) is None
+
+
+def test_answers_survive_reopening(cache, tmp_path):
+    _put(cache, "when are exams", 0.0)
+    cache.close()
+
+    reopened = AnswerCache(cache.path, threshold=0.9)
+    try:
+        assert reopened.lookup("v1", _unit(0.0))["answer"] == (
+            "answer to when are exams"
+        )
+    finally:
+        reopened.close()
+
+
+def test_evict_keeps_the_most_recently_used(tmp_path, clock):
+    cache = AnswerCache(
+        str(tmp_path / "answers.duckdb"), threshold=0.999, max_entries=10
+    )
+    try:
+        angles = {f"q{i}": i * 0.1 for i in range(11)}
+        for question in list(angles)[:10]:
+            _put(cache, question, angles[question])
+        # Using the oldest answer makes q1 and q2 the least recently used
+        assert cache.lookup("v1", _unit(angles["q0"]))["question"] == "q0"
+
+        _put(cache, "q10", angles["q10"])
+
+        kept = {
+            question
+            for question, angle in angles.items()
+            if cache.lookup("v1", _unit(angle)) is not None
+        }
+        # 90% of the budget is kept
+        assert kept == {"q0"} | {f"q{i}" for i in range(3, 11)}
+        assert cache.stats()["entries"] == 9
+    finally:
+        cache.close()
@@ -0,0 +1,174 @@
+"""Token streaming through the LangGraph chat workflow."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import make_docs
+from llm import chatModel
+from llm.checkpoint_pool import get_app_pool
+
+
+class FakeChatModel:
+    """Streams a canned answer word by word and records the prompts it gets."""
+
+    model_name = "fake-chat"
+
+    def __init__(self, answer="Exams start on Monday.", fail_after=None):
+        self.answer = answer
+        self.fail_after = fail_after
+        self.prompts = []
+
+    async def astream(self, messages):
+        self.prompts.append(messages)
+        for i, word in enumerate(self.answer.split(" ")):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield SimpleNamespace(content=word if i == 0 else f" {word}")
+
+
+@pytest.fixture
+def chat_app(make_store, monkeypatch, tmp_path):
+    store = make_store()
+    store.add_documents(make_docs(["exams start on monday in hall a"]))
+
+    async def amatch_keywords(question):
+        return []
+
+    monkeypatch.setattr(chatModel, "db", store)
+    monkeypatch.setattr(chatModel, "llm", FakeChatModel())
+    monkeypatch.setattr(chatModel, "amatch_keywords", amatch_keywords)
+    monkeypatch.setattr(chatModel, "get_answer_cache", lambda: None)
+    monkeypatch.setattr(
+        chatModel, "LANGCHAIN_CHECKPOINT_PATH", str(tmp_path / "checkpoints.db")
+    )
+    monkeypatch.setattr(chatModel, "app", None)
+    asyncio.run(chatModel._initialize_langgraph_workflow())
+    return chatModel
+
+
+def _turns(*turns):
+    """Run (question, thread_id) turns on one loop and collect their events."""
+
+    async def main():
+        events = []
+        for question, thread_id in turns:
+            events.append(
+                [
+                    event
+                    async for event in chatModel.astream_convo_hist_answer(
+                        question, thread_id
+                    )
+                ]
+            )
+        await get_app_pool(
+            chatModel.LANGCHAIN_CHECKPOINT_PATH, chatModel._compile_with_checkpointer
+        ).close()
+        return events
+
+    return asyncio.run(main())
+
+
+def test_tokens_stream_before_the_final_answer(chat_app):
+    (events,) = _turns(("when do exams start", "thread-1"))
+
+    tokens = [event["token"] for event in events[:-1]]
+    final = events[-1]
+    assert tokens == ["Exams", " start", " on", " Monday."]
+    assert final["answer"] == "".join(tokens)
+    assert "hall a" in final["context"]
+    assert {"retrieval", "first_token", "model"} <= set(final["timings"])
+
+
+def test_threads_carry_their_history_between_turns(chat_app):
+    _turns(("when do exams start", "thread-1"), ("and where", "thread-1"))
+
+    follow_up = [message.content for message in chat_app.llm.prompts[1]]
+    assert "when do exams start" in follow_up
+    assert "Exams start on Monday." in follow_up
+    assert follow_up[-1] == "and where"
+
+
+def test_model_failure_ends_the_stream_with_an_error_answer(chat_app, monkeypatch):
+    monkeypatch.setattr(chatModel, "llm", FakeChatModel(fail_after=2))
+
+    (events,) = _turns(("when do exams start", "thread-1"))
+
+    assert [event["token"] for event in events[:-1]] == ["Exams", " start"]
+    assert events[-1]["answer"].startswith("Sorry, I encountered an error")
+
+
+def test_unavailable_checkpoints_answer_without_history(
+    chat_app, monkeypatch, tmp_path
+):
+    # A directory cannot be opened as the SQLite checkpoint database
+    monkeypatch.setattr(chatModel, "LANGCHAIN_CHECKPOINT_PATH", str(tmp_path))
+
+    (events,) = _turns(("when do exams start", "thread-1"))
+
+    assert events[-1]["answer"] == "Exams start on Monday."
+
+
+def test_uninitialised_app_yields_one_error_event(monkeypatch):
+    monkeypatch.setattr(chatModel, "app", None)
+
+    (events,) = _turns(("when do exams start", "thread-1"))
+
+    assert len(events) == 1
+    assert "not fully set up" in events[0]["answer"]
+
+
+def test_get_convo_hist_answer_collects_the_stream(chat_app):
+    async def main():
+        try:
+            return await chatModel.get_convo_hist_answer("exams", "thread-2")
+        finally:
+            await get_app_pool(
+                chatModel.LANGCHAIN_CHECKPOINT_PATH,
+                chatModel._compile_with_checkpointer,
+            ).close()
+
+    result = asyncio.run(main())
+
+    assert "Exams start on Monday." in result["answer"]
+    assert "hall a" in result["context"]
+
+
+def test_answer_is_cached_after_the_turn_completes(chat_app, monkeypatch):
+    release, stored = threading.Event(), []
+
+    class SlowAnswerCache:
+        def lookup(self, fingerprint, embedding, spent):
+            return None
+
+        def put(self, fingerprint, question, embedding, answer, context, seconds):
+            release.wait(5)
+            stored.append(answer)
+
+    monkeypatch.setattr(chatModel, "get_answer_cache", SlowAnswerCache)
+
+    async def main():
+        events = [
+            event
+            async for event in chatModel.astream_convo_hist_answer(
+                "when do exams start", "thread-1"
+            )
+        ]
+        # The turn finished while the cache write is still blocked
+        pending = list(chatModel._cache_tasks)
+        before = list(stored)
+        release.set()
+        await asyncio.gather(*pending)
+        await get_app_pool(
+            chatModel.LANGCHAIN_CHECKPOINT_PATH, chatModel._compile_with_checkpointer
+        ).close()
+        return events, pending, before
+
+    events, pending, before = asyncio.run(main())
+
+    assert events[-1]["answer"] == "Exams start on Monday."
+    assert len(pending) == 1 and before == []
+    assert stored == ["Exams start on Monday."]
+    assert not chatModel._cache_tasks
@@ -0,0 +1,185 @@
+"""Pooled SQLite checkpoint connections and their recovery."""
+
+import asyncio
+from typing import TypedDict
+
+import pytest
+from langgraph.graph import START, StateGraph
+
+from llm.checkpoint_pool import CheckpointAppPool, get_app_pool, pool_stats
+
+
+def _compile(saver):
+    # The "app" is the saver itself, so tests can reach its connection
+    return saver
+
+
+def _run(test, tmp_path, compile_app=_compile):
+    async def main():
+        pool = CheckpointAppPool(str(tmp_path / "checkpoints.db"), compile_app)
+        try:
+            return await test(pool)
+        finally:
+            await pool.close()
+
+    return asyncio.run(main())
+
+
+def test_sequential_turns_reuse_one_connection(tmp_path):
+    async def test(pool):
+        async with pool.acquire() as first:
+            pass
+        async with pool.acquire() as second:
+            pass
+        return first is second, pool.stats
+
+    reused, stats = _run(test, tmp_path)
+
+    assert reused
+    assert stats == {"opened": 1, "recovered": 0}
+
+
+class _Turn(TypedDict):
+    question: str
+    answer: str
+
+
+def test_concurrent_turns_stream_through_one_app(tmp_path):
+    turns, streaming = 8, []
+    everyone_streaming = asyncio.Event()
+
+    async def model(state):
+        # Returns only once every turn is streaming at the same time
+        streaming.append(state["question"])
+        if len(streaming) == turns:
+            everyone_streaming.set()
+        await asyncio.wait_for(everyone_streaming.wait(), 5)
+        return {"answer": state["question"].upper()}
+
+    def compile_app(saver):
+        workflow = StateGraph(state_schema=_Turn)
+        workflow.add_node("model", model)
+        workflow.add_edge(START, "model")
+        return workflow.compile(checkpointer=saver)
+
+    async def test(pool):
+        async def turn(i):
+            config = {"configurable": {"thread_id": f"t{i}"}}
+            async with pool.acquire() as app:
+                async for state in app.astream(
+                    {"question": f"q{i}", "answer": ""}, config, stream_mode="values"
+                ):
+                    pass
+                saved = await app.aget_state(config)
+            return state["answer"], saved.values["answer"]
+
+        answers = await asyncio.gather(*(turn(i) for i in range(turns)))
+        return answers, pool.stats
+
+    answers, stats = _run(test, tmp_path, compile_app)
+
+    assert answers == [(f"Q{i}", f"Q{i}") for i in range(turns)]
+    assert stats == {"opened": 1, "recovered": 0}
+
+
+def test_failed_turn_keeps_a_healthy_connection(tmp_path):
+    async def test(pool):
+        with pytest.raises(RuntimeError):
+            async with pool.acquire() as failed:
+                raise RuntimeError("graph failed")
+        async with pool.acquire() as app:
+            assert app is failed
+        return pool.stats
+
+    assert _run(test, tmp_path) == {"opened": 1, "recovered": 0}
+
+
+def test_stale_connection_is_reopened_on_checkout(tmp_path):
+    async def test(pool):
+        async with pool.acquire() as stale:
+            await stale.conn.close()
+        async with pool.acquire() as app:
+            assert app is not stale
+            await app.conn.execute("SELECT 1")
+        return pool.stats
+
+    assert _run(test, tmp_path) == {"opened": 2, "recovered": 1}
+
+
+def test_replaced_connection_closes_after_its_last_turn(tmp_path):
+    async def test(pool):
+        async with pool.acquire() as old:
+            # As if the ping failed while this turn still uses the connection
+            pool._healthy = lambda entry: asyncio.sleep(0, result=False)
+            async with pool.acquire() as new:
+                assert new is not old
+            await old.conn.execute("SELECT 1")
+        with pytest.raises(ValueError):
+            await old.conn.execute("SELECT 1")
+        await new.conn.execute("SELECT 1")
+        return pool.stats
+
+    assert _run(test, tmp_path) == {"opened": 2, "recovered": 1}
+
+
+def test_closed_pool_refuses_turns(tmp_path):
+    async def test(pool):
+        await pool.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            async with pool.acquire():
+                pass
+
+    _run(test, tmp_path)
+
+
+def test_each_event_loop_gets_its_own_pool(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+
+    async def main():
+        pool = get_app_pool(path, _compile)
+        try:
+            assert get_app_pool(path, _compile) is pool
+            async with pool.acquire():
+                pass
+            return pool, pool_stats()
+        finally:
+            await pool.close()
+
+    first, stats = asyncio.run(main())
+    second, _ = asyncio.run(main())
+
+    assert first is not second
+    assert stats["opened"] >= 1
+
+
+def test_pool_left_open_is_closed_when_its_loop_shuts_down(tmp_path):
+    opened = []
+
+    def compile_app(saver):
+        opened.append(saver.conn)
+        return saver
+
+    async def main():
+        pool = CheckpointAppPool(str(tmp_path / "checkpoints.db"), compile_app)
+        async with pool.acquire():
+            pass
+
+        async def turn():
+            async with pool.acquire():
+                await asyncio.sleep(60)
+
+        # The connection is still used by a turn asyncio.run cancels
+        asyncio.get_running_loop().create_task(turn())
+        await asyncio.sleep(0.1)
+        return pool
+
+    async def ping(conn):
+        await conn.execute("SELECT 1")
+
+    pool = asyncio.run(main())
+
+    assert pool.closed
+    assert len(opened) == 1
+    for conn in opened:
+        with pytest.raises(ValueError):
+            asyncio.run(ping(conn))
@@ -0,0 +1,124 @@
+"""Async keyword matching with the shared AsyncOpenAI client."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from llm import chatModel
+
+
+def _tool_response(arguments):
+    call = SimpleNamespace(
+        type="function",
+        function=SimpleNamespace(name="match_keywords", arguments=arguments),
+    )
+    message = SimpleNamespace(tool_calls=[call])
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeAsyncOpenAI:
+    """Answers ``chat.completions.create`` with a canned response or error."""
+
+    def __init__(self, outcome):
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.outcome = outcome
+
+    async def _create(self, **request):
+        self.requests.append(request)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture
+def keyword_cache(monkeypatch):
+    """Replace the shelve-backed keyword cache with a dictionary."""
+    cache = {}
+
+    async def aget_cached_response(question):
+        return cache.get(question)
+
+    async def aset_cached_response(question, response):
+        cache[question] = response
+
+    monkeypatch.setattr(chatModel, "aget_cached_response", aget_cached_response)
+    monkeypatch.setattr(chatModel, "aset_cached_response", aset_cached_response)
+    return cache
+
+
+def _use_client(monkeypatch, outcome):
+    client = FakeAsyncOpenAI(outcome)
+    monkeypatch.setattr(chatModel, "_get_async_client", lambda: client)
+    return client
+
+
+def test_matches_are_parsed_and_cached(keyword_cache, monkeypatch):
+    arguments = json.dumps({"prediction": ["exams", "no_keywords_matched"]})
+    client = _use_client(monkeypatch, _tool_response(arguments))
+
+    assert asyncio.run(chatModel.amatch_keywords("when are exams")) == ["exams"]
+    assert asyncio.run(chatModel.amatch_keywords("when are exams")) == ["exams"]
+
+    assert len(client.requests) == 1
+    assert client.requests[0]["timeout"] == chatModel.KEYWORD_MATCH_TIMEOUT
+    assert "when are exams" in client.requests[0]["messages"][0]["content"]
+    assert json.loads(keyword_cache["when are exams"]) == ["exams"]
+
+
+def test_malformed_cache_entries_are_refetched(keyword_cache, monkeypatch):
+    keyword_cache["library hours"] = "not json"
+    arguments = json.dumps({"prediction": ["library"]})
+    client = _use_client(monkeypatch, _tool_response(arguments))
+
+    assert asyncio.run(chatModel.amatch_keywords("library hours")) == ["library"]
+    assert len(client.requests) == 1
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        openai.APITimeoutError(request=httpx.Request("POST", "https://api")),
+        openai.APIConnectionError(request=httpx.Request("POST", "https://api")),
+        ValueError("unexpected"),
+    ],
+)
+def test_failed_requests_match_nothing_and_are_not_cached(
+    keyword_cache, monkeypatch, error
+):
+    _use_client(monkeypatch, error)
+
+    assert asyncio.run(chatModel.amatch_keywords("parking")) == []
+    assert keyword_cache == {}
+
+
+def test_unparseable_tool_arguments_match_nothing(keyword_cache, monkeypatch):
+    _use_client(monkeypatch, _tool_response("{not json"))
+
+    assert asyncio.run(chatModel.amatch_keywords("fees")) == []
+
+
+def test_no_question_or_no_client_matches_nothing(keyword_cache, monkeypatch):
+    monkeypatch.setattr(chatModel, "_get_async_client", lambda: None)
+
+    assert asyncio.run(chatModel.amatch_keywords("")) == []
+    assert asyncio.run(chatModel.amatch_keywords("fees")) == []
+
+
+def test_each_event_loop_gets_one_client(monkeypatch):
+    monkeypatch.setattr(chatModel, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(chatModel, "async_clients", {})
+
+    async def clients():
+        return chatModel._get_async_client(), chatModel._get_async_client()
+
+    first, again = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+
+    assert first is again
+    assert first is not second
+    assert len(chatModel.async_clients) == 1
@@ -0,0 +1,189 @@
+"""The chat workflow's concurrent retrieval node."""
+
+import asyncio
+
+import pytest
+
+from conftest import make_docs
+from llm import chatModel
+
+TEXTS = [
+    "exam results are released on the portal",
+    "exam venues are listed on the notice board",
+    "the library lends laptops for a week",
+]
+KEYWORDS = [["exams"], ["exams"], ["library"]]
+
+
+@pytest.fixture
+def chat_db(make_store, monkeypatch):
+    store = make_store()
+    store.add_documents(make_docs(TEXTS, keywords=KEYWORDS))
+    monkeypatch.setattr(chatModel, "db", store)
+    monkeypatch.setattr(chatModel, "get_answer_cache", lambda: None)
+    return store
+
+
+def _match(keywords):
+    async def amatch_keywords(question):
+        if isinstance(keywords, Exception):
+            raise keywords
+        return keywords
+
+    return amatch_keywords
+
+
+def _retrieve(question, chat_history=()):
+    return asyncio.run(
+        chatModel.retrieve_context(
+            {"input": question, "chat_history": list(chat_history)}
+        )
+    )
+
+
+def test_keyword_match_and_embedding_overlap(chat_db, monkeypatch):
+    matching, embedding = asyncio.Event(), asyncio.Event()
+    embed_query = chat_db.aembed_query
+
+    async def amatch_keywords(question):
+        matching.set()
+        # Times out unless the embedding is requested meanwhile
+        await asyncio.wait_for(embedding.wait(), 5)
+        return ["library"]
+
+    async def aembed_query(question):
+        embedding.set()
+        await asyncio.wait_for(matching.wait(), 5)
+        return await embed_query(question)
+
+    monkeypatch.setattr(chatModel, "amatch_keywords", amatch_keywords)
+    monkeypatch.setattr(chat_db, "aembed_query", aembed_query)
+
+    state = _retrieve("laptops")
+
+    assert state["context"] == "the library lends laptops for a week"
+    assert {"keyword_match", "query_embedding", "search", "retrieval"} <= set(
+        state["timings"]
+    )
+
+
+def test_matched_keywords_filter_the_search(chat_db, monkeypatch):
+    monkeypatch.setattr(chatModel, "amatch_keywords", _match(["exams"]))
+
+    chunks = _retrieve("where do I borrow laptops")["context"].split("\n\n")
+
+    assert sorted(chunks) == sorted(TEXTS[:2])
+
+
+def test_filter_without_results_falls_back_to_unfiltered(chat_db, monkeypatch):
+    monkeypatch.setattr(chatModel, "amatch_keywords", _match(["parking"]))
+
+    chunks = _retrieve("laptops")["context"].split("\n\n")
+
+    assert sorted(chunks) == sorted(TEXTS)
+
+
+@pytest.mark.parametrize("failure", ["keywords", "embedding"])
+def test_failures_degrade_to_an_unfiltered_search(chat_db, monkeypatch, failure):
+    monkeypatch.setattr(
+        chatModel,
+        "amatch_keywords",
+        _match(RuntimeError("timeout") if failure == "keywords" else ["library"]),
+    )
+    if failure == "embedding":
+        # The search embeds the question again after the early attempt fails
+        calls = []
+        embed_query = chat_db.aembed_query
+
+        async def aembed_query(question):
+            calls.append(question)
+            if len(calls) == 1:
+                raise RuntimeError("rate limited")
+            return await embed_query(question)
+
+        monkeypatch.setattr(chat_db, "aembed_query", aembed_query)
+
+    state = _retrieve("laptops")
+
+    assert state["context"].split("\n\n")[0] == "the library lends laptops for a week"
+    assert "search" in state["timings"]
+
+
+def test_cancelled_node_cancels_the_keyword_match(chat_db, monkeypatch):
+    keyword_match = {}
+
+    async def amatch_keywords(question):
+        keyword_match["started"] = True
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            keyword_match["cancelled"] = True
+            raise
+
+    async def aembed_query(question):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(chatModel, "amatch_keywords", amatch_keywords)
+    monkeypatch.setattr(chat_db, "aembed_query", aembed_query)
+
+    async def main():
+        node = asyncio.ensure_future(
+            chatModel.retrieve_context({"input": "laptops", "chat_history": []})
+        )
+        await asyncio.sleep(0.05)
+        node.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await node
+        # Checked before asyncio.run cancels leftover tasks itself
+        await asyncio.sleep(0)
+        return dict(keyword_match)
+
+    assert asyncio.run(main()) == {"started": True, "cancelled": True}
+
+def test_answer_cache_hit_skips_the_search(chat_db, monkeypatch):
+    lookups = []
+    keyword_match = {}
+
+    class FakeAnswerCache:
+        def lookup(self, fingerprint, embedding, spent):
+            lookups.append(fingerprint)
+            return {"answer": "cached answer", "context": "cached context"}
+
+    async def amatch_keywords(question):
+        keyword_match["started"] = True
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            keyword_match["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(chatModel, "get_answer_cache", FakeAnswerCache)
+    monkeypatch.setattr(chatModel, "amatch_keywords", amatch_keywords)
+
+    state = _retrieve("laptops")
+
+    assert state["cached_answer"] == "cached answer"
+    assert state["context"] == "cached context"
+    assert len(lookups) == 1
+    assert keyword_match == {"started": True, "cancelled": True}
+    assert "search" not in state["timings"]
+
+
+def test_follow_up_questions_skip_the_answer_cache(chat_db, monkeypatch):
+    class FailingAnswerCache:
+        def lookup(self, *args):
+            raise AssertionError("follow-ups must not be answered from the cache")
+
+    monkeypatch.setattr(chatModel, "get_answer_cache", FailingAnswerCache)
+    monkeypatch.setattr(chatModel, "amatch_keywords", _match([]))
+
+    state = _retrieve("laptops", chat_history=[chatModel.HumanMessage("hi")])
+
+    assert "cached_answer" not in state
+    assert "laptops" in state["context"]
+
+
+def test_without_a_store_the_context_is_empty(monkeypatch):
+    monkeypatch.setattr(chatModel, "db", None)
+
+    assert _retrieve("laptops") == {"context": "", "timings": {}}